@@ -18,7 +18,7 @@ setup(
         "sec-api>=1.0.0",
         "nltk>=3.8.1",
         "plotly>=5.18.0",
-        "dash>=2.14.0",
+        "dash>=2.16.0",
         "dash-bootstrap-components>=1.0.0",
     ],
     python_requires=">=3.8",
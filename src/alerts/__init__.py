@@ -0,0 +1,3 @@
+"""
+Alerting module for the AI Bubble Dashboard.
+"""
@@ -0,0 +1,272 @@
+"""
+Rule-based alerts over the stream of risk scores.
+
+Three kinds of rule are supported:
+
+- `threshold`: a metric crosses `threshold` going `above` or `below` it.
+  After firing, the rule is re-armed only once the metric has moved back by
+  `hysteresis`, so a value hovering at the threshold alerts once.
+- `jump`: a metric changes by at least `min_change` between two updates,
+  in `direction` `up`, `down` or `any` (the default).
+- `level_change`: a categorical metric such as `risk_level` changes value,
+  optionally only into one of `levels`.
+
+Every rule also has a `cooldown` in seconds per ticker, and can be limited to
+some tickers. Rules are indexed by metric and ticker scope. Crossing rules
+are kept sorted by threshold and re-arm level, and jump rules by
+`min_change`, so an update only bisects to the rules its move from the
+previous value could trigger. The cost does not grow with the total number
+of rules.
+
+Alerts fire on changes only. The first value seen for a ticker sets its
+baseline: rules it is already past start disarmed.
+"""
+
+import os
+import json
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+from src.utils.config import ALERT_CONFIG
+from src.utils.events import SCORES_UPDATED, ANALYSIS_UPDATED
+from src.utils.helpers import logger
+
+RULE_KINDS = ('threshold', 'jump', 'level_change')
+
+class AlertRule:
+    def __init__(self, rule_id: str, metric: str, kind: str = 'threshold', threshold: float = None,
+                 direction: str = None, hysteresis: float = None, min_change: float = None,
+                 levels: Iterable[str] = None, cooldown: float = None, tickers: Iterable[str] = None,
+                 severity: str = 'warning', message: str = None):
+        """One alert rule; see the module docstring for the kinds and their parameters."""
+        if kind not in RULE_KINDS:
+            raise ValueError(f"Unknown rule kind: {kind}")
+        if kind == 'threshold' and (threshold is None or direction not in ('above', 'below')):
+            raise ValueError(f"Rule {rule_id}: threshold rules need a threshold and direction 'above' or 'below'")
+        if kind == 'jump' and (min_change is None or min_change <= 0):
+            raise ValueError(f"Rule {rule_id}: jump rules need a positive min_change")
+        if kind == 'jump':
+            direction = direction or 'any'
+            if direction not in ('up', 'down', 'any'):
+                raise ValueError(f"Rule {rule_id}: jump direction must be 'up', 'down' or 'any'")
+        self.rule_id = rule_id
+        self.metric = metric
+        self.kind = kind
+        self.threshold = threshold
+        self.direction = direction
+        self.hysteresis = ALERT_CONFIG['default_hysteresis'] if hysteresis is None else hysteresis
+        self.min_change = min_change
+        self.levels = set(levels) if levels else None
+        self.cooldown = ALERT_CONFIG['default_cooldown'] if cooldown is None else cooldown
+        self.tickers = set(tickers) if tickers else None
+        self.severity = severity
+        self.message = message
+
+    @classmethod
+    def from_dict(cls, spec: Dict) -> 'AlertRule':
+        spec = dict(spec)
+        return cls(spec.pop('id'), **spec)
+
+    def describe(self, ticker: str, previous, value) -> str:
+        if self.message:
+            return self.message.format(ticker=ticker, metric=self.metric, previous=previous, value=value,
+                                       threshold=self.threshold)
+        if self.kind == 'threshold':
+            return f"{ticker} {self.metric} moved {self.direction} {self.threshold}: {previous:.3f} -> {value:.3f}"
+        if self.kind == 'jump':
+            return f"{ticker} {self.metric} changed by {value - previous:+.3f}: {previous:.3f} -> {value:.3f}"
+        return f"{ticker} {self.metric} changed: {previous} -> {value}"
+
+def load_rules(path: str = None) -> List[AlertRule]:
+    """Rules from a JSON file with a `rules` list; no file means no rules."""
+    path = path or ALERT_CONFIG['rules_file']
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [AlertRule.from_dict(spec) for spec in json.load(f).get('rules', [])]
+
+class _CrossingIndex:
+    """Threshold rules of one metric, direction and ticker scope, in signed units.
+
+    `below` rules are stored negated so both directions fire on an upward
+    crossing of `key` and re-arm at or below `key - hysteresis`.
+    """
+    def __init__(self):
+        self.triggers, self.trigger_rules = [], []
+        self.rearms, self.rearm_rules = [], []
+
+    def add(self, key: float, rule: AlertRule):
+        i = bisect_right(self.triggers, key)
+        self.triggers.insert(i, key)
+        self.trigger_rules.insert(i, rule)
+        rearm = key - rule.hysteresis
+        j = bisect_right(self.rearms, rearm)
+        self.rearms.insert(j, rearm)
+        self.rearm_rules.insert(j, rule)
+
+    def crossed_up(self, previous: float, value: float) -> List[AlertRule]:
+        """Rules with previous < key <= value."""
+        return self.trigger_rules[bisect_right(self.triggers, previous):bisect_right(self.triggers, value)]
+
+    def at_or_below(self, value: float) -> List[AlertRule]:
+        """Rules with key <= value (the ones a first value starts past)."""
+        return self.trigger_rules[:bisect_right(self.triggers, value)]
+
+    def rearmed(self, previous: float, value: float) -> List[AlertRule]:
+        """Rules with value <= key - hysteresis < previous."""
+        return self.rearm_rules[bisect_left(self.rearms, value):bisect_left(self.rearms, previous)]
+
+class AlertEngine:
+    def __init__(self, rules: Iterable[AlertRule] = (), sinks: Iterable = (),
+                 clock: Callable[[], float] = time.time):
+        """Evaluate `rules` on each update and send fired alerts to every sink."""
+        self.sinks = list(sinks)
+        self.clock = clock
+        self.rules = {}
+        # (metric, sign, scope) -> _CrossingIndex, where scope is a ticker or None for every ticker
+        self._crossing = {}
+        # (metric, scope) -> ([min_change, ...], [rule, ...]) sorted by min_change
+        self._jumps = {}
+        # (metric, scope) -> [rule, ...]
+        self._level_changes = defaultdict(list)
+        self._last = {}
+        self._disarmed = set()
+        self._last_fired = {}
+        self.rules_evaluated = 0
+        for rule in rules:
+            self.add_rule(rule)
+
+    @classmethod
+    def from_config(cls) -> 'AlertEngine':
+        from src.alerts.sinks import default_sinks
+        return cls(load_rules(), default_sinks())
+
+    def add_rule(self, rule: AlertRule):
+        if rule.rule_id in self.rules:
+            raise ValueError(f"Duplicate rule id: {rule.rule_id}")
+        self.rules[rule.rule_id] = rule
+        for scope in sorted(rule.tickers) if rule.tickers else [None]:
+            if rule.kind == 'threshold':
+                sign = 1 if rule.direction == 'above' else -1
+                index = self._crossing.setdefault((rule.metric, sign, scope), _CrossingIndex())
+                index.add(sign * rule.threshold, rule)
+            elif rule.kind == 'jump':
+                changes, jump_rules = self._jumps.setdefault((rule.metric, scope), ([], []))
+                i = bisect_right(changes, rule.min_change)
+                changes.insert(i, rule.min_change)
+                jump_rules.insert(i, rule)
+            else:
+                self._level_changes[(rule.metric, scope)].append(rule)
+
+    def _crossings(self, ticker: str, metric: str, previous, value) -> List[AlertRule]:
+        fired = []
+        for sign in (1, -1):
+            for scope in (None, ticker):
+                index = self._crossing.get((metric, sign, scope))
+                if index is None:
+                    continue
+                x = sign * value
+                if previous is None:
+                    self._disarmed.update((rule.rule_id, ticker) for rule in index.at_or_below(x))
+                    continue
+                p = sign * previous
+                if x > p:
+                    candidates = index.crossed_up(p, x)
+                    self.rules_evaluated += len(candidates)
+                    for rule in candidates:
+                        key = (rule.rule_id, ticker)
+                        if key not in self._disarmed:
+                            self._disarmed.add(key)
+                            fired.append(rule)
+                elif x < p:
+                    candidates = index.rearmed(p, x)
+                    self.rules_evaluated += len(candidates)
+                    self._disarmed.difference_update((rule.rule_id, ticker) for rule in candidates)
+        return fired
+
+    def _jumps_fired(self, ticker: str, metric: str, previous, value) -> List[AlertRule]:
+        change = value - previous
+        fired = []
+        for scope in (None, ticker):
+            entry = self._jumps.get((metric, scope))
+            if entry is None:
+                continue
+            changes, jump_rules = entry
+            candidates = jump_rules[:bisect_right(changes, abs(change))]
+            self.rules_evaluated += len(candidates)
+            fired.extend(
+                rule for rule in candidates
+                if rule.direction == 'any' or (rule.direction == 'up') == (change > 0)
+            )
+        return fired
+
+    def _level_changes_fired(self, ticker: str, metric: str, value) -> List[AlertRule]:
+        fired = []
+        for scope in (None, ticker):
+            candidates = self._level_changes.get((metric, scope), [])
+            self.rules_evaluated += len(candidates)
+            fired.extend(rule for rule in candidates if rule.levels is None or value in rule.levels)
+        return fired
+
+    def evaluate(self, ticker: str, metrics: Dict, timestamp: Optional[str] = None) -> List[Dict]:
+        """Evaluate one ticker's new metric values; returns the alerts fired (not yet emitted)."""
+        alerts = []
+        now = self.clock()
+        for metric, value in metrics.items():
+            if value is None:
+                continue
+            previous = self._last.get((ticker, metric))
+            self._last[(ticker, metric)] = value
+            if isinstance(value, (int, float)):
+                fired = self._crossings(ticker, metric, previous, float(value))
+                if previous is not None and value != previous:
+                    fired += self._jumps_fired(ticker, metric, previous, float(value))
+            else:
+                fired = self._level_changes_fired(ticker, metric, value) if previous not in (None, value) else []
+
+            for rule in fired:
+                key = (rule.rule_id, ticker)
+                if now - self._last_fired.get(key, float('-inf')) < rule.cooldown:
+                    continue
+                self._last_fired[key] = now
+                alerts.append({
+                    'rule_id': rule.rule_id,
+                    'kind': rule.kind,
+                    'ticker': ticker,
+                    'metric': metric,
+                    'previous': previous,
+                    'value': value,
+                    'threshold': rule.threshold,
+                    'severity': rule.severity,
+                    'timestamp': timestamp,
+                    'message': rule.describe(ticker, previous, value)
+                })
+        return alerts
+
+    def emit(self, alerts: List[Dict]):
+        """Send alerts to every sink; a failing sink does not stop the others."""
+        if not alerts:
+            return
+        for sink in self.sinks:
+            try:
+                sink.emit(alerts)
+            except Exception as e:
+                logger.error(f"Error in alert sink {type(sink).__name__}: {e}")
+
+    def on_scores_updated(self, event: Dict):
+        """Evaluate every rescored ticker of a cycle and emit the alerts as one batch."""
+        alerts = []
+        for ticker, score in event['scores'].items():
+            metrics = {'bubble_risk': score.get('bubble_risk'), 'risk_level': score.get('risk_level')}
+            metrics.update(score.get('component_scores', {}))
+            alerts += self.evaluate(ticker, metrics, event['timestamp'])
+        self.emit(alerts)
+
+    def on_analysis_updated(self, event: Dict):
+        """Evaluate a sector-level analysis such as `analyze_bubble_risk`."""
+        self.emit(self.evaluate(event['subject'], event['metrics'], event['timestamp']))
+
+    def attach(self, event_bus):
+        event_bus.subscribe(SCORES_UPDATED, self.on_scores_updated)
+        event_bus.subscribe(ANALYSIS_UPDATED, self.on_analysis_updated)
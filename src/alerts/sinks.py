@@ -0,0 +1,73 @@
+"""
+Destinations for fired alerts.
+
+A sink receives each cycle's alerts as one batch through `emit`. Sinks must
+not hold up scoring: the file sink appends one line per alert, and the
+webhook sink hands batches to its own thread.
+"""
+
+import os
+import json
+import queue
+import threading
+from typing import Dict, List
+import requests
+from src.utils.config import ALERT_CONFIG
+from src.utils.helpers import logger
+
+class LogSink:
+    def emit(self, alerts: List[Dict]):
+        for alert in alerts:
+            logger.warning(f"ALERT [{alert['severity']}] {alert['message']}")
+
+class FileSink:
+    def __init__(self, path: str = None):
+        """Append alerts as JSON lines to `path`."""
+        self.path = path or ALERT_CONFIG['alerts_file']
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._lock = threading.Lock()
+
+    def emit(self, alerts: List[Dict]):
+        lines = "".join(json.dumps(alert, default=str) + "\n" for alert in alerts)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(lines)
+
+class WebhookSink:
+    def __init__(self, url: str, timeout: float = None, max_queue: int = None):
+        """POST each batch of alerts as JSON to `url` from a background thread."""
+        self.url = url
+        self.timeout = timeout or ALERT_CONFIG['webhook_timeout']
+        self._queue = queue.Queue(maxsize=max_queue or ALERT_CONFIG['webhook_max_queue'])
+        self._thread = threading.Thread(target=self._run, name='alert-webhook', daemon=True)
+        self._thread.start()
+
+    def emit(self, alerts: List[Dict]):
+        try:
+            self._queue.put_nowait(alerts)
+        except queue.Full:
+            logger.error(f"Alert webhook queue full, dropped {len(alerts)} alerts")
+
+    def _run(self):
+        while True:
+            alerts = self._queue.get()
+            try:
+                response = requests.post(self.url, json={'alerts': alerts}, timeout=self.timeout)
+                response.raise_for_status()
+            except Exception as e:
+                logger.error(f"Error posting {len(alerts)} alerts to webhook: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Wait until every queued batch has been posted (or failed)."""
+        self._queue.join()
+
+def default_sinks() -> List:
+    """Log and file sinks, plus a webhook when `ALERT_WEBHOOK_URL` is set."""
+    sinks = [LogSink(), FileSink()]
+    if ALERT_CONFIG['webhook_url']:
+        sinks.append(WebhookSink(ALERT_CONFIG['webhook_url']))
+    return sinks
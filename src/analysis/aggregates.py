@@ -0,0 +1,145 @@
+"""
+Market-cap-weighted bubble risk aggregates.
+
+Every scored ticker belongs to the whole universe (the AI sector bubble
+index), to its sector and sub-industry as reported with its market data, and
+to any custom baskets listed in the tickers file. Each group keeps running
+sums of market cap and of market cap times each score. When a member's score
+or market cap changes, its old contribution is subtracted from its groups and
+the new one added, so a cycle costs time proportional to the tickers that
+changed, not to the size of the universe. Sums are rebuilt exactly from the
+members every `rebuild_every` updates so floating-point drift cannot build up.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from src.storage.score_index import COMPONENT_COLUMNS
+from src.utils.config import AGGREGATES_CONFIG
+
+VALUE_COLUMNS = ['bubble_risk'] + COMPONENT_COLUMNS
+
+UNIVERSE = 'universe'
+SECTOR = 'sector'
+SUB_INDUSTRY = 'sub_industry'
+BASKET = 'basket'
+GROUP_TYPES = (UNIVERSE, SECTOR, SUB_INDUSTRY, BASKET)
+
+class BubbleAggregates:
+    def __init__(self, baskets: Optional[Dict[str, Sequence[str]]] = None, rebuild_every: int = None):
+        """Empty aggregates; `baskets` maps basket names to member tickers."""
+        self.rebuild_every = rebuild_every or AGGREGATES_CONFIG['rebuild_every']
+        self._baskets = {}
+        self._ticker_baskets = {}
+        # ticker -> (market cap, values in VALUE_COLUMNS order, market data groups)
+        self._members = {}
+        # (group_type, group_name) -> [cap sum, member count, cap-weighted sum per value column]
+        self._sums = {}
+        self._updates = 0
+        self.set_baskets(baskets or {})
+
+    def set_baskets(self, baskets: Dict[str, Sequence[str]]):
+        """Replace the custom baskets; sums are rebuilt only if membership changed."""
+        baskets = {name: sorted(set(tickers)) for name, tickers in baskets.items()}
+        if baskets == self._baskets:
+            return
+        self._baskets = baskets
+        self._ticker_baskets = {}
+        for name, tickers in baskets.items():
+            for ticker in tickers:
+                self._ticker_baskets.setdefault(ticker, []).append(name)
+        self.rebuild()
+
+    @staticmethod
+    def _groups(market_data: Dict) -> Tuple[Tuple[str, str], ...]:
+        groups = [(UNIVERSE, AGGREGATES_CONFIG['universe_name'])]
+        if market_data.get('sector'):
+            groups.append((SECTOR, market_data['sector']))
+        if market_data.get('industry'):
+            groups.append((SUB_INDUSTRY, market_data['industry']))
+        return tuple(groups)
+
+    def _member_groups(self, ticker: str, groups: Tuple) -> List[Tuple[str, str]]:
+        return list(groups) + [(BASKET, name) for name in self._ticker_baskets.get(ticker, [])]
+
+    def _apply(self, ticker: str, member: Tuple, sign: int):
+        cap, values, groups = member
+        for group in self._member_groups(ticker, groups):
+            sums = self._sums.get(group)
+            if sums is None:
+                sums = self._sums[group] = [0.0, 0, [0.0] * len(VALUE_COLUMNS)]
+            sums[0] += sign * cap
+            sums[1] += sign
+            weighted = sums[2]
+            for i, value in enumerate(values):
+                weighted[i] += sign * cap * value
+            if sums[1] == 0:
+                del self._sums[group]
+
+    def update(self, ticker: str, score: Dict, market_data: Optional[Dict] = None):
+        """Move a ticker's contribution to its latest score and market cap.
+
+        Tickers without a positive market cap or a complete score contribute
+        nothing until they have one.
+        """
+        market_data = market_data or {}
+        cap = market_data.get('market_cap')
+        components = score.get('component_scores', {})
+        values = (score.get('bubble_risk'),) + tuple(components.get(column) for column in COMPONENT_COLUMNS)
+        member = None
+        if cap and cap > 0 and all(value is not None for value in values):
+            member = (float(cap), tuple(float(value) for value in values), self._groups(market_data))
+
+        previous = self._members.get(ticker)
+        if member == previous:
+            return
+        if previous is not None:
+            self._apply(ticker, previous, -1)
+            del self._members[ticker]
+        if member is not None:
+            self._apply(ticker, member, 1)
+            self._members[ticker] = member
+
+        self._updates += 1
+        if self._updates >= self.rebuild_every:
+            self.rebuild()
+
+    def remove(self, ticker: str):
+        """Drop a ticker that left the universe."""
+        previous = self._members.pop(ticker, None)
+        if previous is not None:
+            self._apply(ticker, previous, -1)
+
+    def retain(self, tickers: Iterable[str]):
+        """Drop every member not in `tickers`."""
+        keep = set(tickers)
+        for ticker in [ticker for ticker in self._members if ticker not in keep]:
+            self.remove(ticker)
+
+    def rebuild(self):
+        """Recompute every group's sums from the members."""
+        self._sums = {}
+        for ticker, member in self._members.items():
+            self._apply(ticker, member, 1)
+        self._updates = 0
+
+    def get(self, group_type: str, group_name: str) -> Optional[Dict]:
+        """Cap-weighted scores, total market cap and member count of one group."""
+        sums = self._sums.get((group_type, group_name))
+        if sums is None:
+            return None
+        cap, count, weighted = sums
+        result = {'group_type': group_type, 'group_name': group_name, 'market_cap': cap, 'n_members': count}
+        result.update((column, weighted[i] / cap) for i, column in enumerate(VALUE_COLUMNS))
+        return result
+
+    def groups(self) -> List[Tuple[str, str]]:
+        return sorted(self._sums)
+
+    def rows(self, timestamp: str) -> List[Tuple]:
+        """Current value of every group as `ScoreIndex.add_aggregate_rows` rows."""
+        rows = []
+        for group_type, group_name in self.groups():
+            aggregate = self.get(group_type, group_name)
+            rows.append((group_type, group_name, timestamp) + tuple(
+                aggregate[column] for column in VALUE_COLUMNS
+            ) + (aggregate['market_cap'], aggregate['n_members']))
+        return rows
@@ -5,21 +5,45 @@ Provides comprehensive analysis of AI sector bubble indicators.
 
 import numpy as np
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 import yfinance as yf
 import pandas_datareader.data as web
 import warnings
-from typing import Dict
+from typing import Dict, Sequence
 import logging
+from src.analysis.monte_carlo import RISK_LEVELS, BubbleRegimeSimulator, risk_level_codes
+from src.analysis.explosive_roots import ExplosiveRootTester
+from src.analysis.risk_panel import RiskPanel
 
 warnings.filterwarnings('ignore')
 logger = logging.getLogger(__name__)
 
+# yfinance bar intervals supported by the analyzer and the matching pandas frequency
+INTERVAL_FREQUENCIES = {
+    '1mo': 'MS',
+    '1wk': 'W-MON',
+    '1d': 'B',
+    '1h': 'h',
+    '5m': '5min'
+}
+
+# yfinance only serves intraday bars for a limited lookback window
+INTRADAY_LOOKBACK_DAYS = {
+    '1h': 729,
+    '5m': 59
+}
+
 class BubbleAnalyzer:
-    def __init__(self, start_date: str = '2020-01-01'):
+    def __init__(self, start_date: str = '2020-01-01', interval: str = '1mo'):
         """Initialize the bubble analyzer with data collection parameters."""
+        if interval not in INTERVAL_FREQUENCIES:
+            raise ValueError(f"Unsupported interval: {interval}")
+        self.interval = interval
         self.start_date = start_date
         self.end_date = datetime.now().strftime('%Y-%m-%d')
+        if interval in INTRADAY_LOOKBACK_DAYS:
+            earliest = (datetime.now() - timedelta(days=INTRADAY_LOOKBACK_DAYS[interval])).strftime('%Y-%m-%d')
+            self.start_date = max(start_date, earliest)
         self.data = None
         
     def collect_data(self) -> pd.DataFrame:
@@ -28,10 +52,14 @@ class BubbleAnalyzer:
         
         # Collect ETF data
         try:
-            botz = yf.download('BOTZ', start=self.start_date, end=self.end_date, interval='1mo')
+            botz = yf.download('BOTZ', start=self.start_date, end=self.end_date, interval=self.interval)
+            if botz.empty:
+                raise ValueError("no BOTZ data returned")
             logger.info("Successfully downloaded BOTZ ETF data")
             ai_etf = botz[['Close']].copy()
             ai_etf.columns = ['price']
+            if ai_etf.index.tz is not None:
+                ai_etf.index = ai_etf.index.tz_localize(None)
         except Exception as e:
             logger.error(f"Error downloading ETF data: {e}")
             ai_etf = self._generate_simulated_data()
@@ -42,7 +70,8 @@ class BubbleAnalyzer:
         # Collect market data
         market_data = self._collect_market_data()
         
-        # Combine data
+        # Combine data, carrying the (monthly) market indicators onto the ETF bars
+        market_data = market_data.sort_index().reindex(ai_etf.index, method='ffill')
         self.data = pd.concat([ai_etf, market_data], axis=1)
         return self.data
 
@@ -69,17 +98,19 @@ class BubbleAnalyzer:
         return market_data
 
     def _generate_simulated_data(self) -> pd.DataFrame:
-        """Generate simulated ETF data."""
-        months = pd.date_range(start=self.start_date, end=self.end_date, freq='MS')
-        data = pd.DataFrame(index=months)
+        """Generate simulated ETF data at the analyzer's interval."""
+        periods = pd.date_range(start=self.start_date, end=self.end_date, freq=INTERVAL_FREQUENCIES[self.interval])
+        data = pd.DataFrame(index=periods)
         base_value = 25
-        trend = np.linspace(0, 15, len(months))
-        data['price'] = base_value + trend + np.random.normal(0, 2, len(months))
+        trend = np.linspace(0, 15, len(periods))
+        data['price'] = base_value + trend + np.random.normal(0, 2, len(periods))
         return data
 
     def _generate_simulated_market_data(self) -> pd.DataFrame:
         """Generate simulated market data."""
-        months = pd.date_range(start=self.start_date, end=self.end_date, freq='MS')
+        # Start a month early so every ETF bar has an indicator value to carry forward
+        start = pd.Timestamp(self.start_date) - pd.offsets.MonthBegin(1)
+        months = pd.date_range(start=start, end=self.end_date, freq='MS')
         data = pd.DataFrame(index=months)
         data['vix'] = np.random.normal(20, 5, len(months))
         data['fed_rate'] = np.random.normal(2, 0.5, len(months))
@@ -101,15 +132,74 @@ class BubbleAnalyzer:
         volatility = self.data['ps_ratio'].pct_change().std() * 100
         
         # Determine risk level
-        if current_deviation > 40 or (current_deviation > 20 and volatility > 30):
-            risk_level = "HIGH"
-        elif current_deviation > 20 or (current_deviation > 10 and volatility > 20):
-            risk_level = "MODERATE"
-        else:
-            risk_level = "LOW"
+        risk_level = self._calculate_risk_level(current_deviation, volatility)
 
         return {
             'current_deviation': current_deviation,
             'volatility': volatility,
             'bubble_risk_level': risk_level
-        } 
\ No newline at end of file
+        }
+
+    def analyze_risk_panel(self, frame: pd.DataFrame = None, windows: Sequence[int] = None) -> RiskPanel:
+        """Deviation/volatility risk for every column of `frame` and every window at once.
+
+        `frame` holds one column per ticker (e.g. P/S ratios or prices); it
+        defaults to the analyzer's own `ps_ratio` series.
+        """
+        if frame is None:
+            if self.data is None:
+                self.collect_data()
+            frame = self.data[['ps_ratio']]
+        return RiskPanel.from_frame(frame, windows)
+
+    def _calculate_risk_level(self, deviation: float, volatility: float, *, trend_strength: float = None) -> str:
+        """Map deviation and volatility (in percent) to a risk level.
+
+        `trend_strength` never affected the result and is deprecated; it is
+        accepted by keyword only for existing callers.
+        """
+        if trend_strength is not None:
+            warnings.warn("trend_strength is ignored and will be removed", DeprecationWarning, stacklevel=2)
+        return RISK_LEVELS[int(risk_level_codes(deviation, volatility))]
+
+    def simulate_bubble_risk(self, n_paths: int = 10000, horizons: Sequence[int] = (1, 3, 6, 12),
+                             seed: int = 42, n_workers: int = None, method: str = 'bootstrap') -> Dict:
+        """Estimate the probability of each risk level at several forward horizons."""
+        # Built first so invalid horizons or methods fail before any download
+        simulator = BubbleRegimeSimulator(
+            n_paths=n_paths,
+            horizons=horizons,
+            seed=seed,
+            n_workers=n_workers,
+            method=method
+        )
+        if self.data is None:
+            self.collect_data()
+        return simulator.simulate(self.data['ps_ratio'].dropna().values)
+
+    def detect_explosive_episodes(self, tickers: Sequence[str] = None, significance: float = 0.95,
+                                  tester: ExplosiveRootTester = None) -> Dict:
+        """Run SADF/GSADF bubble tests on the P/S ratio and daily prices of `tickers`."""
+        if self.data is None:
+            self.collect_data()
+        tester = tester or ExplosiveRootTester()
+
+        results = {'ps_ratio': tester.test(self.data['ps_ratio'], significance), 'prices': {}}
+        if not tickers:
+            return results
+
+        try:
+            prices = yf.download(list(tickers), start=self.start_date, end=self.end_date, interval='1d')['Close']
+        except Exception as e:
+            logger.error(f"Error downloading prices for explosive root tests: {e}")
+            return results
+
+        for ticker in tickers:
+            if ticker not in prices or prices[ticker].dropna().empty:
+                logger.warning(f"No price history for {ticker}, skipping explosive root test")
+                continue
+            try:
+                results['prices'][ticker] = tester.test(prices[ticker], significance)
+            except ValueError as e:
+                logger.warning(f"Skipping explosive root test for {ticker}: {e}")
+        return results 
\ No newline at end of file
@@ -1,17 +1,79 @@
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
 from datetime import datetime, timedelta
+from src.analysis.quantile_sketch import MetricSketches
+from src.utils.config import RISK_SCORING_CONFIG
+
+def sentiment_summary(data):
+    """News and forum aggregates of a payload.
+
+    Deduplicated payloads carry a precomputed `sentiment_summary`; older ones
+    embed the full item lists, which are summarized here.
+    """
+    if data.get('sentiment_summary') is not None:
+        return data['sentiment_summary']
+    news_data = data.get('news') or []
+    forum_data = data.get('forum_sentiment') or []
+    return {
+        'news_volume': len(news_data),
+        'n_posts': len(forum_data),
+        'total_comments': sum(post['num_comments'] for post in forum_data),
+        'avg_post_score': np.mean([post['score'] for post in forum_data]) if forum_data else None
+    }
+
+def extract_metrics(data):
+    """Extract the raw metric values the scorer normalizes from a ticker payload."""
+    market_data = data.get('market_data', {})
+    ai_metrics = data.get('ai_metrics', {})
+    summary = sentiment_summary(data)
+    metrics = {}
+
+    for key in ('pe_ratio', 'forward_pe', 'price_to_sales', 'beta'):
+        if market_data.get(key):
+            metrics[key] = market_data[key]
+    if market_data.get('price_change_1m'):
+        metrics['price_change_1m'] = abs(market_data['price_change_1m'])
+    if market_data.get('volume') and market_data.get('avg_volume'):
+        metrics['volume_ratio'] = market_data['volume'] / market_data['avg_volume']
+
+    for key in ('rd_to_revenue', 'rd_expense', 'ai_mentions', 'patent_count'):
+        if ai_metrics.get(key):
+            metrics[key] = ai_metrics[key]
+
+    if summary['news_volume']:
+        metrics['news_volume'] = summary['news_volume']
+    if summary['n_posts']:
+        metrics['total_comments'] = summary['total_comments']
+        metrics['avg_post_score'] = summary['avg_post_score']
+    return metrics
 
 class BubbleScorer:
-    def __init__(self):
+    def __init__(self, normalization='cap', sketches=None):
+        """Create a scorer.
+
+        `normalization='cap'` divides each metric by a fixed cap; `'percentile'`
+        scores each metric by its percentile within `sketches` (the universe's
+        history), falling back to the cap for metrics with no history yet.
+        """
+        if normalization not in ('cap', 'percentile'):
+            raise ValueError(f"Unknown normalization mode: {normalization}")
+        self.normalization = normalization
+        self.sketches = sketches if sketches is not None else MetricSketches()
         self.scaler = MinMaxScaler()
-        self.weights = {
-            'valuation_metrics': 0.3,
-            'sentiment_metrics': 0.2,
-            'growth_metrics': 0.2,
-            'ai_exposure': 0.15,
-            'market_metrics': 0.15
-        }
+        # Recalibrate with `src.analysis.weight_sweep`
+        self.weights = dict(RISK_SCORING_CONFIG['weights'])
+
+    def _normalize(self, metric, value, cap):
+        """Map a raw metric value to 0-1 using the configured normalization."""
+        if self.normalization == 'percentile':
+            percentile = self.sketches.percentile(metric, value)
+            if percentile is not None:
+                return percentile
+        return min(value / cap, 1)
+
+    def update_reference(self, data):
+        """Add a ticker payload's metrics to the percentile reference history."""
+        self.sketches.observe(extract_metrics(data))
 
     def calculate_valuation_score(self, market_data):
         """Calculate valuation-based risk score."""
@@ -19,40 +81,45 @@ class BubbleScorer:
         
         # P/E Ratio Score
         if market_data.get('pe_ratio'):
-            pe_score = min(market_data['pe_ratio'] / 50, 1)  # Normalize to 0-1, cap at 50
+            pe_score = self._normalize('pe_ratio', market_data['pe_ratio'], 50)  # Normalize to 0-1, cap at 50
             scores.append(pe_score)
         
         # Forward P/E Score
         if market_data.get('forward_pe'):
-            forward_pe_score = min(market_data['forward_pe'] / 40, 1)
+            forward_pe_score = self._normalize('forward_pe', market_data['forward_pe'], 40)
             scores.append(forward_pe_score)
         
         # Price to Sales Score (if available)
         if market_data.get('price_to_sales'):
-            ps_score = min(market_data['price_to_sales'] / 20, 1)
+            ps_score = self._normalize('price_to_sales', market_data['price_to_sales'], 20)
             scores.append(ps_score)
         
         return np.mean(scores) if scores else 0.5
 
-    def calculate_sentiment_score(self, news_data, forum_data):
-        """Calculate sentiment-based risk score."""
+    def calculate_sentiment_score(self, news_data, forum_data, summary=None):
+        """Calculate sentiment-based risk score.
+
+        A precomputed `summary` (see `sentiment_summary`) replaces the item lists.
+        """
+        if summary is None:
+            summary = sentiment_summary({'news': news_data, 'forum_sentiment': forum_data})
         scores = []
         
         # News Volume Score
-        news_volume = len(news_data)
+        news_volume = summary['news_volume']
         if news_volume > 0:
-            news_volume_score = min(news_volume / 50, 1)  # Normalize to 0-1, cap at 50 articles
+            news_volume_score = self._normalize('news_volume', news_volume, 50)  # Normalize to 0-1, cap at 50 articles
             scores.append(news_volume_score)
         
         # Forum Activity Score
-        if forum_data:
-            total_comments = sum(post['num_comments'] for post in forum_data)
-            comment_score = min(total_comments / 1000, 1)  # Normalize to 0-1, cap at 1000 comments
+        if summary['n_posts']:
+            total_comments = summary['total_comments']
+            comment_score = self._normalize('total_comments', total_comments, 1000)  # Normalize to 0-1, cap at 1000 comments
             scores.append(comment_score)
             
             # Post Score
-            avg_score = np.mean([post['score'] for post in forum_data])
-            post_score = min(avg_score / 1000, 1)  # Normalize to 0-1, cap at 1000 score
+            avg_score = summary['avg_post_score']
+            post_score = self._normalize('avg_post_score', avg_score, 1000)  # Normalize to 0-1, cap at 1000 score
             scores.append(post_score)
         
         return np.mean(scores) if scores else 0.5
@@ -64,12 +131,12 @@ class BubbleScorer:
         # Price Change Score
         if market_data.get('price_change_1m'):
             price_change = abs(market_data['price_change_1m'])
-            price_score = min(price_change / 0.5, 1)  # Normalize to 0-1, cap at 50% change
+            price_score = self._normalize('price_change_1m', price_change, 0.5)  # Normalize to 0-1, cap at 50% change
             scores.append(price_score)
         
         # R&D to Revenue Score
         if ai_metrics.get('rd_to_revenue'):
-            rd_score = min(ai_metrics['rd_to_revenue'] / 0.3, 1)  # Normalize to 0-1, cap at 30%
+            rd_score = self._normalize('rd_to_revenue', ai_metrics['rd_to_revenue'], 0.3)  # Normalize to 0-1, cap at 30%
             scores.append(rd_score)
         
         return np.mean(scores) if scores else 0.5
@@ -80,17 +147,17 @@ class BubbleScorer:
         
         # R&D Expense Score
         if ai_metrics.get('rd_expense'):
-            rd_score = min(ai_metrics['rd_expense'] / 1e9, 1)  # Normalize to 0-1, cap at $1B
+            rd_score = self._normalize('rd_expense', ai_metrics['rd_expense'], 1e9)  # Normalize to 0-1, cap at $1B
             scores.append(rd_score)
         
         # AI Mentions Score
         if ai_metrics.get('ai_mentions'):
-            mention_score = min(ai_metrics['ai_mentions'] / 20, 1)  # Normalize to 0-1, cap at 20 mentions
+            mention_score = self._normalize('ai_mentions', ai_metrics['ai_mentions'], 20)  # Normalize to 0-1, cap at 20 mentions
             scores.append(mention_score)
         
         # Patent Count Score
         if ai_metrics.get('patent_count'):
-            patent_score = min(ai_metrics['patent_count'] / 100, 1)  # Normalize to 0-1, cap at 100 patents
+            patent_score = self._normalize('patent_count', ai_metrics['patent_count'], 100)  # Normalize to 0-1, cap at 100 patents
             scores.append(patent_score)
         
         return np.mean(scores) if scores else 0.5
@@ -102,12 +169,12 @@ class BubbleScorer:
         # Volume Score
         if market_data.get('volume') and market_data.get('avg_volume'):
             volume_ratio = market_data['volume'] / market_data['avg_volume']
-            volume_score = min(volume_ratio / 3, 1)  # Normalize to 0-1, cap at 3x average
+            volume_score = self._normalize('volume_ratio', volume_ratio, 3)  # Normalize to 0-1, cap at 3x average
             scores.append(volume_score)
         
         # Beta Score
         if market_data.get('beta'):
-            beta_score = min(market_data['beta'] / 2, 1)  # Normalize to 0-1, cap at beta of 2
+            beta_score = self._normalize('beta', market_data['beta'], 2)  # Normalize to 0-1, cap at beta of 2
             scores.append(beta_score)
         
         return np.mean(scores) if scores else 0.5
@@ -121,7 +188,7 @@ class BubbleScorer:
         
         # Calculate individual component scores
         valuation_score = self.calculate_valuation_score(market_data)
-        sentiment_score = self.calculate_sentiment_score(news_data, forum_data)
+        sentiment_score = self.calculate_sentiment_score(news_data, forum_data, data.get('sentiment_summary'))
         growth_score = self.calculate_growth_score(market_data, ai_metrics)
         ai_exposure_score = self.calculate_ai_exposure_score(ai_metrics)
         market_score = self.calculate_market_score(market_data)
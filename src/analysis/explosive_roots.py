@@ -0,0 +1,258 @@
+"""
+Right-tailed recursive unit-root tests for explosive bubbles.
+
+Implements the SADF and GSADF tests of Phillips, Shi and Yu (2015) and the
+backward SADF (BSADF) sequence used to date-stamp bubble episodes. A naive
+GSADF fits one ADF regression per (start, end) window, i.e. O(n^2) separate
+least-squares fits. Here the regressions' sufficient statistics (X'X, X'y,
+y'y) are accumulated once as running sums, so the statistics of any window
+are the difference of two prefix sums and every start point for a given end
+point is solved in one vectorized step.
+
+Critical values are simulated under the PSY null (a random walk with
+asymptotically negligible drift), split across a process pool and cached on
+disk. Simulation cost grows with the square of the sample size, so longer
+samples are simulated at a fixed length (`sim_obs`) with the same minimum
+window fraction. The BSADF critical value sequence is then interpolated onto
+the sample by fraction of the sample elapsed. This follows the PSY
+asymptotics, where the statistics depend on window fractions rather than
+lengths. The first test of any long series then costs seconds. Series whose
+minimum windows round to the same simulated window share one simulation.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+import json
+import math
+import os
+import warnings
+import numpy as np
+import pandas as pd
+import logging
+from src.utils.config import PATHS
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.90, 0.95, 0.99)
+
+def default_min_window(n_obs: int) -> int:
+    """PSY's recommended minimum window r0 = 0.01 + 1.8 / sqrt(T), in observations."""
+    return max(int(math.floor(n_obs * (0.01 + 1.8 / math.sqrt(n_obs)))), 3)
+
+def _prefix_moments(y: np.ndarray, lags: int) -> np.ndarray:
+    """Running sums of z z' for z = [1, dy_{t-1..t-lags}, y_{t-1}, dy_t] along the last axis of `y`."""
+    dy = np.diff(y, axis=-1)
+    rows = dy.shape[-1] - lags
+    columns = [np.ones(y.shape[:-1] + (rows,))]
+    columns += [dy[..., lags - i:dy.shape[-1] - i] for i in range(1, lags + 1)]
+    # y_{t-1} is the last regressor, where the Cholesky factor exposes its coefficient
+    columns += [y[..., lags:-1], dy[..., lags:]]
+    z = np.stack(columns, axis=-1)
+    outer = z[..., :, None] * z[..., None, :]
+    zeros = np.zeros(outer.shape[:-3] + (1,) + outer.shape[-2:])
+    return np.concatenate([zeros, np.cumsum(outer, axis=-3)], axis=-3)
+
+def _adf_tstats(m: np.ndarray, n_obs: np.ndarray) -> np.ndarray:
+    """ADF t-statistics on y_{t-1} for a batch of windows given their summed moments."""
+    k = m.shape[-1] - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if k == 2:
+            xtx = m[..., :k, :k]
+            xty = m[..., :k, k]
+            yty = m[..., k, k]
+            # Closed-form 2x2 inverse: the common no-lag case
+            det = xtx[..., 0, 0] * xtx[..., 1, 1] - xtx[..., 0, 1] ** 2
+            inv_11 = xtx[..., 0, 0] / det
+            beta_0 = (xtx[..., 1, 1] * xty[..., 0] - xtx[..., 0, 1] * xty[..., 1]) / det
+            beta_1 = (xtx[..., 0, 0] * xty[..., 1] - xtx[..., 0, 1] * xty[..., 0]) / det
+            ssr = yty - beta_0 * xty[..., 0] - beta_1 * xty[..., 1]
+        else:
+            # With lags, Cholesky-factor the whole moment matrix entry by entry, each
+            # step vectorized over all windows (np.linalg.solve would loop over the
+            # many tiny systems one at a time). With y_{t-1} the last regressor, the
+            # last row gives its coefficient L[k, k-1] / L[k-1, k-1], the inverse
+            # (X'X)^-1 entry 1 / L[k-1, k-1]^2 and the residual sum of squares.
+            factor = [[None] * (k + 1) for _ in range(k + 1)]
+            for j in range(k + 1):
+                diagonal = m[..., j, j] - sum(factor[j][i] ** 2 for i in range(j))
+                if j == k:
+                    break
+                pivot = np.sqrt(diagonal)
+                factor[j][j] = pivot
+                for row in range(j + 1, k + 1):
+                    factor[row][j] = (m[..., row, j] - sum(factor[row][i] * factor[j][i] for i in range(j))) / pivot
+            pivot = factor[k - 1][k - 1]
+            beta_1 = factor[k][k - 1] / pivot
+            inv_11 = 1.0 / pivot ** 2
+            ssr = diagonal
+        sigma2 = np.maximum(ssr, 0) / (n_obs - k)
+        return beta_1 / np.sqrt(sigma2 * inv_11)
+
+def bsadf_sequence(y: np.ndarray, min_window: int, lags: int = 0):
+    """Return (sadf_sequence, bsadf_sequence) indexed by regression end point.
+
+    `y` may be a single series or a (replications, n) array. Entries before
+    the first full window are NaN. `sadf_sequence[e]` is the ADF statistic on
+    the expanding window [0, e]; `bsadf_sequence[e]` is the sup over all start
+    points leaving at least `min_window` observations.
+    """
+    y = np.asarray(y, dtype=float)
+    moments = _prefix_moments(y, lags)
+    n_rows = moments.shape[-3] - 1
+    offset = y.shape[-1] - n_rows
+    sadf_seq = np.full(y.shape, np.nan)
+    bsadf_seq = np.full(y.shape, np.nan)
+    for end in range(min_window, n_rows + 1):
+        n_starts = end - min_window + 1
+        window_moments = moments[..., end:end + 1, :, :] - moments[..., :n_starts, :, :]
+        stats = _adf_tstats(window_moments, end - np.arange(n_starts, dtype=float))
+        sadf_seq[..., end - 1 + offset] = stats[..., 0]
+        bsadf_seq[..., end - 1 + offset] = np.nanmax(stats, axis=-1)
+    return sadf_seq, bsadf_seq
+
+def _simulate_null(args):
+    """Simulate SADF, GSADF and BSADF sequences for a chunk of null random walks at once."""
+    seed, n_reps, n_obs, min_window, lags = args
+    rng = np.random.default_rng(seed)
+    drift = 1.0 / n_obs
+    y = np.cumsum(drift + rng.standard_normal((n_reps, n_obs)), axis=1)
+    sadf_seq, bsadf_seq = bsadf_sequence(y, min_window, lags)
+    return np.nanmax(sadf_seq, axis=1), np.nanmax(bsadf_seq, axis=1), bsadf_seq
+
+class ExplosiveRootTester:
+    def __init__(self, lags: int = 0, min_window: Optional[int] = None, n_reps: int = 500,
+                 seed: int = 42, n_workers: Optional[int] = None, cache_dir: Optional[str] = None,
+                 sim_obs: int = 400):
+        """Configure the tests; critical values are simulated with `n_reps` null paths of at most `sim_obs` points."""
+        self.lags = lags
+        self.min_window = min_window
+        self.n_reps = n_reps
+        self.sim_obs = sim_obs
+        self.seed = seed
+        self.n_workers = n_workers or min(4, os.cpu_count() or 1)
+        self.cache_dir = cache_dir or os.path.join(PATHS['data_dir'], 'cache')
+        self._cache = {}
+
+    def _window(self, n_obs: int) -> int:
+        return self.min_window or default_min_window(n_obs)
+
+    def _simulated(self, n_obs: int, min_window: int) -> Dict:
+        """Simulated critical values for one sample size and window, cached in memory and on disk."""
+        key = f"psy_cv_n{n_obs}_w{min_window}_p{self.lags}_r{self.n_reps}_s{self.seed}"
+        if key in self._cache:
+            return self._cache[key]
+
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    cached = json.load(f)
+                cached['bsadf'] = {q: np.array(v, dtype=float) for q, v in cached['bsadf'].items()}
+                self._cache[key] = cached
+                return cached
+            except Exception as e:
+                logger.error(f"Error loading critical values from {path}: {e}")
+
+        n_chunks = min(self.n_reps, self.n_workers * 4)
+        sizes = [self.n_reps // n_chunks + (1 if i < self.n_reps % n_chunks else 0) for i in range(n_chunks)]
+        seeds = np.random.SeedSequence(self.seed).spawn(n_chunks)
+        tasks = [(seed, size, n_obs, min_window, self.lags) for seed, size in zip(seeds, sizes)]
+        if self.n_workers > 1 and n_chunks > 1:
+            with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+                results = list(pool.map(_simulate_null, tasks))
+        else:
+            results = [_simulate_null(task) for task in tasks]
+        sadf = np.concatenate([r[0] for r in results])
+        gsadf = np.concatenate([r[1] for r in results])
+        bsadf = np.concatenate([r[2] for r in results])
+
+        with warnings.catch_warnings():
+            # Points before the first full window are NaN in every replication
+            warnings.simplefilter('ignore', RuntimeWarning)
+            bsadf_quantiles = {str(q): np.nanquantile(bsadf, q, axis=0) for q in QUANTILES}
+        values = {
+            'sadf': {str(q): float(np.quantile(sadf, q)) for q in QUANTILES},
+            'gsadf': {str(q): float(np.quantile(gsadf, q)) for q in QUANTILES},
+            'bsadf': bsadf_quantiles
+        }
+        try:
+            if not os.path.exists(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            serializable = dict(values, bsadf={q: v.tolist() for q, v in bsadf_quantiles.items()})
+            with open(path, 'w') as f:
+                json.dump(serializable, f)
+        except Exception as e:
+            logger.error(f"Error caching critical values to {path}: {e}")
+        self._cache[key] = values
+        return values
+
+    def critical_values(self, n_obs: int) -> Dict:
+        """Critical values for a sample size, simulated at up to `sim_obs` points."""
+        min_window = self._window(n_obs)
+        if n_obs <= self.sim_obs:
+            return self._simulated(n_obs, min_window)
+
+        sim_window = max(int(round(min_window * self.sim_obs / n_obs)), 3)
+        simulated = self._simulated(self.sim_obs, sim_window)
+        source = np.arange(1, self.sim_obs + 1) / self.sim_obs
+        target = np.arange(1, n_obs + 1) / n_obs
+        bsadf = {}
+        for q, values in simulated['bsadf'].items():
+            valid = ~np.isnan(values)
+            interpolated = np.interp(target, source[valid], values[valid], left=np.nan)
+            # No critical value where the sample itself has no full window yet
+            interpolated[:min_window - 1] = np.nan
+            bsadf[q] = interpolated
+        return dict(simulated, bsadf=bsadf)
+
+    def test(self, series: pd.Series, significance: float = 0.95) -> Dict:
+        """Run SADF/GSADF on a series and date-stamp explosive episodes."""
+        series = series.dropna()
+        y = series.values.astype(float)
+        n_obs = len(y)
+        min_window = self._window(n_obs)
+        if n_obs < min_window + self.lags + 2:
+            raise ValueError(f"Need more than {min_window + self.lags + 2} observations for the test")
+
+        sadf_seq, bsadf_seq = bsadf_sequence(y, min_window, self.lags)
+        critical = self.critical_values(n_obs)
+        level = str(significance)
+        if level not in critical['gsadf']:
+            raise ValueError(f"Significance must be one of {QUANTILES}")
+
+        sadf = float(np.nanmax(sadf_seq))
+        gsadf = float(np.nanmax(bsadf_seq))
+        bsadf_cv = critical['bsadf'][level]
+        exceeds = np.nan_to_num(bsadf_seq, nan=-np.inf) > np.nan_to_num(bsadf_cv, nan=np.inf)
+        episodes = self._episodes(series.index, exceeds, bsadf_seq, min_duration=math.ceil(math.log(n_obs)))
+
+        return {
+            'n_obs': n_obs,
+            'min_window': min_window,
+            'sadf': sadf,
+            'gsadf': gsadf,
+            'critical_values': {'sadf': critical['sadf'], 'gsadf': critical['gsadf']},
+            'sadf_bubble': sadf > critical['sadf'][level],
+            'gsadf_bubble': gsadf > critical['gsadf'][level],
+            'bsadf': pd.Series(bsadf_seq, index=series.index),
+            'bsadf_critical': pd.Series(bsadf_cv, index=series.index),
+            'episodes': episodes
+        }
+
+    @staticmethod
+    def _episodes(index, exceeds: np.ndarray, bsadf_seq: np.ndarray, min_duration: int):
+        """Group consecutive BSADF exceedances lasting at least `min_duration` periods."""
+        padded = np.concatenate([[False], exceeds, [False]]).astype(int)
+        changes = np.diff(padded)
+        starts = np.flatnonzero(changes == 1)
+        ends = np.flatnonzero(changes == -1)
+        return [
+            {
+                'start': index[start],
+                'end': index[end - 1],
+                'duration': int(end - start),
+                'peak_bsadf': float(np.nanmax(bsadf_seq[start:end]))
+            }
+            for start, end in zip(starts, ends)
+            if end - start >= min_duration
+        ]
@@ -0,0 +1,67 @@
+"""
+Event-driven bubble scoring.
+
+Scores are recomputed only for tickers whose collected payload changed; the
+cached score of every other ticker is carried forward when the cycle's rows
+are written to the score index. Group aggregates are updated from the same
+changes and a row per group is indexed every cycle.
+"""
+
+from typing import Dict
+from src.utils.events import TICKER_CHANGED, CYCLE_COMPLETED, SCORES_UPDATED
+from src.utils.helpers import logger
+from src.utils.profiling import phase
+from src.storage.score_index import ScoreIndex
+from src.analysis.aggregates import BubbleAggregates
+
+class IncrementalScorer:
+    def __init__(self, scorer, score_index, event_bus, sketches_path=None, aggregates=None):
+        """Subscribe to collector events on `event_bus`."""
+        self.scorer = scorer
+        self.aggregates = aggregates or BubbleAggregates()
+        self.score_index = score_index
+        self.event_bus = event_bus
+        self.sketches_path = sketches_path
+        self.scores = {}
+        self.market_data = {}
+        self._dirty = set()
+        event_bus.subscribe(TICKER_CHANGED, self.on_ticker_changed)
+        event_bus.subscribe(CYCLE_COMPLETED, self.on_cycle_completed)
+
+    def on_ticker_changed(self, event: Dict):
+        """Rescore a ticker whose payload changed."""
+        ticker = event['ticker']
+        data = event['data']
+        with phase('score'):
+            self.scorer.update_reference(data)
+            score = self.scorer.calculate_bubble_risk(data)
+            score['risk_level'] = self.scorer.get_risk_level(score['bubble_risk'])
+        self.scores[ticker] = score
+        self.market_data[ticker] = data.get('market_data', {})
+        self.aggregates.update(ticker, score, self.market_data[ticker])
+        self._dirty.add(ticker)
+
+    def on_cycle_completed(self, event: Dict):
+        """Write this cycle's rows (fresh or carried forward) and announce the changes."""
+        timestamp = event['timestamp']
+        rows = [
+            ScoreIndex.build_row(ticker, timestamp, self.scores[ticker], self.market_data.get(ticker))
+            for ticker in event['tickers'] if ticker in self.scores
+        ]
+        # Drop tickers removed from the config, not ones whose collection failed this cycle:
+        # an unchanged payload on recovery publishes no TICKER_CHANGED to add them back
+        self.aggregates.retain(event.get('universe', event['tickers']))
+        with phase('index'):
+            self.score_index.add_rows(rows)
+            self.score_index.add_aggregate_rows(self.aggregates.rows(timestamp))
+
+        changed = sorted(self._dirty)
+        self._dirty.clear()
+        if changed and self.sketches_path:
+            self.scorer.sketches.save(self.sketches_path)
+        logger.info(f"Rescored {len(changed)} of {len(rows)} tickers")
+        self.event_bus.publish(SCORES_UPDATED, {
+            'timestamp': timestamp,
+            'changed': changed,
+            'scores': {ticker: self.scores[ticker] for ticker in changed}
+        })
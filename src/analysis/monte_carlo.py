@@ -0,0 +1,131 @@
+"""
+Monte Carlo simulation of bubble risk regimes.
+
+Forward paths of the P/S ratio are generated either by a stationary block
+bootstrap of historical returns or by a lognormal model fitted to them. The
+deviation/volatility rules used by `BubbleAnalyzer.analyze_bubble_risk` are
+evaluated on every path at every horizon with array operations, and paths are
+split into fixed-size chunks with their own seeds so results are identical no
+matter how many worker processes run them.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Sequence
+import os
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+RISK_LEVELS = ['LOW', 'MODERATE', 'HIGH']
+
+def risk_level_codes(deviation, volatility):
+    """Vectorized risk rules: 0 = LOW, 1 = MODERATE, 2 = HIGH (inputs in percent)."""
+    # Inputs keep their float width so large float32 cubes are not upcast
+    deviation = np.asarray(deviation)
+    volatility = np.asarray(volatility)
+    high = (deviation > 40) | ((deviation > 20) & (volatility > 30))
+    moderate = (deviation > 20) | ((deviation > 10) & (volatility > 20))
+    # Every HIGH case is also MODERATE, so the codes are the sum of the two masks
+    return moderate.astype(np.int8) + high
+
+def _bootstrap_returns(rng, returns, n_paths, n_steps, block_size):
+    """Stationary block bootstrap of `returns` into an (n_paths, n_steps) array."""
+    n = len(returns)
+    idx = np.empty((n_paths, n_steps), dtype=np.int64)
+    idx[:, 0] = rng.integers(0, n, n_paths)
+    new_block = rng.random((n_paths, n_steps)) < 1.0 / block_size
+    starts = rng.integers(0, n, (n_paths, n_steps))
+    for step in range(1, n_steps):
+        idx[:, step] = np.where(new_block[:, step], starts[:, step], (idx[:, step - 1] + 1) % n)
+    return returns[idx]
+
+def _lognormal_returns(rng, returns, n_paths, n_steps):
+    """Simple returns from a lognormal model fitted to historical returns."""
+    log_returns = np.log1p(returns)
+    draws = rng.normal(log_returns.mean(), log_returns.std(ddof=1), (n_paths, n_steps))
+    return np.expm1(draws)
+
+def _simulate_chunk(args) -> np.ndarray:
+    """Simulate one chunk of paths and count risk levels per horizon."""
+    (seed, n_paths, history, horizons, window, method, block_size) = args
+    rng = np.random.default_rng(seed)
+    returns = history[1:] / history[:-1] - 1
+    n_steps = max(horizons)
+
+    if method == 'bootstrap':
+        path_returns = _bootstrap_returns(rng, returns, n_paths, n_steps, block_size)
+    else:
+        path_returns = _lognormal_returns(rng, returns, n_paths, n_steps)
+    paths = history[-1] * np.cumprod(1 + path_returns, axis=1)
+
+    # Moving average over the last `window` values, mixing history and path
+    tail = np.broadcast_to(history[-(window - 1):], (n_paths, window - 1))
+    full = np.concatenate([tail, paths], axis=1)
+    cumulative = np.concatenate([np.zeros((n_paths, 1)), np.cumsum(full, axis=1)], axis=1)
+
+    # Volatility of returns over the whole history plus the path so far
+    sum_returns = returns.sum() + np.cumsum(path_returns, axis=1)
+    sum_squares = (returns ** 2).sum() + np.cumsum(path_returns ** 2, axis=1)
+
+    counts = np.zeros((len(horizons), len(RISK_LEVELS)), dtype=np.int64)
+    for i, h in enumerate(horizons):
+        end = window - 1 + h
+        moving_average = (cumulative[:, end] - cumulative[:, end - window]) / window
+        deviation = (paths[:, h - 1] / moving_average - 1) * 100
+        n_obs = len(returns) + h
+        variance = (sum_squares[:, h - 1] - sum_returns[:, h - 1] ** 2 / n_obs) / (n_obs - 1)
+        volatility = np.sqrt(np.maximum(variance, 0)) * 100
+        counts[i] = np.bincount(risk_level_codes(deviation, volatility), minlength=len(RISK_LEVELS))
+    return counts
+
+class BubbleRegimeSimulator:
+    def __init__(self, n_paths: int = 10000, horizons: Sequence[int] = (1, 3, 6, 12),
+                 window: int = 12, method: str = 'bootstrap', block_size: int = 3,
+                 seed: int = 42, n_workers: int = None, chunk_size: int = 2500):
+        """Configure the simulation; `n_workers=1` runs everything in-process."""
+        if method not in ('bootstrap', 'lognormal'):
+            raise ValueError(f"Unknown simulation method: {method}")
+        if not horizons or any(int(h) < 1 for h in horizons):
+            raise ValueError(f"Horizons must be a non-empty sequence of positive steps: {list(horizons)}")
+        self.n_paths = n_paths
+        self.horizons = sorted(int(h) for h in horizons)
+        self.window = window
+        self.method = method
+        self.block_size = block_size
+        self.seed = seed
+        self.n_workers = n_workers or min(4, os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+
+    def simulate(self, history: Sequence[float]) -> Dict:
+        """Simulate forward paths from `history` and return level probabilities per horizon."""
+        history = np.asarray(history, dtype=float)
+        history = history[~np.isnan(history)]
+        if len(history) < max(self.window, 3):
+            raise ValueError(f"Need at least {max(self.window, 3)} observations to simulate")
+
+        chunk_sizes = [self.chunk_size] * (self.n_paths // self.chunk_size)
+        if self.n_paths % self.chunk_size:
+            chunk_sizes.append(self.n_paths % self.chunk_size)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(chunk_sizes))
+        tasks = [
+            (seed, size, history, self.horizons, self.window, self.method, self.block_size)
+            for seed, size in zip(seeds, chunk_sizes)
+        ]
+
+        if self.n_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.n_workers, len(tasks))) as pool:
+                results = list(pool.map(_simulate_chunk, tasks))
+        else:
+            results = [_simulate_chunk(task) for task in tasks]
+        counts = np.sum(results, axis=0)
+
+        return {
+            'n_paths': self.n_paths,
+            'method': self.method,
+            'seed': self.seed,
+            'horizons': {
+                h: {level: float(counts[i, j]) / self.n_paths for j, level in enumerate(RISK_LEVELS)}
+                for i, h in enumerate(self.horizons)
+            }
+        }
@@ -0,0 +1,187 @@
+"""
+Streaming quantile sketches used for percentile-based score normalization.
+
+`QuantileSketch` is a DDSketch-style log-bucketed histogram: values fall into
+buckets whose width grows geometrically, which bounds the relative error of
+every quantile while keeping memory proportional to the log of the value
+range rather than to the number of observations. Sketches with the same
+accuracy merge exactly by adding bucket counts.
+"""
+
+import json
+import math
+import os
+from typing import Dict, Iterable, Optional
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-9):
+        """Create an empty sketch with the given relative accuracy."""
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+        self._cdf = None
+
+    def _keys(self, magnitudes: np.ndarray) -> np.ndarray:
+        """Map strictly positive magnitudes to bucket keys."""
+        return np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64)
+
+    def _bucket_value(self, key: int) -> float:
+        """Representative value of a positive bucket (relative error <= alpha)."""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def update(self, values: Iterable[float]):
+        """Add a batch of observations; NaNs are ignored."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        small = np.abs(values) < self.min_value
+        self.zero_count += int(small.sum())
+        for store, selected in ((self.positive, values[(values > 0) & ~small]),
+                                (self.negative, -values[(values < 0) & ~small])):
+            if selected.size:
+                keys, counts = np.unique(self._keys(selected), return_counts=True)
+                for key, count in zip(keys.tolist(), counts.tolist()):
+                    store[key] = store.get(key, 0) + count
+        self.count += int(values.size)
+        self._cdf = None
+
+    def add(self, value: float):
+        """Add a single observation."""
+        self.update([value])
+
+    def merge(self, other: 'QuantileSketch'):
+        """Fold another sketch with the same accuracy into this one."""
+        if not math.isclose(self.gamma, other.gamma):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self._cdf = None
+
+    def _build_cdf(self):
+        """Cache bucket values in ascending order with their cumulative counts."""
+        values = [-self._bucket_value(key) for key in self.negative]
+        counts = list(self.negative.values())
+        if self.zero_count:
+            values.append(0.0)
+            counts.append(self.zero_count)
+        values += [self._bucket_value(key) for key in self.positive]
+        counts += list(self.positive.values())
+        order = np.argsort(values)
+        values = np.asarray(values, dtype=float)[order]
+        counts = np.asarray(counts, dtype=float)[order]
+        self._cdf = (values, counts, np.cumsum(counts))
+
+    def _bucket_of(self, value: float) -> float:
+        """Representative value of the bucket `value` falls into."""
+        if abs(value) < self.min_value:
+            return 0.0
+        key = int(self._keys(np.array([abs(value)]))[0])
+        return math.copysign(self._bucket_value(key), value)
+
+    def percentile(self, value: float) -> Optional[float]:
+        """Return the fraction of observations at or below `value` (mid-rank within its bucket)."""
+        if self.count == 0:
+            return None
+        if self._cdf is None:
+            self._build_cdf()
+        values, counts, cumulative = self._cdf
+        bucket = self._bucket_of(value)
+        idx = int(np.searchsorted(values, bucket, side='left'))
+        below = cumulative[idx - 1] if idx > 0 else 0.0
+        within = counts[idx] if idx < len(values) and values[idx] == bucket else 0.0
+        return float((below + within / 2) / self.count)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the approximate value at quantile `q` in [0, 1]."""
+        if self.count == 0:
+            return None
+        if self._cdf is None:
+            self._build_cdf()
+        values, _, cumulative = self._cdf
+        rank = q * (self.count - 1)
+        idx = int(np.searchsorted(cumulative, rank, side='right'))
+        return float(values[min(idx, len(values) - 1)])
+
+    def to_dict(self) -> Dict:
+        """Serialize the sketch to plain JSON types."""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'min_value': self.min_value,
+            'positive': {str(k): v for k, v in self.positive.items()},
+            'negative': {str(k): v for k, v in self.negative.items()},
+            'zero_count': self.zero_count,
+            'count': self.count
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QuantileSketch':
+        """Rebuild a sketch serialized with `to_dict`."""
+        sketch = cls(data['relative_accuracy'], data['min_value'])
+        sketch.positive = {int(k): v for k, v in data['positive'].items()}
+        sketch.negative = {int(k): v for k, v in data['negative'].items()}
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        return sketch
+
+
+class MetricSketches:
+    def __init__(self, relative_accuracy: float = 0.01):
+        """One quantile sketch per scoring metric, created on first observation."""
+        self.relative_accuracy = relative_accuracy
+        self.sketches = {}
+
+    def observe(self, metrics: Dict[str, float]):
+        """Add one observation per metric (e.g. one ticker of one snapshot)."""
+        for metric, value in metrics.items():
+            self.observe_many(metric, [value])
+
+    def observe_many(self, metric: str, values: Iterable[float]):
+        """Add a batch of observations for a single metric."""
+        if metric not in self.sketches:
+            self.sketches[metric] = QuantileSketch(self.relative_accuracy)
+        self.sketches[metric].update(values)
+
+    def percentile(self, metric: str, value: float) -> Optional[float]:
+        """Percentile of `value` within the metric's history, or None if unseen."""
+        sketch = self.sketches.get(metric)
+        return sketch.percentile(value) if sketch is not None else None
+
+    def merge(self, other: 'MetricSketches'):
+        """Merge another set of sketches (e.g. from a different shard or period)."""
+        for metric, sketch in other.sketches.items():
+            if metric in self.sketches:
+                self.sketches[metric].merge(sketch)
+            else:
+                self.sketches[metric] = QuantileSketch.from_dict(sketch.to_dict())
+
+    def save(self, path: str):
+        """Persist all sketches to a JSON file."""
+        with open(path, 'w') as f:
+            json.dump({metric: sketch.to_dict() for metric, sketch in self.sketches.items()}, f)
+
+    @classmethod
+    def load(cls, path: str, relative_accuracy: float = 0.01) -> 'MetricSketches':
+        """Load sketches saved with `save`; returns an empty set if the file is missing."""
+        sketches = cls(relative_accuracy)
+        if not os.path.exists(path):
+            return sketches
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            sketches.sketches = {metric: QuantileSketch.from_dict(d) for metric, d in data.items()}
+        except Exception as e:
+            logger.error(f"Error loading metric sketches from {path}: {e}")
+        return sketches
@@ -0,0 +1,146 @@
+"""
+Multi-window, multi-ticker bubble risk panel.
+
+`analyze_bubble_risk` scores one series with one 12-period window. The panel
+applies the same deviation-from-moving-average and return-volatility rules to
+every series and every window length at once and returns
+tickers x windows x time cubes.
+
+Window sums come from one cumulative sum per input (prices, valid-value
+counts, returns, squared returns); each window is then a difference of two
+shifted prefix-sum slices across all tickers and periods, so the cost does not
+depend on the window length and no per-combination `rolling` call is needed.
+Volatility is the sample standard deviation of the last `w` simple returns,
+i.e. a rolling version of the full-sample volatility used by
+`analyze_bubble_risk`.
+"""
+
+from typing import Sequence
+import numpy as np
+import pandas as pd
+from src.analysis.monte_carlo import RISK_LEVELS, risk_level_codes
+from src.utils.config import RISK_PANEL_CONFIG
+
+UNKNOWN_LEVEL = -1
+
+def _prefix_sums(values: np.ndarray) -> np.ndarray:
+    """Cumulative sums along time with a leading zero column: (n, T) -> (n, T + 1)."""
+    prefix = np.zeros((values.shape[0], values.shape[1] + 1))
+    np.cumsum(values, axis=1, out=prefix[:, 1:])
+    return prefix
+
+def _window_sums(prefix: np.ndarray, window: int) -> np.ndarray:
+    """Sum of the trailing `window` values ending at each period from `window - 1` on."""
+    return prefix[:, window:] - prefix[:, :-window]
+
+def _fill_block(x: np.ndarray, windows: Sequence[int], deviation: np.ndarray, volatility: np.ndarray):
+    """Write deviation and volatility for a block of series into the output cube slices."""
+    T = x.shape[1]
+    valid = np.isfinite(x)
+    # Without gaps every window past the warm-up is complete and counts can be skipped
+    complete = bool(valid.all())
+    level_prefix = _prefix_sums(np.where(valid, x, 0.0))
+    count_prefix = None if complete else _prefix_sums(valid.astype(float))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = x[:, 1:] / x[:, :-1] - 1
+    returns_valid = np.isfinite(returns)
+    # Centering per series keeps the sum-of-squares variance numerically stable
+    returns = np.where(returns_valid, returns, 0.0)
+    center = returns.sum(axis=1, keepdims=True) / np.maximum(returns_valid.sum(axis=1, keepdims=True), 1)
+    centered = np.where(returns_valid, returns - center, 0.0)
+    return_prefix = _prefix_sums(centered)
+    square_prefix = _prefix_sums(np.square(centered, out=centered))
+    returns_complete = bool(returns_valid.all())
+    return_count_prefix = None if returns_complete else _prefix_sums(returns_valid.astype(float))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for k, window in enumerate(windows):
+            if window <= T:
+                # x / mean - 1 in percent, computed in place on the window sums
+                values = _window_sums(level_prefix, window)
+                np.divide(x[:, window - 1:], values, out=values)
+                values *= 100.0 * window
+                values -= 100.0
+                if not complete:
+                    values[_window_sums(count_prefix, window) != window] = np.nan
+                deviation[:, k, window - 1:] = values
+
+            # Returns start at period 1, so a window of w returns ends at period w or later
+            if 2 <= window <= T - 1:
+                s1 = _window_sums(return_prefix, window)
+                variance = _window_sums(square_prefix, window)
+                np.square(s1, out=s1)
+                s1 /= window
+                variance -= s1
+                variance /= window - 1
+                np.maximum(variance, 0.0, out=variance)
+                np.sqrt(variance, out=variance)
+                variance *= 100.0
+                if not returns_complete:
+                    variance[_window_sums(return_count_prefix, window) != window] = np.nan
+                volatility[:, k, window:] = variance
+
+def compute_risk_cubes(values, windows: Sequence[int], dtype=np.float32):
+    """Deviation (%), volatility (%) and risk level codes for each series and window.
+
+    `values` is an (n_series, n_periods) array; NaNs mark missing periods and a
+    window only produces a value when all of its periods are present. Returns
+    three (n_series, n_windows, n_periods) arrays; level codes index
+    `RISK_LEVELS`, with -1 where either input is undefined.
+    """
+    x = np.asarray(values, dtype=float)
+    if x.ndim != 2:
+        raise ValueError("values must be a 2-D (series, periods) array")
+    if any(window < 1 for window in windows):
+        raise ValueError(f"Window lengths must be positive, got {list(windows)}")
+    n, T = x.shape
+
+    deviation = np.full((n, len(windows), T), np.nan, dtype=dtype)
+    volatility = np.full((n, len(windows), T), np.nan, dtype=dtype)
+    # Blocks of series small enough that the float64 temporaries stay in cache
+    block = max(1, RISK_PANEL_CONFIG['block_values'] // max(T, 1))
+    for start in range(0, n, block):
+        rows = slice(start, start + block)
+        _fill_block(x[rows], windows, deviation[rows], volatility[rows])
+
+    levels = risk_level_codes(deviation, volatility)
+    levels[np.isnan(deviation) | np.isnan(volatility)] = UNKNOWN_LEVEL
+    return deviation, volatility, levels
+
+class RiskPanel:
+    def __init__(self, tickers, windows, index, deviation, volatility, levels):
+        """Risk cubes indexed by (ticker, window, period)."""
+        self.tickers = list(tickers)
+        self.windows = list(windows)
+        self.index = index
+        self.deviation = deviation
+        self.volatility = volatility
+        self.levels = levels
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, windows: Sequence[int] = None, dtype=None) -> 'RiskPanel':
+        """Build the panel from a wide frame: one column per ticker, one row per period."""
+        windows = list(windows or RISK_PANEL_CONFIG['windows'])
+        dtype = dtype or RISK_PANEL_CONFIG['dtype']
+        deviation, volatility, levels = compute_risk_cubes(frame.to_numpy(dtype=float).T, windows, dtype)
+        return cls(frame.columns, windows, frame.index, deviation, volatility, levels)
+
+    def _cube(self, metric: str) -> np.ndarray:
+        if metric not in ('deviation', 'volatility', 'levels'):
+            raise ValueError(f"Unknown panel metric: {metric}")
+        return getattr(self, metric)
+
+    def frame(self, metric: str, window: int) -> pd.DataFrame:
+        """One window of a metric as a time x tickers frame."""
+        cube = self._cube(metric)
+        return pd.DataFrame(cube[:, self.windows.index(window), :].T, index=self.index, columns=self.tickers)
+
+    def latest(self, metric: str = 'levels') -> pd.DataFrame:
+        """The last period of a metric as a tickers x windows frame; levels are named."""
+        values = self._cube(metric)[:, :, -1]
+        if metric == 'levels':
+            # Unknown (-1) picks the trailing None
+            names = np.array(list(RISK_LEVELS) + [None], dtype=object)
+            values = names[values]
+        return pd.DataFrame(values, index=self.tickers, columns=self.windows)
@@ -0,0 +1,155 @@
+"""
+Team watchlists over one shared collection and scoring pass.
+
+`config/tickers.json` may define `watchlists`, each with its own tickers and
+optional composite weights (merged over `RISK_SCORING_CONFIG['weights']`).
+The collector works on the union of all lists, so a ticker on several lists
+is fetched and its component scores computed once. A watchlist's scores are
+a projection of those shared component scores: the bubble risk of every
+ticker under every distinct weight vector is one (tickers x 5) @ (5 x
+weight vectors) product, and each list reads its rows from its column.
+Adding a watchlist adds at most one column.
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from src.analysis.weight_sweep import WEIGHT_COMPONENTS, WEIGHT_KEYS, RISK_THRESHOLDS
+from src.storage.score_index import ScoreIndex
+from src.utils.config import PATHS, RISK_SCORING_CONFIG
+from src.utils.helpers import load_config, logger
+
+# Index columns in `weight_vector` order
+COMPONENT_COLUMNS = [WEIGHT_COMPONENTS[key] for key in WEIGHT_KEYS]
+
+# `BubbleScorer.get_risk_level` labels, one per band between `RISK_THRESHOLDS`
+RISK_LEVEL_LABELS = np.array(['Minimal Risk', 'Low Risk', 'Moderate Risk', 'High Risk', 'Extreme Risk'], dtype=object)
+
+def risk_levels(values) -> np.ndarray:
+    """Vectorized `BubbleScorer.get_risk_level`."""
+    return RISK_LEVEL_LABELS[np.searchsorted(RISK_THRESHOLDS, values, side='right')]
+
+class Watchlist:
+    def __init__(self, name: str, tickers: Iterable[str], weights: Optional[Dict[str, float]] = None):
+        """A named ticker list scored with `weights` (defaults from `RISK_SCORING_CONFIG`).
+
+        The merged weights are normalized to sum to 1 so bubble risk stays on
+        the [0, 1] scale the risk levels are defined on.
+        """
+        unknown = set(weights or {}) - set(WEIGHT_KEYS)
+        if unknown:
+            raise ValueError(f"Watchlist {name}: unknown weights {sorted(unknown)}")
+        merged = {key: float(value) for key, value in dict(RISK_SCORING_CONFIG['weights'], **(weights or {})).items()}
+        negative = sorted(key for key, value in merged.items() if value < 0)
+        if negative:
+            raise ValueError(f"Watchlist {name}: negative weights {negative}")
+        total = sum(merged.values())
+        if total <= 0:
+            raise ValueError(f"Watchlist {name}: weights sum to zero")
+        self.name = name
+        self.tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        self.weights = {key: value / total for key, value in merged.items()}
+
+    def weight_vector(self) -> tuple:
+        return tuple(float(self.weights[key]) for key in WEIGHT_KEYS)
+
+def load_watchlists(ticker_config: Dict) -> Dict[str, Watchlist]:
+    """Watchlists from a tickers config; the top-level `tickers` list is the `default` watchlist.
+
+    An invalid watchlist is logged and skipped, so one bad entry doesn't stop
+    collection or the API for the others.
+    """
+    specs = {}
+    if ticker_config.get('tickers'):
+        specs['default'] = {'tickers': ticker_config['tickers']}
+    specs.update(ticker_config.get('watchlists', {}))
+    watchlists = {}
+    for name, spec in specs.items():
+        try:
+            watchlists[name] = Watchlist(name, spec.get('tickers', []), spec.get('weights'))
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.error(f"Skipping invalid watchlist {name}: {e}")
+    return watchlists
+
+def collection_universe(ticker_config: Dict) -> List[str]:
+    """Every ticker on any watchlist, each once, in first-listed order."""
+    return list(dict.fromkeys(
+        ticker for watchlist in load_watchlists(ticker_config).values() for ticker in watchlist.tickers
+    ))
+
+class WatchlistProjector:
+    def __init__(self, score_index: ScoreIndex = None, tickers_file: str = None):
+        """Per-watchlist views of the latest indexed component scores."""
+        self.score_index = score_index or ScoreIndex()
+        self.tickers_file = tickers_file or PATHS['tickers_file']
+        self.watchlists = {}
+        self._config_mtime = None
+        self._version = None
+        self._projections = {}
+        self._lock = threading.Lock()
+
+    def _reload_watchlists(self):
+        mtime = os.path.getmtime(self.tickers_file) if os.path.exists(self.tickers_file) else None
+        if mtime != self._config_mtime:
+            self.watchlists = load_watchlists(load_config(self.tickers_file))
+            self._config_mtime = mtime
+            self._version = None
+
+    def config_revision(self):
+        """Modification time of the loaded watchlist config."""
+        with self._lock:
+            self._reload_watchlists()
+            return self._config_mtime
+
+    def _project(self):
+        """Score every watchlist from one read of the shared components and one matrix product."""
+        tickers = list(dict.fromkeys(t for watchlist in self.watchlists.values() for t in watchlist.tickers))
+        rows = self.score_index.get_latest_for(tickers)
+        found = [row for row in rows if all(row[column] is not None for column in COMPONENT_COLUMNS)]
+        position = {row['ticker']: i for i, row in enumerate(found)}
+        components = np.array([[row[column] for column in COMPONENT_COLUMNS] for row in found], dtype=float)
+        components = components.reshape(len(found), len(COMPONENT_COLUMNS))
+
+        vectors = list(dict.fromkeys(watchlist.weight_vector() for watchlist in self.watchlists.values()))
+        risk = components @ np.array(vectors, dtype=float).reshape(len(vectors), len(WEIGHT_KEYS)).T
+
+        self._projections = {}
+        for name, watchlist in self.watchlists.items():
+            members = [ticker for ticker in watchlist.tickers if ticker in position]
+            values = risk[[position[ticker] for ticker in members], vectors.index(watchlist.weight_vector())]
+            levels = risk_levels(values)
+            order = np.argsort(-values, kind='stable')
+            self._projections[name] = [
+                {
+                    'ticker': members[i],
+                    'timestamp': found[position[members[i]]]['timestamp'],
+                    'bubble_risk': float(values[i]),
+                    'risk_level': levels[i],
+                    'component_scores': {column: found[position[members[i]]][column] for column in COMPONENT_COLUMNS}
+                }
+                for i in order
+            ]
+        logger.info(f"Projected {len(self.watchlists)} watchlists over {len(found)} tickers "
+                    f"with {len(vectors)} weight vectors")
+
+    def scores(self, name: str) -> Optional[List[Dict]]:
+        """Latest scores of a watchlist under its own weights, highest risk first; None if unknown."""
+        with self._lock:
+            self._reload_watchlists()
+            if name not in self.watchlists:
+                return None
+            version = self.score_index.version()
+            if version != self._version:
+                self._project()
+                self._version = version
+            return self._projections[name]
+
+    def describe(self) -> List[Dict]:
+        """Name, tickers and weights of every watchlist."""
+        with self._lock:
+            self._reload_watchlists()
+        return [
+            {'name': watchlist.name, 'tickers': watchlist.tickers, 'weights': watchlist.weights}
+            for watchlist in self.watchlists.values()
+        ]
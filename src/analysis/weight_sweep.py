@@ -0,0 +1,116 @@
+"""
+Sensitivity of the composite bubble risk to its component weights.
+
+`BubbleScorer` combines five component scores with fixed weights. A sweep
+draws candidate weight vectors from a Dirichlet distribution centred on the
+current weights and replays the stored component-score history under every
+one of them. The composite is linear in the weights, so the bubble risk of
+every observation under every candidate is a single (observations x 5) @
+(5 x candidates) product, evaluated in blocks of observations to bound memory.
+
+Candidates are ranked by stability (mean absolute change of a ticker's risk
+between consecutive cycles) and by how often a ticker's `get_risk_level`
+band changes. Candidate 0 is always the current weights, as a reference.
+"""
+
+from typing import Dict, Optional, Sequence
+import numpy as np
+import pandas as pd
+from src.storage.score_index import ScoreIndex, COMPONENT_COLUMNS
+from src.utils.config import RISK_SCORING_CONFIG, WEIGHT_SWEEP_CONFIG
+from src.utils.helpers import logger
+
+# `BubbleScorer.weights` keys and the component score each one multiplies, in `COMPONENT_COLUMNS` order
+WEIGHT_COMPONENTS = {
+    'valuation_metrics': 'valuation_score',
+    'sentiment_metrics': 'sentiment_score',
+    'growth_metrics': 'growth_score',
+    'ai_exposure': 'ai_exposure_score',
+    'market_metrics': 'market_score'
+}
+WEIGHT_KEYS = list(WEIGHT_COMPONENTS)
+
+# Band edges of `BubbleScorer.get_risk_level`, ascending
+RISK_THRESHOLDS = sorted(RISK_SCORING_CONFIG['thresholds'].values())
+
+def candidate_weights(n_candidates: int, base: Optional[Dict[str, float]] = None,
+                      concentration: float = None, seed: int = None) -> np.ndarray:
+    """(n_candidates, 5) weight vectors summing to 1, in `COMPONENT_COLUMNS` order.
+
+    Row 0 is `base` itself; the rest are Dirichlet draws with mean `base`.
+    """
+    base = base or RISK_SCORING_CONFIG['weights']
+    concentration = concentration or WEIGHT_SWEEP_CONFIG['concentration']
+    seed = WEIGHT_SWEEP_CONFIG['seed'] if seed is None else seed
+    mean = np.array([base[key] for key in WEIGHT_KEYS], dtype=float)
+    mean /= mean.sum()
+    rng = np.random.default_rng(seed)
+    candidates = np.empty((n_candidates, len(WEIGHT_KEYS)))
+    candidates[0] = mean
+    candidates[1:] = rng.dirichlet(mean * concentration, n_candidates - 1)
+    return candidates
+
+def sweep_weights(components, tickers, candidates, thresholds: Sequence[float] = None,
+                  block_values: int = None) -> pd.DataFrame:
+    """Score every candidate over the component history.
+
+    `components` is (n_obs, 5) in `COMPONENT_COLUMNS` order and `tickers` the
+    ticker of each row; rows must be ordered by ticker, then time. Returns one
+    row per candidate with its weights, `mean_abs_change`, `crossing_rate`
+    (band changes per consecutive pair), `high_risk_share` and ranks, best first.
+    """
+    X = np.asarray(components, dtype=np.float32)
+    W = np.asarray(candidates, dtype=np.float32)
+    tickers = np.asarray(tickers)
+    thresholds = np.asarray(sorted(thresholds or RISK_THRESHOLDS), dtype=np.float32)
+    n_obs, k = X.shape[0], W.shape[0]
+    high_level = len(thresholds) - 1  # "High Risk" and above
+
+    # 1 where row i and row i + 1 are consecutive cycles of the same ticker
+    continuing = (tickers[1:] == tickers[:-1]).astype(np.float32)
+    n_pairs = float(continuing.sum())
+
+    abs_change = np.zeros(k)
+    crossings = np.zeros(k)
+    elevated = np.zeros(k)
+    rows = max(2, (block_values or WEIGHT_SWEEP_CONFIG['block_values']) // max(k, 1))
+    start = 0
+    while start < n_obs:
+        stop = min(start + rows, n_obs)
+        risk = X[start:stop] @ W.T
+        levels = np.zeros(risk.shape, dtype=np.int8)
+        for threshold in thresholds:
+            levels += risk >= threshold
+        # Blocks overlap by one row so pairs across block edges are counted once
+        first = 1 if start else 0
+        elevated += (levels[first:] >= high_level).sum(axis=0)
+        if stop - start > 1:
+            mask = continuing[start:stop - 1]
+            abs_change += mask @ np.abs(np.diff(risk, axis=0))
+            crossings += mask @ (levels[1:] != levels[:-1]).astype(np.float32)
+        if stop == n_obs:
+            break
+        start = stop - 1
+
+    result = pd.DataFrame(W.astype(float), columns=WEIGHT_KEYS)
+    result.index.name = 'candidate'
+    result['mean_abs_change'] = abs_change / n_pairs if n_pairs else np.nan
+    result['crossing_rate'] = crossings / n_pairs if n_pairs else np.nan
+    result['high_risk_share'] = elevated / n_obs if n_obs else np.nan
+    result['stability_rank'] = result['mean_abs_change'].rank(method='min')
+    result['crossing_rank'] = result['crossing_rate'].rank(method='min')
+    result['rank'] = ((result['stability_rank'] + result['crossing_rank']) / 2).rank(method='min')
+    return result.sort_values(['rank', 'mean_abs_change'], kind='stable')
+
+def run_weight_sweep(score_index: ScoreIndex = None, n_candidates: int = None,
+                     start: Optional[str] = None, end: Optional[str] = None, seed: int = None) -> pd.DataFrame:
+    """Sweep candidate weights over the score index history between `start` and `end`."""
+    index = score_index or ScoreIndex()
+    history = index.get_component_history(start, end)
+    if not history:
+        raise ValueError("No component score history in the index")
+    tickers = np.array([row[0] for row in history])
+    components = np.array([row[2:] for row in history], dtype=np.float32)
+    candidates = candidate_weights(n_candidates or WEIGHT_SWEEP_CONFIG['n_candidates'], seed=seed)
+    logger.info(f"Sweeping {len(candidates)} weight vectors over {len(history)} scores")
+    return sweep_weights(components, tickers, candidates)
@@ -0,0 +1,3 @@
+"""
+Read API module for the AI Bubble Dashboard.
+"""
@@ -0,0 +1,244 @@
+"""
+Streaming bulk export of score, aggregate and raw market data history.
+
+`scores` and `aggregates` are read from the `ScoreIndex` a chunk at a time.
+The index holds only scores, price and market cap. `market_data` streams the
+collected fields themselves (valuation ratios, volumes, AI metrics, news and
+forum volumes, filing counts) from the `market_data_*.json` snapshots, one
+file at a time. Rows are encoded as they go: CSV is gzip-compressed
+incrementally, and Parquet (when pyarrow is installed) is written one
+compressed row group per chunk. Memory stays bounded however much history is
+requested, and the HTTP endpoint and the `--mode export` CLI share the same
+generator.
+"""
+
+import io
+import os
+import csv
+import json
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+from flask import Response, jsonify, request, stream_with_context
+from src.analysis.bubble_scorer import sentiment_summary
+from src.storage.score_index import ScoreIndex, SCORE_COLUMNS, AGGREGATE_COLUMNS
+from src.utils.config import EXPORT_CONFIG, PATHS, READ_API_CONFIG
+from src.utils.helpers import logger
+
+EXPORT_FORMATS = ('csv', 'parquet')
+
+# Collected fields exported per ticker and snapshot by the `market_data` dataset
+MARKET_DATA_FIELDS = [
+    'current_price', 'market_cap', 'sector', 'industry', 'pe_ratio', 'forward_pe', 'dividend_yield', 'beta',
+    'volume', 'avg_volume', 'price_change_1d', 'price_change_1w', 'price_change_1m'
+]
+AI_METRIC_FIELDS = ['rd_expense', 'rd_to_revenue', 'patent_count', 'ai_mentions']
+SENTIMENT_FIELDS = ['news_volume', 'n_posts', 'total_comments', 'avg_post_score']
+MARKET_DATA_COLUMNS = (['ticker', 'timestamp'] + MARKET_DATA_FIELDS + AI_METRIC_FIELDS + SENTIMENT_FIELDS
+                       + ['n_sec_filings'])
+
+DATASETS = {'scores': SCORE_COLUMNS, 'aggregates': AGGREGATE_COLUMNS, 'market_data': MARKET_DATA_COLUMNS}
+
+TEXT_COLUMNS = {'ticker', 'timestamp', 'risk_level', 'group_type', 'group_name', 'sector', 'industry'}
+INTEGER_COLUMNS = {'n_members', 'news_volume', 'n_posts', 'total_comments', 'n_sec_filings'}
+
+SNAPSHOT_PREFIX = 'market_data_'
+
+def _snapshot_files(directory: str, start: Optional[str]) -> List[str]:
+    """Snapshot paths in collection order, skipping files written before `start`."""
+    names = sorted(
+        name for name in os.listdir(directory) if name.startswith(SNAPSHOT_PREFIX) and name.endswith('.json')
+    ) if os.path.isdir(directory) else []
+    if start:
+        kept = []
+        for name in names:
+            try:
+                written = datetime.strptime(name[len(SNAPSHOT_PREFIX):-len('.json')], '%Y%m%d_%H%M%S').isoformat()
+            except ValueError:
+                written = None
+            # Files are named after the cycle finished, so one written before `start` holds only earlier data
+            if written is None or written >= start:
+                kept.append(name)
+        names = kept
+    return [os.path.join(directory, name) for name in names]
+
+def _market_data_row(ticker: str, timestamp: str, data: dict) -> tuple:
+    market_data = data.get('market_data') or {}
+    ai_metrics = data.get('ai_metrics') or {}
+    summary = sentiment_summary(data)
+    return (
+        (ticker, timestamp)
+        + tuple(market_data.get(field) for field in MARKET_DATA_FIELDS)
+        + tuple(ai_metrics.get(field) for field in AI_METRIC_FIELDS)
+        + tuple(summary.get(field) for field in SENTIMENT_FIELDS)
+        + (len(data.get('sec_filings') or []),)
+    )
+
+def iter_market_data(directory: str, tickers: Optional[List[str]], start: Optional[str], end: Optional[str],
+                     chunk_size: int) -> Iterator[List[tuple]]:
+    """`MARKET_DATA_COLUMNS` rows from collected snapshots in time order, `chunk_size` at a time."""
+    wanted = set(tickers) if tickers else None
+    chunk = []
+    for path in _snapshot_files(directory, start):
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading snapshot {path} for export: {e}")
+            continue
+        timestamp = snapshot.get('timestamp') or ''
+        if (start and timestamp < start) or (end and timestamp > end):
+            continue
+        for ticker in sorted(snapshot.get('tickers', {})):
+            if wanted is None or ticker in wanted:
+                chunk.append(_market_data_row(ticker, timestamp, snapshot['tickers'][ticker]))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+def _chunks(index: ScoreIndex, dataset: str, tickers: Optional[List[str]], start: Optional[str],
+            end: Optional[str], group_type: Optional[str], chunk_size: int,
+            snapshot_dir: Optional[str]) -> Iterator[List[tuple]]:
+    if dataset == 'scores':
+        return index.iter_history(tickers, start, end, chunk_size)
+    if dataset == 'market_data':
+        return iter_market_data(snapshot_dir or PATHS['data_dir'], tickers, start, end, chunk_size)
+    return index.iter_aggregate_history(group_type, start, end, chunk_size)
+
+def _csv_stream(columns: List[str], chunks: Iterable[List[tuple]], compress: bool) -> Iterator[bytes]:
+    # wbits=31 selects the gzip container, so the output is a regular .csv.gz
+    compressor = zlib.compressobj(EXPORT_CONFIG['gzip_level'], zlib.DEFLATED, 31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def encode() -> bytes:
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows(rows)
+        data = encode()
+        if data:
+            yield data
+    data = encode() + (compressor.flush() if compressor else b"")
+    if data:
+        yield data
+
+class _StreamSink:
+    """Write-only file object that hands out what was written since the last `drain`."""
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+def _parquet_stream(columns: List[str], chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([
+        (column, pa.string() if column in TEXT_COLUMNS else pa.int64() if column in INTEGER_COLUMNS else pa.float64())
+        for column in columns
+    ])
+    sink = _StreamSink()
+    writer = pq.ParquetWriter(sink, schema, compression=EXPORT_CONFIG['parquet_compression'])
+    try:
+        for rows in chunks:
+            writer.write_table(pa.Table.from_pylist([dict(zip(columns, row)) for row in rows], schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def _prime(stream: Iterator[bytes]) -> Iterator[bytes]:
+    """Run a generator to its first chunk now, so setup errors raise here."""
+    first = next(stream, b"")
+
+    def resumed():
+        if first:
+            yield first
+        yield from stream
+    return resumed()
+
+def stream_export(index: ScoreIndex, dataset: str = 'scores', fmt: str = 'csv', tickers: Optional[List[str]] = None,
+                  start: Optional[str] = None, end: Optional[str] = None, group_type: Optional[str] = None,
+                  compress: bool = True, chunk_size: int = None, snapshot_dir: Optional[str] = None) -> Iterator[bytes]:
+    """Encoded export of `dataset` ('scores', 'aggregates' or 'market_data') as a stream of byte chunks.
+
+    Arguments are validated before the generator is returned, so errors
+    surface before any output is sent.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    columns = DATASETS[dataset]
+    chunks = _chunks(index, dataset, tickers, start, end, group_type, chunk_size or EXPORT_CONFIG['chunk_rows'],
+                     snapshot_dir)
+    if fmt == 'parquet':
+        stream = _parquet_stream(columns, chunks)
+        # Import pyarrow (and fail on its absence) now rather than mid-response
+        return _prime(stream)
+    return _csv_stream(columns, chunks, compress)
+
+def export_filename(dataset: str, fmt: str, compress: bool) -> str:
+    return f"{dataset}.{fmt}" + ('.gz' if fmt == 'csv' and compress else '')
+
+def register_export_route(server, score_index=None, snapshot_dir=None):
+    """Register `GET /export` on a Flask server."""
+    index = score_index or ScoreIndex()
+    prefix = READ_API_CONFIG['prefix']
+
+    @server.route(f'{prefix}/export')
+    def export():
+        dataset = request.args.get('dataset', 'scores')
+        fmt = request.args.get('format', 'csv')
+        compress = request.args.get('compress', '1') not in ('0', 'false')
+        tickers = [ticker.strip().upper() for ticker in request.args.get('tickers', '').split(',') if ticker.strip()]
+        try:
+            stream = stream_export(
+                index, dataset, fmt, tickers or None, request.args.get('start'), request.args.get('end'),
+                request.args.get('group_type'), compress, snapshot_dir=snapshot_dir
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        mimetype = 'application/vnd.apache.parquet' if fmt == 'parquet' else 'text/csv'
+        headers = {'Content-Disposition': f"attachment; filename={export_filename(dataset, fmt, compress)}"}
+        if fmt == 'csv' and compress:
+            mimetype = 'application/gzip'
+        return Response(stream_with_context(stream), mimetype=mimetype, headers=headers)
+
+    return index
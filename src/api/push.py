@@ -0,0 +1,74 @@
+"""
+Server-sent events channel that pushes dashboard snapshots to open tabs.
+
+A snapshot is built and serialized once per collection cycle; every connected
+client is then handed the same pre-encoded message, so the work per update
+does not grow with the number of viewers.
+"""
+
+import json
+import threading
+from typing import Dict, Iterator
+from flask import Response
+from plotly.utils import PlotlyJSONEncoder
+from src.utils.config import READ_API_CONFIG
+from src.utils.helpers import logger
+
+# Where assets/push.js reads the stream path, relative to Dash's requests_pathname_prefix
+STREAM_META_NAME = 'snapshot-stream'
+STREAM_PATH = f"{READ_API_CONFIG['prefix']}/stream"
+
+def stream_meta_tag() -> Dict[str, str]:
+    """Dash `meta_tags` entry telling the browser where the stream is served."""
+    return {'name': STREAM_META_NAME, 'content': STREAM_PATH.lstrip('/')}
+
+class SnapshotBroadcaster:
+    def __init__(self, heartbeat: float = 15.0):
+        """`heartbeat` seconds between keep-alive comments on idle connections."""
+        self.heartbeat = heartbeat
+        self.version = 0
+        self.clients = 0
+        self._message = None
+        self._condition = threading.Condition()
+
+    def publish(self, snapshot: Dict):
+        """Serialize a snapshot once and wake every connected client."""
+        payload = json.dumps(snapshot, cls=PlotlyJSONEncoder, separators=(',', ':'))
+        with self._condition:
+            self.version += 1
+            self._message = f"id: {self.version}\ndata: {payload}\n\n".encode()
+            self._condition.notify_all()
+        logger.info(f"Pushed snapshot {self.version} to {self.clients} clients")
+
+    def stream(self) -> Iterator[bytes]:
+        """Yield the latest snapshot on connect, then each new one as it is published."""
+        seen = 0
+        with self._condition:
+            self.clients += 1
+        try:
+            while True:
+                with self._condition:
+                    if self.version == seen:
+                        self._condition.wait(timeout=self.heartbeat)
+                    if self.version == seen:
+                        message = b": keepalive\n\n"
+                    else:
+                        seen = self.version
+                        message = self._message
+                yield message
+        finally:
+            with self._condition:
+                self.clients -= 1
+
+def register_push_route(server, broadcaster: SnapshotBroadcaster):
+    """Expose the broadcaster as an SSE endpoint on a Flask server."""
+
+    @server.route(STREAM_PATH)
+    def snapshot_stream():
+        return Response(
+            broadcaster.stream(),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    return broadcaster
@@ -0,0 +1,140 @@
+"""
+HTTP read API served from the dashboard's Flask server.
+
+Every endpoint answers from the precomputed `ScoreIndex`; nothing here triggers
+data collection. Responses carry an ETag derived from the index version so
+pollers get a cheap 304 when nothing has been written since their last call.
+"""
+
+import hashlib
+from flask import Response, jsonify, request
+from src.storage.score_index import ScoreIndex, parse_filter_query
+from src.analysis.watchlists import WatchlistProjector
+from src.utils.config import READ_API_CONFIG
+
+
+def _page_args():
+    """Parse `limit`/`offset` query parameters, clamped to the configured maximum."""
+    try:
+        limit = int(request.args.get('limit', READ_API_CONFIG['default_page_size']))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return None, None
+    limit = max(1, min(limit, READ_API_CONFIG['max_page_size']))
+    return limit, max(0, offset)
+
+
+def _sort_args():
+    """Parse `sort=-bubble_risk,ticker` into (column, direction) pairs."""
+    sort_by = []
+    for column in filter(None, request.args.get('sort', '').split(',')):
+        direction = 'desc' if column.startswith('-') else 'asc'
+        sort_by.append((column.lstrip('-+'), direction))
+    return sort_by
+
+
+def _paginated(rows, total, limit, offset):
+    """Wrap a page of rows with pagination metadata."""
+    next_offset = offset + limit if offset + limit < total else None
+    return {
+        'data': rows,
+        'pagination': {
+            'limit': limit,
+            'offset': offset,
+            'total': total,
+            'next_offset': next_offset
+        }
+    }
+
+
+def _conditional(index, build_payload, revision=''):
+    """Answer 304 when the client's ETag matches, otherwise build the JSON body."""
+    etag = hashlib.sha1(f"{index.version()}:{revision}:{request.full_path}".encode()).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        payload = build_payload()
+        if payload is None:
+            return jsonify({'error': 'not found'}), 404
+        response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def register_routes(server, score_index=None, watchlists=None):
+    """Register the read API endpoints on a Flask server."""
+    index = score_index or ScoreIndex()
+    projector = watchlists or WatchlistProjector(index)
+    prefix = READ_API_CONFIG['prefix']
+
+    @server.route(f'{prefix}/risk/<ticker>')
+    def risk_history(ticker):
+        limit, offset = _page_args()
+        if limit is None:
+            return jsonify({'error': 'limit and offset must be integers'}), 400
+        start = request.args.get('start')
+        end = request.args.get('end')
+
+        def build():
+            rows, total = index.get_history(ticker.upper(), start, end, limit, offset)
+            return _paginated(rows, total, limit, offset)
+        return _conditional(index, build)
+
+    @server.route(f'{prefix}/scores/latest')
+    def latest_scores():
+        limit, offset = _page_args()
+        if limit is None:
+            return jsonify({'error': 'limit and offset must be integers'}), 400
+
+        def build():
+            filters = parse_filter_query(request.args.get('filter'))
+            rows, total = index.get_latest(limit, offset, _sort_args(), filters)
+            return _paginated(rows, total, limit, offset)
+        try:
+            return _conditional(index, build)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    @server.route(f'{prefix}/aggregates/latest')
+    def latest_aggregates():
+        group_type = request.args.get('group_type')
+        return _conditional(index, lambda: {'data': index.get_latest_aggregates(group_type)})
+
+    @server.route(f'{prefix}/aggregates/<group_type>/<group_name>')
+    def aggregate_history(group_type, group_name):
+        limit, offset = _page_args()
+        if limit is None:
+            return jsonify({'error': 'limit and offset must be integers'}), 400
+        start = request.args.get('start')
+        end = request.args.get('end')
+
+        def build():
+            rows, total = index.get_aggregate_history(group_type, group_name, start, end, limit, offset)
+            return _paginated(rows, total, limit, offset)
+        return _conditional(index, build)
+
+    @server.route(f'{prefix}/components/<ticker>')
+    def component_breakdown(ticker):
+        timestamp = request.args.get('timestamp')
+        return _conditional(index, lambda: index.get_components(ticker.upper(), timestamp))
+
+    @server.route(f'{prefix}/watchlists')
+    def list_watchlists():
+        return jsonify({'data': projector.describe()})
+
+    @server.route(f'{prefix}/watchlists/<name>/scores')
+    def watchlist_scores(name):
+        limit, offset = _page_args()
+        if limit is None:
+            return jsonify({'error': 'limit and offset must be integers'}), 400
+
+        def build():
+            rows = projector.scores(name)
+            if rows is None:
+                return None
+            return _paginated(rows[offset:offset + limit], len(rows), limit, offset)
+        # Editing the watchlists changes the response without writing the index
+        return _conditional(index, build, projector.config_revision())
+
+    return index
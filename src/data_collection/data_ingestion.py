@@ -8,6 +8,9 @@ import yfinance as yf
 from bs4 import BeautifulSoup
 from sec_api import QueryApi
 from dotenv import load_dotenv
+from src.storage.filing_store import FilingStore, PERIODIC_FORMS
+from src.utils.config import SEC_FILING_CONFIG
+from src.utils.helpers import logger
 
 load_dotenv()
 
@@ -16,9 +19,15 @@ class DataIngestion:
         self.fmp_api_key = os.getenv('FMP_API_KEY')
         self.sec_api_key = os.getenv('SEC_API_KEY')
         self.base_url = "https://financialmodelingprep.com/api/v3"
+        self.filing_store = FilingStore()
+        self.sec_requests = 0
+        self._prefetched_filings = {}
         
     def fetch_sec_filings(self, ticker):
         """Fetch recent SEC filings for a given ticker."""
+        if ticker in self._prefetched_filings:
+            return self._prefetched_filings[ticker]
+
         query = {
             "query": {
                 "query_string": {
@@ -32,12 +41,87 @@ class DataIngestion:
         
         sec_api = QueryApi(api_key=self.sec_api_key)
         try:
+            self.sec_requests += 1
             response = sec_api.get_filings(query)
             return response['filings']
         except Exception as e:
             print(f"Error fetching SEC filings for {ticker}: {e}")
             return []
 
+    def _paginate_filings(self, sec_api, query_string):
+        """Every filing matching a query, newest first, one page per request.
+
+        sec-api will not page past `max_results`; past that the oldest matches
+        are dropped and a warning is logged.
+        """
+        page_size = SEC_FILING_CONFIG['page_size']
+        seen = set()
+        start = 0
+        while start < SEC_FILING_CONFIG['max_results']:
+            self.sec_requests += 1
+            page = sec_api.get_filings({
+                "query": {"query_string": {"query": query_string}},
+                "from": str(start),
+                "size": str(page_size),
+                "sort": [{"filedAt": {"order": "desc"}}]
+            }).get('filings', [])
+            for filing in page:
+                # Filings made while paging shift later pages down, repeating a few matches
+                if filing.get('accessionNo') not in seen:
+                    seen.add(filing.get('accessionNo'))
+                    yield filing
+            if len(page) < page_size:
+                return
+            start += len(page)
+        logger.warning(f"SEC filing query hit the {SEC_FILING_CONFIG['max_results']} result limit; "
+                       f"older filings were skipped: {query_string[:200]}")
+
+    def fetch_sec_filings_batch(self, tickers):
+        """Fetch filings of many tickers with one paginated query per batch, split per ticker.
+
+        Only filings on or after each ticker's last stored or recorded filing date are
+        requested (the last `initial_lookback_days` for a ticker with none), so a poll
+        with no new filings returns almost nothing. The metadata of every filing found
+        is recorded, so the watermark advances even if no document is downloaded.
+        Each ticker gets its `recent_filings` most recent filings, newest first, from
+        what was fetched now and before. Tickers whose batch failed are left out.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        last_filed = self.filing_store.last_filed(tickers)
+        default_since = (datetime.now() - timedelta(days=SEC_FILING_CONFIG['initial_lookback_days'])).strftime('%Y-%m-%d')
+        since = {ticker: last_filed.get(ticker, default_since) for ticker in tickers}
+        # Tickers with similar watermarks share a batch, so one stale ticker doesn't widen every range
+        ordered = sorted(tickers, key=since.get)
+        batch_size = SEC_FILING_CONFIG['query_batch_size']
+
+        sec_api = QueryApi(api_key=self.sec_api_key)
+        filings = {}
+        for i in range(0, len(ordered), batch_size):
+            batch = ordered[i:i + batch_size]
+            lower = since[batch[0]]
+            query_string = (f"ticker:({' OR '.join(batch)}) AND formType:(10-K OR 10-Q OR 8-K) "
+                            f"AND filedAt:[{lower} TO *]")
+            try:
+                found = {ticker: [] for ticker in batch}
+                for filing in self._paginate_filings(sec_api, query_string):
+                    ticker = filing.get('ticker')
+                    if ticker in found and (filing.get('filedAt') or '') >= since[ticker]:
+                        found[ticker].append(filing)
+            except Exception as e:
+                print(f"Error fetching SEC filings for {len(batch)} tickers: {e}")
+                continue
+            self.filing_store.record_metadata(filing for ticker_filings in found.values() for filing in ticker_filings)
+            # Only the delta was fetched; the payload keeps the most recent filings, like the per-ticker query
+            filings.update(self.filing_store.recent_filings(batch, SEC_FILING_CONFIG['recent_filings']))
+        return filings
+
+    def prefetch_sec_filings(self, tickers):
+        """Fetch this cycle's filings for all tickers in batches; `fetch_sec_filings` then reads from them.
+
+        Tickers missing from the batched results fall back to a per-ticker query.
+        """
+        self._prefetched_filings = self.fetch_sec_filings_batch(tickers)
+
     def fetch_news_feeds(self, ticker):
         """Fetch news from various RSS feeds for a given ticker."""
         feeds = [
@@ -77,6 +161,7 @@ class DataIngestion:
                     data = response.json()
                     for post in data['data']['children']:
                         sentiment_data.append({
+                            'id': post['data'].get('id'),
                             'title': post['data']['title'],
                             'score': post['data']['score'],
                             'num_comments': post['data']['num_comments'],
@@ -101,6 +186,8 @@ class DataIngestion:
             market_data = {
                 'current_price': info.get('currentPrice'),
                 'market_cap': info.get('marketCap'),
+                'sector': info.get('sector'),
+                'industry': info.get('industry'),
                 'pe_ratio': info.get('trailingPE'),
                 'forward_pe': info.get('forwardPE'),
                 'dividend_yield': info.get('dividendYield'),
@@ -140,19 +227,16 @@ class DataIngestion:
         return None
 
     def _count_ai_mentions(self, ticker):
-        """Helper method to count AI-related mentions in recent filings."""
+        """Helper method to count AI-related mentions in the latest periodic report."""
         filings = self.fetch_sec_filings(ticker)
         ai_keywords = ['artificial intelligence', 'machine learning', 'deep learning', 'neural network']
-        mention_count = 0
-        
-        for filing in filings:
-            try:
-                # This is a placeholder - actual implementation would need to fetch and parse filing text
-                mention_count += 1
-            except Exception as e:
-                print(f"Error processing filing for {ticker}: {e}")
-        
-        return mention_count
+
+        # New filings are downloaded and indexed once; counts come from the index
+        self.filing_store.add_filings(filings)
+        latest = self.filing_store.latest_filing(ticker, PERIODIC_FORMS)
+        if latest is None:
+            return 0
+        return sum(self.filing_store.term_count(keyword, latest['accession_no']) for keyword in ai_keywords)
 
     def collect_all_data(self, ticker):
         """Collect all available data for a given ticker."""
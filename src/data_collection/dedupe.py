@@ -0,0 +1,198 @@
+"""
+Cross-cycle deduplication of news articles and forum posts.
+
+Every poll returns mostly the same items. `SeenItems` answers "stored
+before?" from memory in the common case. A bounded LRU of recent IDs gives
+exact hits for items still in the feeds. A Bloom filter proves that an ID is
+new without a lookup. Only Bloom positives that fell out of the LRU are
+checked against the `ItemStore`, which is the source of truth, so a false
+positive costs one query and never drops an item. Both in-memory structures
+have fixed size however long the service runs.
+
+`FeedDeduplicator` stores new items once and replaces the item lists in a
+ticker payload with ID lists plus a sentiment summary. It updates that
+summary from what entered, left or changed since the previous cycle, rather
+than recounting every item.
+"""
+
+import math
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import numpy as np
+from src.storage.item_store import ItemStore
+from src.utils.config import DEDUPE_CONFIG
+from src.utils.helpers import logger
+
+# Query parameters that only track where a click came from
+_TRACKING_PREFIXES = ('utm_', 'mc_')
+_TRACKING_PARAMS = {'fbclid', 'gclid', 'cmpid', 'ref'}
+
+def normalize_url(url: str) -> str:
+    """Canonical form of an article URL: lowercase host, no fragment, tracking params or trailing slash."""
+    parts = urlsplit(url.strip())
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(_TRACKING_PREFIXES) and key.lower() not in _TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ''))
+
+def news_item_id(item: Dict) -> str:
+    """Stable ID of a news item from its normalized link (or title when there is no link)."""
+    key = normalize_url(item['link']) if item.get('link') else f"title:{item.get('title', '')}"
+    return f"news:{hashlib.sha1(key.encode()).hexdigest()}"
+
+def forum_item_id(post: Dict) -> str:
+    """Stable ID of a forum post from its Reddit ID (or its content for older payloads)."""
+    if post.get('id'):
+        return f"reddit:{post['id']}"
+    key = f"{post.get('subreddit')}|{post.get('created_utc')}|{post.get('title')}"
+    return f"forum:{hashlib.sha1(key.encode()).hexdigest()}"
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        """Sized for `capacity` items at `error_rate` false positives."""
+        self.n_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.n_hashes = max(1, int(round(self.n_bits / capacity * math.log(2))))
+        self.bits = np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, key: str) -> np.ndarray:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return np.array([(h1 + i * h2) % self.n_bits for i in range(self.n_hashes)], dtype=np.int64)
+
+    def add(self, key: str):
+        positions = self._positions(key)
+        # ufunc.at so that positions sharing a byte all get set
+        np.bitwise_or.at(self.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+
+    def __contains__(self, key: str) -> bool:
+        positions = self._positions(key)
+        return bool(np.all(self.bits[positions >> 3] & (1 << (positions & 7)).astype(np.uint8)))
+
+class BoundedLRU:
+    def __init__(self, maxsize: int):
+        """Exact set of the `maxsize` most recently seen keys."""
+        self.maxsize = maxsize
+        self._keys = OrderedDict()
+
+    def __contains__(self, key: str) -> bool:
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return True
+        return False
+
+    def add(self, key: str):
+        self._keys[key] = None
+        self._keys.move_to_end(key)
+        if len(self._keys) > self.maxsize:
+            self._keys.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+class SeenItems:
+    def __init__(self, item_store: ItemStore, capacity: int = None, error_rate: float = None,
+                 lru_size: int = None):
+        """Memory-bounded membership test over every item ID in `item_store`."""
+        self.item_store = item_store
+        self.bloom = BloomFilter(capacity or DEDUPE_CONFIG['bloom_capacity'],
+                                 error_rate or DEDUPE_CONFIG['bloom_error_rate'])
+        self.recent = BoundedLRU(lru_size or DEDUPE_CONFIG['lru_size'])
+        self.store_lookups = 0
+        for item_id in item_store.iter_ids():
+            self.bloom.add(item_id)
+
+    def split_new(self, item_ids: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Partition IDs into (new, seen); new IDs are not marked seen until `mark_seen`."""
+        new, seen, unsure = [], [], []
+        for item_id in item_ids:
+            if item_id in self.recent:
+                seen.append(item_id)
+            elif item_id in self.bloom:
+                unsure.append(item_id)
+            else:
+                new.append(item_id)
+        if unsure:
+            self.store_lookups += 1
+            stored = self.item_store.existing(unsure)
+            for item_id in unsure:
+                (seen if item_id in stored else new).append(item_id)
+                if item_id in stored:
+                    self.recent.add(item_id)
+        return new, seen
+
+    def mark_seen(self, item_ids: Iterable[str]):
+        for item_id in item_ids:
+            self.bloom.add(item_id)
+            self.recent.add(item_id)
+
+class FeedDeduplicator:
+    def __init__(self, item_store: ItemStore = None, seen: SeenItems = None):
+        """Store each news/forum item once and keep per-ticker sentiment sums current."""
+        self.item_store = item_store or ItemStore()
+        self.seen = seen or SeenItems(self.item_store)
+        # ticker -> {'news': set of IDs, 'forum': {ID: (score, num_comments)}} from the last cycle
+        self._visible = {}
+        # ticker -> running sums over the visible items
+        self._sums = {}
+
+    def _store_new(self, kind: str, ticker: str, timestamp: str, items: Dict[str, Dict]) -> int:
+        new, _ = self.seen.split_new(items)
+        if new:
+            self.item_store.add_items(kind, ticker, timestamp, {item_id: items[item_id] for item_id in new})
+            self.seen.mark_seen(new)
+        return len(new)
+
+    def process(self, ticker: str, ticker_data: Dict) -> Dict:
+        """Return a compact copy of a payload: item lists become ID lists plus `sentiment_summary`."""
+        timestamp = ticker_data.get('timestamp')
+        news = {news_item_id(item): item for item in ticker_data.get('news') or []}
+        forum = {forum_item_id(post): post for post in ticker_data.get('forum_sentiment') or []}
+        new_news = self._store_new('news', ticker, timestamp, news)
+        new_posts = self._store_new('forum', ticker, timestamp, forum)
+
+        visible = self._visible.setdefault(ticker, {'news': set(), 'forum': {}})
+        sums = self._sums.setdefault(ticker, {'news_volume': 0, 'n_posts': 0, 'total_comments': 0, 'post_score_sum': 0})
+
+        # Apply only what changed since the previous cycle
+        sums['news_volume'] += len(news.keys() - visible['news']) - len(visible['news'] - news.keys())
+        engagement = {item_id: (post.get('score') or 0, post.get('num_comments') or 0) for item_id, post in forum.items()}
+        for item_id, (score, comments) in engagement.items():
+            old_score, old_comments = visible['forum'].get(item_id, (0, 0))
+            if item_id not in visible['forum']:
+                sums['n_posts'] += 1
+            sums['post_score_sum'] += score - old_score
+            sums['total_comments'] += comments - old_comments
+        for item_id in visible['forum'].keys() - engagement.keys():
+            old_score, old_comments = visible['forum'][item_id]
+            sums['n_posts'] -= 1
+            sums['post_score_sum'] -= old_score
+            sums['total_comments'] -= old_comments
+        visible['news'] = set(news)
+        visible['forum'] = engagement
+
+        if new_news or new_posts:
+            logger.info(f"{ticker}: {new_news} new news items, {new_posts} new forum posts")
+
+        compact = {key: value for key, value in ticker_data.items() if key not in ('news', 'forum_sentiment')}
+        compact['news_ids'] = sorted(news)
+        compact['forum_ids'] = sorted(forum)
+        compact['sentiment_summary'] = {
+            'news_volume': sums['news_volume'],
+            'n_posts': sums['n_posts'],
+            'total_comments': sums['total_comments'],
+            'avg_post_score': sums['post_score_sum'] / sums['n_posts'] if sums['n_posts'] else None
+        }
+        return compact
+
+    def expand(self, ticker_data: Dict) -> Dict:
+        """Inverse of `process`: resolve ID lists back to full items from the store."""
+        expanded = dict(ticker_data)
+        expanded['news'] = self.item_store.get_items(ticker_data.get('news_ids', []))
+        expanded['forum_sentiment'] = self.item_store.get_items(ticker_data.get('forum_ids', []))
+        return expanded
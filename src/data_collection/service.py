@@ -1,14 +1,54 @@
+import os
 import time
+import json
+import argparse
+import hashlib
 import threading
 from datetime import datetime
 import logging
-from src.utils.config import DATA_COLLECTION_CONFIG, PATHS
-from src.utils.helpers import save_data, load_config, logger
+from src.utils.config import (
+    DATA_COLLECTION_CONFIG, PATHS, RISK_SCORING_CONFIG, PROFILING_CONFIG, SNAPSHOT_WRITER_CONFIG
+)
+from src.utils.helpers import load_config, logger
 from src.data_collection.data_ingestion import DataIngestion
+from src.data_collection.dedupe import FeedDeduplicator
+from src.analysis.bubble_scorer import BubbleScorer
+from src.analysis.quantile_sketch import MetricSketches
+from src.analysis.incremental_scoring import IncrementalScorer
+from src.analysis.watchlists import collection_universe
+from src.storage.score_index import ScoreIndex
+from src.storage.snapshot_writer import SnapshotWriter
+from src.alerts.engine import AlertEngine
+from src.utils.events import event_bus as default_event_bus, TICKER_CHANGED, CYCLE_COMPLETED
+from src.utils.profiling import CycleProfiler, phase
+
+def payload_hash(ticker_data):
+    """Content hash of a ticker payload, ignoring when it was collected."""
+    content = {key: value for key, value in ticker_data.items() if key != 'timestamp'}
+    serialized = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
 
 class DataCollectionService:
-    def __init__(self):
+    def __init__(self, event_bus=None, score_index=None, snapshot_writer=None, alert_engine=None):
         self.data_ingestion = DataIngestion()
+        self.sketches = MetricSketches.load(
+            PATHS['metric_sketches'], RISK_SCORING_CONFIG['sketch_relative_accuracy']
+        )
+        self.scorer = BubbleScorer(RISK_SCORING_CONFIG['normalization'], self.sketches)
+        self.score_index = score_index or ScoreIndex()
+        self.event_bus = event_bus or default_event_bus
+        self.incremental_scorer = IncrementalScorer(
+            self.scorer, self.score_index, self.event_bus, PATHS['metric_sketches']
+        )
+        # Rules are evaluated on every cycle's rescored tickers
+        self.alert_engine = alert_engine or AlertEngine.from_config()
+        self.alert_engine.attach(self.event_bus)
+        self.deduplicator = FeedDeduplicator()
+        self.snapshot_writer = snapshot_writer or SnapshotWriter()
+        self.payload_hashes = {}
+        self.profile_next = False
+        # Set by the dashboard so runtime profiles also cover one render
+        self.profile_render = None
         self.running = False
         self.thread = None
         self.last_update = None
@@ -34,21 +74,63 @@ class DataCollectionService:
         self.running = False
         if self.thread:
             self.thread.join()
+        self.flush_snapshots()
         logger.info("Data collection service stopped")
 
+    def flush_snapshots(self):
+        """Wait (up to the configured timeout) for queued snapshots to reach disk."""
+        if not self.snapshot_writer.flush(SNAPSHOT_WRITER_CONFIG['flush_timeout']):
+            logger.error("Timed out waiting for queued snapshots to be written")
+
+    def request_profile(self):
+        """Profile the next collection cycle only."""
+        self.profile_next = True
+        logger.info("Profiling requested for the next collection cycle")
+
+    def _profile_requested(self):
+        """Consume a pending profile request, from `request_profile` or the trigger file."""
+        trigger = PROFILING_CONFIG['trigger_file']
+        if os.path.exists(trigger):
+            os.remove(trigger)
+            self.profile_next = True
+        requested, self.profile_next = self.profile_next, False
+        return requested
+
+    def profile_cycle(self, render=None):
+        """Run one collection cycle (and optionally `render`) under the profiler.
+
+        Returns the paths of the written stacks, allocation sites and summary.
+        """
+        with CycleProfiler() as profiler:
+            with phase('collection'):
+                self._collect_data()
+            if render is not None:
+                render()
+        return profiler.paths
+
+    def _run_cycle(self):
+        """Collect once, under the profiler (with `profile_render`) if a profile was requested."""
+        if self._profile_requested():
+            self.profile_cycle(render=self.profile_render)
+        else:
+            self._collect_data()
+
     def _run(self):
         """Main service loop."""
         while self.running:
             try:
-                self._collect_data()
+                self._run_cycle()
                 time.sleep(DATA_COLLECTION_CONFIG['update_interval'])
             except Exception as e:
                 logger.error(f"Error in data collection service: {e}")
                 time.sleep(60)  # Wait a minute before retrying
 
     def _collect_data(self):
-        """Collect data for all tickers."""
-        tickers = load_config(PATHS['tickers_file']).get('tickers', [])
+        """Collect data for every ticker on any watchlist."""
+        ticker_config = load_config(PATHS['tickers_file'])
+        # Each ticker is collected and scored once however many watchlists include it
+        tickers = collection_universe(ticker_config)
+        self.incremental_scorer.aggregates.set_baskets(ticker_config.get('baskets', {}))
         if not tickers:
             logger.warning("No tickers configured")
             return
@@ -59,19 +141,64 @@ class DataCollectionService:
             'tickers': {}
         }
 
+        # One paginated SEC query per batch of tickers instead of one per ticker
+        with phase('sec_filings'):
+            self.data_ingestion.prefetch_sec_filings(tickers)
+
+        changed = []
         for ticker in tickers:
             try:
-                ticker_data = self.data_ingestion.collect_all_data(ticker)
+                with phase('ingest'):
+                    ticker_data = self.data_ingestion.collect_all_data(ticker)
+                # Items seen in earlier cycles are referenced by ID, not stored again
+                with phase('dedupe'):
+                    ticker_data = self.deduplicator.process(ticker, ticker_data)
                 data['tickers'][ticker] = ticker_data
                 logger.info(f"Collected data for {ticker}")
             except Exception as e:
                 logger.error(f"Error collecting data for {ticker}: {e}")
-
-        # Save the collected data
+                continue
+
+            # Only tickers whose content changed are recomputed downstream
+            digest = payload_hash(ticker_data)
+            if self.payload_hashes.get(ticker) != digest:
+                self.payload_hashes[ticker] = digest
+                changed.append(ticker)
+                self.event_bus.publish(TICKER_CHANGED, {
+                    'ticker': ticker,
+                    'timestamp': timestamp,
+                    'data': ticker_data,
+                    'hash': digest
+                })
+
+        # Written on the snapshot writer's thread; `data` is not modified after this
         filename = f"market_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        save_data(data, filename)
+        with phase('save'):
+            self.snapshot_writer.submit(data, filename)
+        self._log_writer_stats()
+
+        logger.info(f"{len(changed)} of {len(data['tickers'])} tickers changed since the last cycle")
+        with phase('publish'):
+            self.event_bus.publish(CYCLE_COMPLETED, {
+                'timestamp': timestamp,
+                'changed': changed,
+                'tickers': list(data['tickers']),
+                'universe': tickers,
+                'snapshot': data
+            })
         self.last_update = timestamp
 
+    def _log_writer_stats(self):
+        stats = self.snapshot_writer.stats()
+        write_mean = stats['write_time_total'] / stats['batches'] if stats['batches'] else 0.0
+        logger.info(
+            f"Snapshot writer: queue depth {stats['queue_depth']}, "
+            f"queue wait {stats['queue_wait_mean']:.3f}s mean / {stats['queue_wait_max']:.3f}s max, "
+            f"batch write {write_mean:.3f}s mean, {stats['written']} written, "
+            f"{stats['failed_attempts']} failed attempts, {stats['pending_retries']} awaiting retry, "
+            f"{stats['blocked_submits']} blocked submits"
+        )
+
     def get_last_update(self):
         """Get the timestamp of the last data update."""
         return self.last_update
@@ -92,6 +219,15 @@ def stop_service():
     data_service.stop()
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='AI Bubble Dashboard data collection service')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile one collection cycle and one dashboard render, then exit')
+    if parser.parse_args().profile:
+        from src.visualization.bubble_dashboard import render_dashboard_snapshot
+        data_service.profile_cycle(render=render_dashboard_snapshot)
+        data_service.snapshot_writer.flush()
+        raise SystemExit(0)
+
     start_service()
     try:
         while True:
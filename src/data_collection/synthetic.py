@@ -0,0 +1,290 @@
+"""
+Seeded synthetic market generator for scale-testing the analysis stack.
+
+Produces daily or intraday bars for thousands of tickers driven by a shared
+regime chain (normal / bubble / crash) plus idiosyncratic noise, together with
+matching fundamentals, AI metrics, news/forum volumes and market indicators.
+Data is generated one time chunk at a time and streamed to gzip-compressed CSV
+files, so memory is bounded by `n_tickers * chunk_periods` regardless of the
+length of the history.
+
+Every random stream has its own generator spawned from the seed, so the output
+is identical for a given seed whatever chunk size is used.
+"""
+
+import json
+import os
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+REGIMES = ['normal', 'bubble', 'crash']
+
+# Annualized drift / volatility of the sector factor and activity multipliers per regime
+REGIME_PARAMS = {
+    'normal': {'drift': 0.08, 'volatility': 0.20, 'activity': 1.0, 'vix': 16.0},
+    'bubble': {'drift': 0.90, 'volatility': 0.30, 'activity': 2.5, 'vix': 14.0},
+    'crash': {'drift': -1.60, 'volatility': 0.55, 'activity': 3.0, 'vix': 38.0}
+}
+
+# Expected regime durations in years, and where each regime exits to
+REGIME_DURATIONS = {'normal': 2.0, 'bubble': 1.0, 'crash': 0.25}
+REGIME_EXITS = {'normal': 'bubble', 'bubble': 'crash', 'crash': 'normal'}
+
+TRADING_DAYS = 252
+SESSION_MINUTES = 390
+
+class SyntheticMarketGenerator:
+    def __init__(self, n_tickers: int = 1000, start: str = '2015-01-01', end: str = '2024-12-31',
+                 freq: str = 'D', seed: int = 42):
+        """Configure the generator; `freq` is 'D' (business days) or a minute alias like '1min'/'5min'."""
+        self.n_tickers = n_tickers
+        self.start = start
+        self.end = end
+        self.freq = freq
+        self.seed = seed
+        self.tickers = [f"SYN{i:05d}" for i in range(n_tickers)]
+        self.timestamps = self._timestamps()
+        self.periods_per_year = self._periods_per_year()
+
+    def _intraday_minutes(self) -> Optional[int]:
+        if self.freq.upper() in ('D', 'B', '1D'):
+            return None
+        return int(pd.Timedelta(self.freq).total_seconds() // 60)
+
+    def _timestamps(self) -> pd.DatetimeIndex:
+        """Business days, or bars within 09:30-16:00 sessions for intraday frequencies."""
+        days = pd.bdate_range(self.start, self.end)
+        step = self._intraday_minutes()
+        if step is None:
+            return days
+        offsets = pd.to_timedelta(np.arange(0, SESSION_MINUTES, step), unit='min') + pd.Timedelta(hours=9, minutes=30)
+        return pd.DatetimeIndex((days.values[:, None] + offsets.values[None, :]).ravel())
+
+    def _periods_per_year(self) -> float:
+        step = self._intraday_minutes()
+        return TRADING_DAYS if step is None else TRADING_DAYS * SESSION_MINUTES / step
+
+    def _streams(self) -> Dict[str, np.random.Generator]:
+        names = ['static', 'regime', 'market', 'idio', 'range', 'volume',
+                 'news', 'forum', 'comments', 'mentions', 'macro']
+        seeds = np.random.SeedSequence(self.seed).spawn(len(names))
+        return {name: np.random.default_rng(seed) for name, seed in zip(names, seeds)}
+
+    def _static_profile(self, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        """Per-ticker characteristics that stay fixed over the whole history."""
+        n = self.n_tickers
+        return {
+            'beta': rng.uniform(0.6, 2.2, n),
+            'idio_vol': rng.uniform(0.15, 0.50, n),
+            'price': np.exp(rng.normal(np.log(60), 1.0, n)),
+            'shares': np.exp(rng.normal(np.log(5e8), 1.2, n)),
+            'revenue_per_share': np.exp(rng.normal(np.log(8), 0.6, n)),
+            'revenue_growth': rng.uniform(0.0, 0.40, n),
+            'margin': rng.uniform(0.05, 0.35, n),
+            'rd_ratio': rng.uniform(0.02, 0.30, n),
+            'base_volume': np.exp(rng.normal(np.log(2e6), 1.0, n)),
+            'patent_count': rng.poisson(40, n),
+            'ai_intensity': rng.uniform(0.2, 3.0, n),
+            'news_rate': rng.uniform(2, 30, n),
+            'forum_rate': rng.uniform(1, 20, n)
+        }
+
+    def _regime_path(self, rng: np.random.Generator, n_periods: int, state: int) -> np.ndarray:
+        """Advance the regime chain by `n_periods` steps from `state`."""
+        exit_probability = np.array([
+            1.0 / (REGIME_DURATIONS[name] * self.periods_per_year) for name in REGIMES
+        ])
+        exits = np.array([REGIMES.index(REGIME_EXITS[name]) for name in REGIMES])
+        draws = rng.random(n_periods)
+        path = np.empty(n_periods, dtype=np.int64)
+        for i in range(n_periods):
+            if draws[i] < exit_probability[state]:
+                state = exits[state]
+            path[i] = state
+        return path
+
+    def iter_chunks(self, chunk_periods: int = 250) -> Iterator[Dict[str, pd.DataFrame]]:
+        """Yield {'bars': long-format ticker rows, 'market': market indicators} per time chunk."""
+        streams = self._streams()
+        profile = self._static_profile(streams['static'])
+        dt = 1.0 / self.periods_per_year
+        log_price = np.log(profile['price'])
+        revenue_per_share = profile['revenue_per_share'].copy()
+        state = 0
+        fed_rate = 2.0
+        tickers = np.array(self.tickers)
+        drift = np.array([REGIME_PARAMS[name]['drift'] for name in REGIMES])
+        volatility = np.array([REGIME_PARAMS[name]['volatility'] for name in REGIMES])
+        activity = np.array([REGIME_PARAMS[name]['activity'] for name in REGIMES])
+        vix_level = np.array([REGIME_PARAMS[name]['vix'] for name in REGIMES])
+
+        for chunk_start in range(0, len(self.timestamps), chunk_periods):
+            timestamps = self.timestamps[chunk_start:chunk_start + chunk_periods]
+            n = len(timestamps)
+            regimes = self._regime_path(streams['regime'], n, state)
+            state = int(regimes[-1])
+
+            # Sector factor plus beta-scaled idiosyncratic returns, (periods, tickers)
+            factor = drift[regimes] * dt + volatility[regimes] * np.sqrt(dt) * streams['market'].standard_normal(n)
+            idio = streams['idio'].standard_normal((n, self.n_tickers)) * profile['idio_vol'] * np.sqrt(dt)
+            returns = factor[:, None] * profile['beta'] + idio - 0.5 * (profile['idio_vol'] ** 2) * dt
+            closes_log = log_price + np.cumsum(returns, axis=0)
+            opens_log = np.vstack([log_price, closes_log[:-1]])
+            log_price = closes_log[-1]
+            close = np.exp(closes_log)
+            open_ = np.exp(opens_log)
+            spread = np.abs(streams['range'].standard_normal((n, self.n_tickers, 2)))
+            spread *= (profile['idio_vol'] * np.sqrt(dt) * 0.5)[:, None]
+            high = np.maximum(open_, close) * np.exp(spread[..., 0])
+            low = np.minimum(open_, close) * np.exp(-spread[..., 1])
+
+            bar_activity = activity[regimes][:, None]
+            surprise = 1 + np.abs(returns) / (profile['idio_vol'] * np.sqrt(dt))
+            volume = profile['base_volume'] * bar_activity * surprise * np.exp(
+                0.3 * streams['volume'].standard_normal((n, self.n_tickers))
+            ) * (dt * TRADING_DAYS)
+
+            # Fundamentals drift slowly; valuations follow the price
+            growth = np.cumsum(np.tile(profile['revenue_growth'] * dt, (n, 1)), axis=0)
+            revenue_ps = revenue_per_share * np.exp(growth)
+            revenue_per_share = revenue_ps[-1]
+            eps = revenue_ps * profile['margin']
+            market_cap = close * profile['shares']
+            annual_revenue = revenue_ps * profile['shares']
+
+            activity_rates = bar_activity * (dt * TRADING_DAYS)
+            news_volume = streams['news'].poisson(profile['news_rate'] * activity_rates)
+            forum_posts = streams['forum'].poisson(profile['forum_rate'] * activity_rates)
+            forum_comments = streams['comments'].poisson(forum_posts * 25 + 1) * (forum_posts > 0)
+            ai_mentions = streams['mentions'].poisson(profile['ai_intensity'] * bar_activity * np.ones((n, 1)))
+
+            bars = pd.DataFrame({
+                'timestamp': np.repeat(timestamps.values, self.n_tickers),
+                'ticker': np.tile(tickers, n),
+                'open': open_.ravel(),
+                'high': high.ravel(),
+                'low': low.ravel(),
+                'close': close.ravel(),
+                'volume': volume.ravel().round(),
+                'regime': np.repeat(np.array(REGIMES)[regimes], self.n_tickers),
+                'market_cap': market_cap.ravel(),
+                'pe_ratio': (close / eps).ravel(),
+                'forward_pe': (close / (eps * (1 + profile['revenue_growth']))).ravel(),
+                'price_to_sales': (close / revenue_ps).ravel(),
+                'beta': np.tile(profile['beta'], n),
+                'avg_volume': np.tile(profile['base_volume'] * dt * TRADING_DAYS, n),
+                'rd_expense': (annual_revenue * profile['rd_ratio']).ravel(),
+                'rd_to_revenue': np.tile(profile['rd_ratio'], n),
+                'patent_count': np.tile(profile['patent_count'], n),
+                'ai_mentions': ai_mentions.ravel(),
+                'news_volume': news_volume.ravel(),
+                'forum_posts': forum_posts.ravel(),
+                'forum_comments': forum_comments.ravel()
+            })
+
+            macro = streams['macro'].standard_normal((n, 3)).T
+            fed_path = fed_rate + np.cumsum(macro[0] * 0.02 * np.sqrt(dt * TRADING_DAYS))
+            fed_path = np.clip(fed_path, 0, 8)
+            fed_rate = fed_path[-1]
+            market = pd.DataFrame({
+                'timestamp': timestamps,
+                'regime': np.array(REGIMES)[regimes],
+                'sector_return': factor,
+                'vix': np.maximum(vix_level[regimes] + 3 * macro[1], 9),
+                'fed_rate': fed_path,
+                'm2_yoy': 5 + 2 * macro[2]
+            })
+            yield {'bars': bars, 'market': market}
+
+    def write(self, out_dir: str, chunk_periods: int = 250) -> List[str]:
+        """Stream every chunk to gzip CSV files under `out_dir`; returns the written paths."""
+        if not os.path.exists(out_dir):
+            os.makedirs(out_dir)
+        paths = []
+        for i, chunk in enumerate(self.iter_chunks(chunk_periods)):
+            for name, frame in chunk.items():
+                path = os.path.join(out_dir, f"{name}_{i:05d}.csv.gz")
+                frame.to_csv(path, index=False, float_format='%.8g',
+                             compression={'method': 'gzip', 'compresslevel': 1})
+                paths.append(path)
+            logger.info(f"Wrote synthetic chunk {i} ({len(chunk['market'])} periods)")
+
+        manifest = {
+            'n_tickers': self.n_tickers,
+            'start': self.start,
+            'end': self.end,
+            'freq': self.freq,
+            'seed': self.seed,
+            'periods': len(self.timestamps),
+            'chunk_periods': chunk_periods,
+            'tickers': self.tickers
+        }
+        with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+        return paths
+
+def iter_snapshots(bars: pd.DataFrame) -> Iterator[Dict]:
+    """Convert long-format bars into collector-style snapshots, one per timestamp."""
+    for timestamp, rows in bars.groupby('timestamp', sort=True):
+        tickers = {}
+        for row in rows.itertuples(index=False):
+            posts = int(row.forum_posts)
+            comments_per_post = int(row.forum_comments) // posts if posts else 0
+            tickers[row.ticker] = {
+                'ticker': row.ticker,
+                'timestamp': str(timestamp),
+                'market_data': {
+                    'current_price': row.close,
+                    'market_cap': row.market_cap,
+                    'pe_ratio': row.pe_ratio,
+                    'forward_pe': row.forward_pe,
+                    'price_to_sales': row.price_to_sales,
+                    'beta': row.beta,
+                    'volume': row.volume,
+                    'avg_volume': row.avg_volume
+                },
+                'ai_metrics': {
+                    'rd_expense': row.rd_expense,
+                    'rd_to_revenue': row.rd_to_revenue,
+                    'patent_count': row.patent_count,
+                    'ai_mentions': row.ai_mentions
+                },
+                'news': [{'title': f"{row.ticker} news {i}"} for i in range(int(row.news_volume))],
+                'forum_sentiment': [
+                    {'score': 4 * comments_per_post, 'num_comments': comments_per_post}
+                    for _ in range(posts)
+                ]
+            }
+        yield {'timestamp': pd.Timestamp(timestamp).isoformat(), 'tickers': tickers}
+
+def load_analyzer_frame(out_dir: str, ticker: str) -> pd.DataFrame:
+    """Read one ticker's history from written chunks in the shape `BubbleAnalyzer.data` expects."""
+    prices = []
+    markets = []
+    for name in sorted(os.listdir(out_dir)):
+        path = os.path.join(out_dir, name)
+        if name.startswith('bars_'):
+            for chunk in pd.read_csv(path, usecols=['timestamp', 'ticker', 'close', 'price_to_sales'],
+                                     parse_dates=['timestamp'], chunksize=500000):
+                prices.append(chunk[chunk['ticker'] == ticker])
+        elif name.startswith('market_'):
+            markets.append(pd.read_csv(path, usecols=['timestamp', 'vix', 'fed_rate', 'm2_yoy'],
+                                       parse_dates=['timestamp']))
+    price = pd.concat(prices).set_index('timestamp')
+    market = pd.concat(markets).set_index('timestamp')
+    frame = pd.DataFrame({'price': price['close'], 'ps_ratio': price['price_to_sales']})
+    return frame.join(market)
+
+def load_panel(out_dir: str, column: str = 'price_to_sales') -> pd.DataFrame:
+    """Read one bar column for every ticker as a wide time x tickers frame (e.g. for `RiskPanel`)."""
+    pieces = []
+    for name in sorted(os.listdir(out_dir)):
+        if name.startswith('bars_'):
+            for chunk in pd.read_csv(os.path.join(out_dir, name), usecols=['timestamp', 'ticker', column],
+                                     parse_dates=['timestamp'], chunksize=500000):
+                pieces.append(chunk.pivot(index='timestamp', columns='ticker', values=column))
+    return pd.concat(pieces).groupby(level=0).last().sort_index()
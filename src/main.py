@@ -2,10 +2,12 @@
 Main entry point for the AI Bubble Dashboard.
 """
 
+import sys
+import atexit
 import argparse
 import logging
-from src.visualization.dashboard import run_dashboard
-from src.utils.config import PATHS
+import signal
+from src.utils.config import PATHS, SYNTHETIC_DATA_CONFIG, WEIGHT_SWEEP_CONFIG
 from src.utils.helpers import ensure_directory, logger
 
 def setup_logging():
@@ -15,33 +17,140 @@ def setup_logging():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
             logging.StreamHandler(),
-            logging.FileHandler(PATHS['logs'] / 'app.log')
+            logging.FileHandler(PATHS['log_file'])
         ]
     )
 
+def generate_synthetic_data(args):
+    """Write a seeded synthetic market dataset for offline scale testing."""
+    from src.data_collection.synthetic import SyntheticMarketGenerator
+
+    generator = SyntheticMarketGenerator(
+        n_tickers=args.n_tickers,
+        start=SYNTHETIC_DATA_CONFIG['start'],
+        end=SYNTHETIC_DATA_CONFIG['end'],
+        freq=args.freq,
+        seed=args.seed
+    )
+    logger.info(f"Generating {len(generator.timestamps)} periods for {args.n_tickers} tickers")
+    paths = generator.write(args.output or SYNTHETIC_DATA_CONFIG['output_dir'], SYNTHETIC_DATA_CONFIG['chunk_periods'])
+    logger.info(f"Wrote {len(paths)} synthetic data files")
+
+def sweep_weights(args):
+    """Rank candidate composite weights by stability over the stored score history."""
+    from src.analysis.weight_sweep import run_weight_sweep
+
+    result = run_weight_sweep(n_candidates=args.n_candidates, start=args.start)
+    result.to_csv(args.output or WEIGHT_SWEEP_CONFIG['output_file'])
+    logger.info(f"Top weight candidates (candidate 0 is the current weights):\n{result.head(10)}")
+    logger.info(f"Current weights rank {int(result.loc[0, 'rank'])} of {len(result)}")
+
+def export_history(args):
+    """Stream score or aggregate history to a file (or stdout) without loading it into memory."""
+    from src.api.export import stream_export
+    from src.storage.score_index import ScoreIndex
+
+    tickers = [ticker.strip().upper() for ticker in (args.tickers or '').split(',') if ticker.strip()]
+    stream = stream_export(
+        ScoreIndex(), args.dataset, args.format, tickers or None, args.start, args.end,
+        args.group_type, compress=not args.no_compress
+    )
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        written = 0
+        for chunk in stream:
+            output.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.output:
+            output.close()
+    logger.info(f"Exported {written} bytes of {args.dataset} to {args.output or 'stdout'}")
+
+def profile_once():
+    """Profile one collection cycle and one dashboard render, writing results to the data dir."""
+    from src.data_collection.service import data_service
+    from src.visualization.bubble_dashboard import render_dashboard_snapshot
+
+    paths = data_service.profile_cycle(render=render_dashboard_snapshot)
+    data_service.snapshot_writer.flush()
+    for kind, path in paths.items():
+        logger.info(f"Profile {kind}: {path}")
+
 def main():
     """Main entry point for the application."""
     parser = argparse.ArgumentParser(description='AI Bubble Dashboard')
-    parser.add_argument('--mode', choices=['dashboard'], default='dashboard',
+    parser.add_argument('--mode', choices=['dashboard', 'synthetic', 'sweep', 'export'], default='dashboard',
                       help='Application mode (default: dashboard)')
     parser.add_argument('--debug', action='store_true',
                       help='Run in debug mode')
     parser.add_argument('--port', type=int, default=8050,
                       help='Port to run the dashboard on (default: 8050)')
-    
+    parser.add_argument('--profile', action='store_true',
+                      help='Profile one collection cycle and one dashboard render, then exit')
+    parser.add_argument('--no-collect', action='store_true',
+                      help='Dashboard mode: do not run the data collector in-process')
+    parser.add_argument('--n-tickers', type=int, default=SYNTHETIC_DATA_CONFIG['n_tickers'],
+                      help='Synthetic mode: number of tickers to generate')
+    parser.add_argument('--freq', default=SYNTHETIC_DATA_CONFIG['freq'],
+                      help="Synthetic mode: bar frequency, 'D' or a minute alias like '5min'")
+    parser.add_argument('--seed', type=int, default=SYNTHETIC_DATA_CONFIG['seed'],
+                      help='Synthetic mode: random seed')
+    parser.add_argument('--output', default=None,
+                      help='Synthetic mode: output directory; sweep mode: results CSV; '
+                           'export mode: output file (default: stdout)')
+    parser.add_argument('--n-candidates', type=int, default=WEIGHT_SWEEP_CONFIG['n_candidates'],
+                      help='Sweep mode: number of candidate weight vectors')
+    parser.add_argument('--start', default=None,
+                      help='Sweep and export modes: earliest score timestamp')
+    parser.add_argument('--end', default=None,
+                      help='Export mode: latest score timestamp')
+    parser.add_argument('--dataset', choices=['scores', 'aggregates', 'market_data'], default='scores',
+                      help='Export mode: per-ticker scores (scores, price and market cap only), group '
+                           'aggregates, or the raw collected market data from the data/market_data_*.json snapshots')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                      help='Export mode: output format (parquet needs pyarrow)')
+    parser.add_argument('--tickers', default=None,
+                      help='Export mode: comma-separated tickers (default: all)')
+    parser.add_argument('--group-type', default=None,
+                      help='Export mode: aggregate group type, e.g. sector (default: all)')
+    parser.add_argument('--no-compress', action='store_true',
+                      help='Export mode: write plain CSV instead of gzip')
+
     args = parser.parse_args()
-    
+
+    # Ensure required directories exist
+    for path in (PATHS['data_dir'], PATHS['config_dir']):
+        ensure_directory(path)
+
     # Set up logging
     setup_logging()
     logger.info("Starting AI Bubble Dashboard")
-    
-    # Ensure required directories exist
-    for path in PATHS.values():
-        ensure_directory(path)
-    
-    if args.mode == 'dashboard':
+
+    if args.profile:
+        profile_once()
+    elif args.mode == 'dashboard':
+        from src.visualization.dashboard import run_dashboard
+        if not args.no_collect:
+            # Each completed cycle pushes a new snapshot to connected dashboards
+            from src.data_collection.service import data_service
+            data_service.start()
+            # The snapshot writer's thread is a daemon; write out queued snapshots on Ctrl-C
+            # or SIGTERM (turned into a normal exit so exit hooks run)
+            atexit.register(data_service.flush_snapshots)
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+            # `kill -USR1 <pid>` profiles the next cycle, and one render, without a restart
+            from src.visualization.bubble_dashboard import render_dashboard_snapshot
+            data_service.profile_render = render_dashboard_snapshot
+            if hasattr(signal, 'SIGUSR1'):
+                signal.signal(signal.SIGUSR1, lambda signum, frame: data_service.request_profile())
         logger.info(f"Starting dashboard on port {args.port}")
         run_dashboard(debug=args.debug, port=args.port)
+    elif args.mode == 'synthetic':
+        generate_synthetic_data(args)
+    elif args.mode == 'sweep':
+        sweep_weights(args)
+    elif args.mode == 'export':
+        export_history(args)
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,470 @@
+"""
+Persistent full-text store for SEC filings.
+
+Each filing document is downloaded once, stored zlib-compressed under the
+SHA-256 of its text (identical documents share one object) and tokenized into
+unigram and bigram counts per section. The counts go into a SQLite inverted
+index keyed by (term, ticker, filing date), so mention trends and "who
+started mentioning X" questions are range scans over one term's postings
+instead of re-reads of the raw filings.
+
+Phrases longer than the indexed n-grams are answered by intersecting the
+postings of their bigrams and verifying only those candidate filings.
+
+The sec-api metadata of every filing seen in query results is kept as well,
+downloaded or not, so per-ticker "last filed" watermarks and recent filing
+lists don't depend on document downloads succeeding.
+"""
+
+import os
+import re
+import json
+import zlib
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence
+import requests
+from bs4 import BeautifulSoup
+from src.utils.config import PATHS, SEC_FILING_CONFIG, DATA_COLLECTION_CONFIG
+from src.utils.helpers import logger
+
+SECTIONS = ('risk_factors', 'mdna', 'other')
+PERIODIC_FORMS = ('10-K', '10-Q')
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_ITEM_HEADER = re.compile(
+    r"^[ \t]*item[ \t]+\d{1,2}[a-c]?[ \t]*[.:\-–—]?\s*(?P<title>[^\n]{0,60})",
+    re.IGNORECASE | re.MULTILINE
+)
+_SQL_VARIABLES = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS filings (
+    filing_id INTEGER PRIMARY KEY,
+    accession_no TEXT NOT NULL UNIQUE,
+    ticker TEXT NOT NULL,
+    form_type TEXT,
+    filed_at TEXT NOT NULL,
+    url TEXT,
+    sha256 TEXT NOT NULL,
+    n_tokens INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_filings_ticker_date ON filings (ticker, filed_at);
+CREATE TABLE IF NOT EXISTS terms (
+    term_id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    ticker TEXT NOT NULL,
+    filed_at TEXT NOT NULL,
+    filing_id INTEGER NOT NULL,
+    section TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (term_id, ticker, filed_at, filing_id, section)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS filing_metadata (
+    accession_no TEXT PRIMARY KEY,
+    ticker TEXT NOT NULL,
+    filed_at TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_filing_metadata_ticker_date ON filing_metadata (ticker, filed_at);
+"""
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens; the same rules apply to documents and queries."""
+    return _TOKEN.findall(text.lower())
+
+def split_sections(text: str) -> Dict[str, str]:
+    """Split filing text into risk factors, MD&A and everything else by its Item headers."""
+    parts = {section: [] for section in SECTIONS}
+    section, position = 'other', 0
+    for match in _ITEM_HEADER.finditer(text):
+        parts[section].append(text[position:match.start()])
+        title = match.group('title').lower()
+        if title.startswith('risk factors'):
+            section = 'risk_factors'
+        elif title.startswith('management') and 'discussion' in title:
+            section = 'mdna'
+        else:
+            section = 'other'
+        position = match.start()
+    parts[section].append(text[position:])
+    return {name: "".join(chunks) for name, chunks in parts.items()}
+
+def count_ngrams(tokens: Sequence[str], max_ngram: int) -> Counter:
+    """Counts of every 1..max_ngram token sequence, keyed by the space-joined phrase."""
+    counts = Counter(tokens)
+    for n in range(2, max_ngram + 1):
+        counts.update(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return counts
+
+def html_to_text(html: str) -> str:
+    """Visible text of a filing document, one block element per line."""
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup(['script', 'style']):
+        element.decompose()
+    return soup.get_text('\n')
+
+def _filed_date(filed_at: str) -> str:
+    return (filed_at or '')[:10]
+
+class FilingStore:
+    def __init__(self, root: Optional[str] = None, db_path: Optional[str] = None,
+                 max_ngram: Optional[int] = None):
+        """Open (and create if needed) the object directory and the inverted index."""
+        self.root = root or PATHS['filing_store']
+        self.db_path = db_path or PATHS['filing_index']
+        self.max_ngram = max_ngram or SEC_FILING_CONFIG['max_ngram']
+        self._write_lock = threading.Lock()
+        for directory in (self.root, os.path.dirname(self.db_path)):
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Yield a short-lived connection; sqlite handles cross-thread readers."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # Objects
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest[2:]}.z")
+
+    def _put_object(self, text: str) -> str:
+        """Store text compressed under its content hash; existing objects are reused."""
+        raw = text.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(zlib.compress(raw, SEC_FILING_CONFIG['compression_level']))
+            os.replace(tmp_path, path)
+        return digest
+
+    def read_text(self, accession_no: str) -> Optional[str]:
+        """Decompressed text of an indexed filing."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT sha256 FROM filings WHERE accession_no = ?", (accession_no,)
+            ).fetchone()
+        if row is None:
+            return None
+        with open(self._object_path(row['sha256']), 'rb') as f:
+            return zlib.decompress(f.read()).decode('utf-8')
+
+    # Ingestion
+
+    def has_filing(self, accession_no: str) -> bool:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT 1 FROM filings WHERE accession_no = ?", (accession_no,)
+            ).fetchone() is not None
+
+    def add_document(self, metadata: Dict, text: str) -> bool:
+        """Store and index one filing's text; returns False if it was already indexed.
+
+        `metadata` needs accession_no, ticker, form_type, filed_at and optionally url.
+        """
+        if self.has_filing(metadata['accession_no']):
+            return False
+
+        digest = self._put_object(text)
+        section_counts = {
+            section: count_ngrams(tokenize(section_text), self.max_ngram)
+            for section, section_text in split_sections(text).items()
+        }
+        vocabulary = set().union(*section_counts.values())
+        n_tokens = len(tokenize(text))
+        ticker = metadata['ticker']
+        filed_at = _filed_date(metadata['filed_at'])
+
+        with self._write_lock, self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO filings (accession_no, ticker, form_type, filed_at, url, sha256, n_tokens) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (metadata['accession_no'], ticker, metadata.get('form_type'), filed_at,
+                 metadata.get('url'), digest, n_tokens)
+            )
+            if cursor.rowcount == 0:
+                return False
+            filing_id = cursor.lastrowid
+            conn.executemany("INSERT OR IGNORE INTO terms (term) VALUES (?)", ((term,) for term in vocabulary))
+            term_ids = self._term_ids(conn, vocabulary)
+            conn.executemany(
+                "INSERT INTO postings (term_id, ticker, filed_at, filing_id, section, count) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (term_ids[term], ticker, filed_at, filing_id, section, count)
+                    for section, counts in section_counts.items()
+                    for term, count in counts.items()
+                )
+            )
+        logger.info(f"Indexed {metadata.get('form_type')} {metadata['accession_no']} for {ticker} ({len(vocabulary)} terms)")
+        return True
+
+    def add_filing(self, filing: Dict) -> bool:
+        """Download and index a filing from sec-api query results, unless already stored."""
+        accession_no = filing.get('accessionNo')
+        url = filing.get('linkToFilingDetails') or filing.get('linkToHtml')
+        if not accession_no or not url or self.has_filing(accession_no):
+            return False
+        try:
+            response = requests.get(
+                url,
+                headers={'User-Agent': SEC_FILING_CONFIG['user_agent']},
+                timeout=DATA_COLLECTION_CONFIG['timeout']
+            )
+            response.raise_for_status()
+            return self.add_document({
+                'accession_no': accession_no,
+                'ticker': filing.get('ticker'),
+                'form_type': filing.get('formType'),
+                'filed_at': filing.get('filedAt'),
+                'url': url
+            }, html_to_text(response.text))
+        except Exception as e:
+            logger.error(f"Error storing SEC filing {accession_no}: {e}")
+            return False
+
+    def add_filings(self, filings: Iterable[Dict]) -> int:
+        """Download and index any filings not stored yet; returns how many were added."""
+        return sum(self.add_filing(filing) for filing in filings)
+
+    def record_metadata(self, filings: Iterable[Dict]) -> int:
+        """Keep the sec-api metadata of filings without downloading them; returns how many were new."""
+        rows = [
+            (filing['accessionNo'], filing['ticker'], filing['filedAt'], json.dumps(filing))
+            for filing in filings
+            if filing.get('accessionNo') and filing.get('ticker') and filing.get('filedAt')
+        ]
+        with self._write_lock, self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO filing_metadata (accession_no, ticker, filed_at, metadata) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            return conn.total_changes - before
+
+    # Queries
+
+    @staticmethod
+    def _term_ids(conn, terms: Iterable[str]) -> Dict[str, int]:
+        terms = list(terms)
+        ids = {}
+        for i in range(0, len(terms), _SQL_VARIABLES):
+            chunk = terms[i:i + _SQL_VARIABLES]
+            placeholders = ", ".join("?" for _ in chunk)
+            for row in conn.execute(f"SELECT term_id, term FROM terms WHERE term IN ({placeholders})", chunk):
+                ids[row['term']] = row['term_id']
+        return ids
+
+    def _phrase_counts(self, conn, phrase: str, ticker, form_types, since, until, section) -> Dict[int, int]:
+        """Mentions of `phrase` per filing_id among filings matching the filters."""
+        tokens = tokenize(phrase)
+        if not tokens:
+            return {}
+        indexed = len(tokens) <= self.max_ngram
+        # Longer phrases: filings containing every bigram are candidates, verified below
+        keys = [" ".join(tokens)] if indexed else sorted({
+            " ".join(tokens[i:i + 2]) for i in range(len(tokens) - 1)
+        })
+        term_ids = self._term_ids(conn, keys)
+        if len(term_ids) < len(keys):
+            return {}
+
+        where = ["p.term_id = ?"]
+        params = []
+        if ticker:
+            where.append("p.ticker = ?")
+            params.append(ticker)
+        if since:
+            where.append("p.filed_at >= ?")
+            params.append(_filed_date(since))
+        if until:
+            where.append("p.filed_at <= ?")
+            params.append(_filed_date(until))
+        if section:
+            where.append("p.section = ?")
+            params.append(section)
+        if form_types:
+            where.append(f"f.form_type IN ({', '.join('?' for _ in form_types)})")
+            params.extend(form_types)
+        query = (
+            "SELECT p.filing_id, SUM(p.count) AS count FROM postings p "
+            "JOIN filings f ON f.filing_id = p.filing_id "
+            f"WHERE {' AND '.join(where)} GROUP BY p.filing_id"
+        )
+
+        counts = None
+        for key in keys:
+            rows = {row['filing_id']: row['count'] for row in conn.execute(query, [term_ids[key]] + params)}
+            counts = rows if counts is None else {fid: counts[fid] for fid in counts.keys() & rows.keys()}
+        if indexed or not counts:
+            return counts or {}
+
+        needle = f" {' '.join(tokens)} "
+        verified = {}
+        for row in conn.execute(
+            f"SELECT filing_id, sha256 FROM filings WHERE filing_id IN ({', '.join('?' for _ in counts)})",
+            list(counts)
+        ):
+            with open(self._object_path(row['sha256']), 'rb') as f:
+                text = zlib.decompress(f.read()).decode('utf-8')
+            parts = split_sections(text)
+            scope = [parts[section]] if section else parts.values()
+            count = sum(f" {' '.join(tokenize(part))} ".count(needle) for part in scope)
+            if count:
+                verified[row['filing_id']] = count
+        return verified
+
+    def mentions(self, phrase: str, ticker: Optional[str] = None, form_types: Optional[Sequence[str]] = None,
+                 since: Optional[str] = None, until: Optional[str] = None,
+                 section: Optional[str] = None) -> List[Dict]:
+        """Per-filing mention counts of a phrase, oldest filing first.
+
+        Each row has ticker, accession_no, form_type, filed_at, count and
+        per_10k (mentions per 10,000 tokens of the whole filing).
+        """
+        with self._connect() as conn:
+            counts = self._phrase_counts(conn, phrase, ticker, form_types, since, until, section)
+            if not counts:
+                return []
+            rows = conn.execute(
+                "SELECT filing_id, ticker, accession_no, form_type, filed_at, n_tokens FROM filings "
+                f"WHERE filing_id IN ({', '.join('?' for _ in counts)}) ORDER BY filed_at, ticker",
+                list(counts)
+            ).fetchall()
+        return [
+            {
+                'ticker': row['ticker'],
+                'accession_no': row['accession_no'],
+                'form_type': row['form_type'],
+                'filed_at': row['filed_at'],
+                'count': counts[row['filing_id']],
+                'per_10k': 1e4 * counts[row['filing_id']] / row['n_tokens'] if row['n_tokens'] else 0.0
+            }
+            for row in rows
+        ]
+
+    def term_count(self, phrase: str, accession_no: str, section: Optional[str] = None) -> int:
+        """Mentions of a phrase in one filing."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT filing_id, ticker, filed_at FROM filings WHERE accession_no = ?", (accession_no,)
+            ).fetchone()
+            if row is None:
+                return 0
+            counts = self._phrase_counts(conn, phrase, row['ticker'], None, row['filed_at'], row['filed_at'], section)
+        return counts.get(row['filing_id'], 0)
+
+    def latest_filing(self, ticker: str, form_types: Optional[Sequence[str]] = None,
+                      before: Optional[str] = None) -> Optional[Dict]:
+        """Most recent indexed filing of a ticker, optionally of given forms and strictly before a date."""
+        where = ["ticker = ?"]
+        params = [ticker]
+        if form_types:
+            where.append(f"form_type IN ({', '.join('?' for _ in form_types)})")
+            params.extend(form_types)
+        if before:
+            where.append("filed_at < ?")
+            params.append(_filed_date(before))
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT ticker, accession_no, form_type, filed_at, n_tokens FROM filings "
+                f"WHERE {' AND '.join(where)} ORDER BY filed_at DESC, filing_id DESC LIMIT 1",
+                params
+            ).fetchone()
+        return dict(row) if row else None
+
+    def last_filed(self, tickers: Iterable[str]) -> Dict[str, str]:
+        """Filing date of the most recent stored or recorded filing of each ticker that has one."""
+        tickers = list(tickers)
+        last = {}
+        # Both tables are bound once per chunk
+        step = _SQL_VARIABLES // 2
+        with self._connect() as conn:
+            for i in range(0, len(tickers), step):
+                chunk = tickers[i:i + step]
+                placeholders = ', '.join('?' for _ in chunk)
+                last.update(conn.execute(
+                    "SELECT ticker, MAX(filed_at) FROM ("
+                    f"SELECT ticker, filed_at FROM filings WHERE ticker IN ({placeholders}) UNION ALL "
+                    f"SELECT ticker, substr(filed_at, 1, 10) FROM filing_metadata WHERE ticker IN ({placeholders})"
+                    ") GROUP BY ticker",
+                    chunk + chunk
+                ).fetchall())
+        return last
+
+    def recent_filings(self, tickers: Iterable[str], limit: int) -> Dict[str, List[Dict]]:
+        """The `limit` most recent filings of each ticker, newest first, as sec-api metadata.
+
+        Filings indexed before their metadata was recorded are rebuilt from the
+        index's own columns.
+        """
+        tickers = list(tickers)
+        recent = {ticker: {} for ticker in tickers}
+        step = _SQL_VARIABLES // 2
+        with self._connect() as conn:
+            for i in range(0, len(tickers), step):
+                chunk = tickers[i:i + step]
+                placeholders = ', '.join('?' for _ in chunk)
+                rows = conn.execute(
+                    "SELECT accession_no, ticker, form_type, filed_at, url, NULL AS metadata FROM ("
+                    "SELECT *, ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY filed_at DESC) AS rank "
+                    f"FROM filings WHERE ticker IN ({placeholders})) WHERE rank <= ? UNION ALL "
+                    "SELECT accession_no, ticker, NULL, filed_at, NULL, metadata FROM ("
+                    "SELECT *, ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY filed_at DESC) AS rank "
+                    f"FROM filing_metadata WHERE ticker IN ({placeholders})) WHERE rank <= ?",
+                    chunk + [limit] + chunk + [limit]
+                ).fetchall()
+                for row in rows:
+                    if row['metadata'] is not None:
+                        recent[row['ticker']][row['accession_no']] = json.loads(row['metadata'])
+                    else:
+                        recent[row['ticker']].setdefault(row['accession_no'], {
+                            'accessionNo': row['accession_no'], 'ticker': row['ticker'],
+                            'formType': row['form_type'], 'filedAt': row['filed_at'],
+                            'linkToFilingDetails': row['url']
+                        })
+        return {
+            ticker: sorted(filings.values(), key=lambda filing: filing['filedAt'], reverse=True)[:limit]
+            for ticker, filings in recent.items()
+        }
+
+    def new_mentions(self, phrase: str, since: str, until: Optional[str] = None,
+                     section: Optional[str] = 'risk_factors',
+                     form_types: Sequence[str] = PERIODIC_FORMS) -> List[Dict]:
+        """Tickers whose filings since `since` mention a phrase that their previous filing did not.
+
+        By default this compares risk factor sections of periodic reports, i.e.
+        "which tickers added AI risk factors this quarter".
+        """
+        current = {}
+        for row in self.mentions(phrase, form_types=form_types, since=since, until=until, section=section):
+            current.setdefault(row['ticker'], row)
+
+        added = []
+        for ticker, row in sorted(current.items()):
+            previous = self.latest_filing(ticker, form_types, before=row['filed_at'])
+            if previous is None:
+                continue
+            if self.term_count(phrase, previous['accession_no'], section) == 0:
+                added.append(dict(row, previous_accession_no=previous['accession_no'],
+                                  previous_filed_at=previous['filed_at']))
+        return added
@@ -0,0 +1,102 @@
+"""
+Write-once store for news articles and forum posts.
+
+Feeds return the same items every poll. Each item is stored here once under a
+stable ID (see `src.data_collection.dedupe`) and snapshots refer to it by that
+ID instead of embedding it again.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from src.utils.config import PATHS
+from src.utils.helpers import logger
+
+_SQL_VARIABLES = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    item_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    ticker TEXT,
+    first_seen TEXT,
+    payload TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+class ItemStore:
+    def __init__(self, db_path: Optional[str] = None):
+        """Open (and create if needed) the item database."""
+        self.db_path = db_path or PATHS['item_store']
+        self._write_lock = threading.Lock()
+        directory = os.path.dirname(self.db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Yield a short-lived connection; sqlite handles cross-thread readers."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def add_items(self, kind: str, ticker: str, timestamp: str, items: Dict[str, Dict]) -> int:
+        """Store items keyed by ID; IDs already present are left untouched. Returns rows inserted."""
+        if not items:
+            return 0
+        with self._write_lock, self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO items (item_id, kind, ticker, first_seen, payload) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (item_id, kind, ticker, timestamp, json.dumps(item, default=str))
+                    for item_id, item in items.items()
+                )
+            )
+            inserted = conn.total_changes - before
+        logger.info(f"Stored {inserted} new {kind} items for {ticker}")
+        return inserted
+
+    def existing(self, item_ids: Iterable[str]) -> Set[str]:
+        """The subset of `item_ids` already stored."""
+        item_ids = list(item_ids)
+        found = set()
+        with self._connect() as conn:
+            for i in range(0, len(item_ids), _SQL_VARIABLES):
+                chunk = item_ids[i:i + _SQL_VARIABLES]
+                placeholders = ", ".join("?" for _ in chunk)
+                found.update(
+                    row['item_id'] for row in
+                    conn.execute(f"SELECT item_id FROM items WHERE item_id IN ({placeholders})", chunk)
+                )
+        return found
+
+    def get_items(self, item_ids: Iterable[str]) -> List[Dict]:
+        """Resolve IDs from a snapshot back to the stored items, in the given order."""
+        item_ids = list(item_ids)
+        items = {}
+        with self._connect() as conn:
+            for i in range(0, len(item_ids), _SQL_VARIABLES):
+                chunk = item_ids[i:i + _SQL_VARIABLES]
+                placeholders = ", ".join("?" for _ in chunk)
+                for row in conn.execute(
+                    f"SELECT item_id, payload FROM items WHERE item_id IN ({placeholders})", chunk
+                ):
+                    items[row['item_id']] = json.loads(row['payload'])
+        return [items[item_id] for item_id in item_ids if item_id in items]
+
+    def iter_ids(self) -> Iterator[str]:
+        """Every stored item ID (used to warm the in-memory seen-item filter)."""
+        with self._connect() as conn:
+            for row in conn.execute("SELECT item_id FROM items"):
+                yield row['item_id']
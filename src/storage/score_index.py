@@ -0,0 +1,466 @@
+"""
+Precomputed index of bubble risk scores keyed by ticker and timestamp.
+
+The collection service writes one row per ticker per cycle; the read API only
+ever queries this index, so polling clients never trigger collection or scans
+over the raw snapshot files.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.utils.config import PATHS
+from src.utils.helpers import logger
+
+_SQL_VARIABLES = 900
+
+COMPONENT_COLUMNS = [
+    'valuation_score',
+    'sentiment_score',
+    'growth_score',
+    'ai_exposure_score',
+    'market_score'
+]
+
+SCORE_COLUMNS = [
+    'ticker',
+    'timestamp',
+    'bubble_risk',
+    'risk_level'
+] + COMPONENT_COLUMNS + [
+    'current_price',
+    'market_cap'
+]
+
+TEXT_COLUMNS = {'ticker', 'timestamp', 'risk_level'}
+
+AGGREGATE_COLUMNS = [
+    'group_type',
+    'group_name',
+    'timestamp',
+    'bubble_risk'
+] + COMPONENT_COLUMNS + [
+    'market_cap',
+    'n_members'
+]
+
+# Operators of Dash DataTable filter queries and their SQL equivalents
+FILTER_OPERATORS = {
+    '=': '=', 'eq': '=',
+    '!=': '!=', 'ne': '!=',
+    '<': '<', 'lt': '<',
+    '<=': '<=', 'le': '<=',
+    '>': '>', 'gt': '>',
+    '>=': '>=', 'ge': '>=',
+    'contains': 'contains',
+    'datestartswith': 'startswith'
+}
+
+_FILTER_PART = re.compile(
+    r"^\{(?P<column>[^}]+)\}\s+(?P<operator>[si]?(?:[a-z]+|[=!<>]=?))\s+(?P<value>.+)$"
+)
+
+def parse_filter_query(query: Optional[str]) -> List[Tuple[str, str, object]]:
+    """Parse a DataTable `filter_query` such as `{risk_level} = HIGH && {bubble_risk} > 0.6`.
+
+    Returns (column, operator, value) triples with SQL-style operators; raises
+    ValueError for unknown columns or operators.
+    """
+    filters = []
+    for part in (query or '').split(' && '):
+        part = part.strip()
+        if not part:
+            continue
+        match = _FILTER_PART.match(part)
+        if not match:
+            raise ValueError(f"Unsupported filter expression: {part}")
+        column, operator, value = match.group('column'), match.group('operator'), match.group('value').strip()
+        # Case-sensitivity prefixes (scontains, i=, ...) are not distinguished
+        if operator not in FILTER_OPERATORS and operator[:1] in ('s', 'i'):
+            operator = operator[1:]
+        if column not in SCORE_COLUMNS or operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter expression: {part}")
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+            value = value[1:-1]
+        if column not in TEXT_COLUMNS:
+            value = float(value)
+        filters.append((column, FILTER_OPERATORS[operator], value))
+    return filters
+
+def _like_pattern(value) -> str:
+    return re.sub(r"([\\%_])", r"\\\1", str(value))
+
+_COLUMN_DEFS = ",\n    ".join(
+    ["ticker TEXT NOT NULL", "timestamp TEXT NOT NULL", "bubble_risk REAL", "risk_level TEXT"]
+    + [f"{column} REAL" for column in COMPONENT_COLUMNS]
+    + ["current_price REAL", "market_cap REAL"]
+)
+
+_AGGREGATE_COMPONENT_DEFS = ",\n    ".join(f"{column} REAL" for column in COMPONENT_COLUMNS)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS scores (
+    {_COLUMN_DEFS},
+    PRIMARY KEY (ticker, timestamp)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_scores_timestamp ON scores (timestamp);
+CREATE TABLE IF NOT EXISTS latest_scores (
+    {_COLUMN_DEFS},
+    PRIMARY KEY (ticker)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_latest_bubble_risk ON latest_scores (bubble_risk);
+CREATE TABLE IF NOT EXISTS aggregate_scores (
+    group_type TEXT NOT NULL,
+    group_name TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    bubble_risk REAL,
+    {_AGGREGATE_COMPONENT_DEFS},
+    market_cap REAL,
+    n_members INTEGER,
+    PRIMARY KEY (group_type, group_name, timestamp)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS index_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class ScoreIndex:
+    def __init__(self, db_path: Optional[str] = None):
+        """Open (and create if needed) the score index database."""
+        self.db_path = db_path or PATHS['score_index']
+        self._write_lock = threading.Lock()
+        directory = os.path.dirname(self.db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Yield a short-lived connection; sqlite handles cross-thread readers."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def build_row(ticker: str, timestamp: str, score: Dict, market_data: Optional[Dict] = None) -> Tuple:
+        """Flatten a `BubbleScorer.calculate_bubble_risk` result into an index row."""
+        market_data = market_data or {}
+        components = score.get('component_scores', {})
+        return (
+            ticker,
+            timestamp,
+            score.get('bubble_risk'),
+            score.get('risk_level'),
+        ) + tuple(components.get(column) for column in COMPONENT_COLUMNS) + (
+            market_data.get('current_price'),
+            market_data.get('market_cap'),
+        )
+
+    def add_rows(self, rows: List[Tuple]):
+        """Insert index rows and refresh the latest-score table in one transaction."""
+        if not rows:
+            return
+        placeholders = ", ".join("?" for _ in SCORE_COLUMNS)
+        columns = ", ".join(SCORE_COLUMNS)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in SCORE_COLUMNS[1:])
+        with self._write_lock, self._connect() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO scores ({columns}) VALUES ({placeholders})",
+                rows
+            )
+            conn.executemany(
+                f"INSERT INTO latest_scores ({columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT(ticker) DO UPDATE SET {updates} "
+                f"WHERE excluded.timestamp >= latest_scores.timestamp",
+                rows
+            )
+            conn.execute(
+                "INSERT INTO index_meta (key, value) VALUES ('version', '1') "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+        logger.info(f"Indexed {len(rows)} score rows")
+
+    def add_aggregate_rows(self, rows: List[Tuple]):
+        """Insert group aggregate rows (see `BubbleAggregates.rows`)."""
+        if not rows:
+            return
+        placeholders = ", ".join("?" for _ in AGGREGATE_COLUMNS)
+        with self._write_lock, self._connect() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO aggregate_scores ({', '.join(AGGREGATE_COLUMNS)}) VALUES ({placeholders})",
+                rows
+            )
+            conn.execute(
+                "INSERT INTO index_meta (key, value) VALUES ('version', '1') "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+        logger.info(f"Indexed {len(rows)} aggregate rows")
+
+    def add_snapshot(self, snapshot: Dict, scorer):
+        """Score every ticker of a collected snapshot and add it to the index."""
+        timestamp = snapshot.get('timestamp')
+        rows = []
+        for ticker, ticker_data in snapshot.get('tickers', {}).items():
+            try:
+                score = scorer.calculate_bubble_risk(ticker_data)
+                score['risk_level'] = scorer.get_risk_level(score['bubble_risk'])
+                rows.append(self.build_row(ticker, timestamp, score, ticker_data.get('market_data')))
+            except Exception as e:
+                logger.error(f"Error scoring {ticker} for index: {e}")
+        self.add_rows(rows)
+
+    def version(self) -> int:
+        """Return a counter that changes whenever the index is written."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM index_meta WHERE key = 'version'").fetchone()
+        return int(row['value']) if row else 0
+
+    def get_history(self, ticker: str, start: Optional[str] = None, end: Optional[str] = None,
+                    limit: int = 100, offset: int = 0) -> Tuple[List[Dict], int]:
+        """Return one page of a ticker's score history and the total row count."""
+        where = ["ticker = ?"]
+        params = [ticker]
+        if start:
+            where.append("timestamp >= ?")
+            params.append(start)
+        if end:
+            where.append("timestamp <= ?")
+            params.append(end)
+        clause = " AND ".join(where)
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM scores WHERE {clause}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT * FROM scores WHERE {clause} ORDER BY timestamp LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def _sample(self, table: str, where: List[str], params: List, max_rows: int) -> List[Dict]:
+        """Every k-th row (and the last) of a time series, k chosen so at most about `max_rows` come back."""
+        clause = " AND ".join(where)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM ("
+                f"SELECT *, ROW_NUMBER() OVER (ORDER BY timestamp) - 1 AS _n, COUNT(*) OVER () AS _total "
+                f"FROM {table} WHERE {clause}"
+                f") WHERE _n % ((_total + ? - 1) / ?) = 0 OR _n = _total - 1 ORDER BY timestamp",
+                params + [max_rows, max_rows]
+            ).fetchall()
+        sampled = [dict(row) for row in rows]
+        for row in sampled:
+            del row['_n'], row['_total']
+        return sampled
+
+    def sample_history(self, ticker: str, max_rows: int) -> List[Dict]:
+        """A ticker's score history thinned in SQLite to about `max_rows` rows, for charts."""
+        return self._sample('scores', ["ticker = ?"], [ticker], max_rows)
+
+    def get_latest(self, limit: int = 100, offset: int = 0, sort_by: Optional[List[Tuple[str, str]]] = None,
+                   filters: Optional[List[Tuple[str, str, object]]] = None) -> Tuple[List[Dict], int]:
+        """Return one page of the latest score for every indexed ticker.
+
+        `sort_by` is a list of (column, 'asc'|'desc') pairs and `filters` a list
+        of (column, operator, value) triples as produced by `parse_filter_query`;
+        the total counts the filtered rows. Sorting, filtering and paging all run
+        in SQLite, so only the requested page leaves the index.
+        """
+        where = []
+        params = []
+        for column, operator, value in filters or []:
+            if column not in SCORE_COLUMNS:
+                raise ValueError(f"Unknown column: {column}")
+            if operator == 'contains':
+                where.append(f"{column} LIKE ? ESCAPE '\\'")
+                params.append(f"%{_like_pattern(value)}%")
+            elif operator == 'startswith':
+                where.append(f"{column} LIKE ? ESCAPE '\\'")
+                params.append(f"{_like_pattern(value)}%")
+            elif operator in ('=', '!=', '<', '<=', '>', '>='):
+                where.append(f"{column} {operator} ?")
+                params.append(value)
+            else:
+                raise ValueError(f"Unknown operator: {operator}")
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+        order = []
+        for column, direction in sort_by or []:
+            if column not in SCORE_COLUMNS or direction not in ('asc', 'desc'):
+                raise ValueError(f"Invalid sort: {column} {direction}")
+            # Missing values sort last in either direction
+            order.append(f"{column} IS NULL, {column} {direction.upper()}")
+        order.append("ticker")
+
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM latest_scores {clause}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT * FROM latest_scores {clause} ORDER BY {', '.join(order)} LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def get_latest_for(self, tickers: List[str]) -> List[Dict]:
+        """Latest score rows of the given tickers (those indexed), in no particular order."""
+        tickers = list(tickers)
+        rows = []
+        with self._connect() as conn:
+            for i in range(0, len(tickers), _SQL_VARIABLES):
+                chunk = tickers[i:i + _SQL_VARIABLES]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows.extend(conn.execute(
+                    f"SELECT * FROM latest_scores WHERE ticker IN ({placeholders})", chunk
+                ).fetchall())
+        return [dict(row) for row in rows]
+
+    def get_components(self, ticker: str, timestamp: Optional[str] = None) -> Optional[Dict]:
+        """Return the component breakdown at `timestamp` (or the latest one)."""
+        with self._connect() as conn:
+            if timestamp:
+                row = conn.execute(
+                    "SELECT * FROM scores WHERE ticker = ? AND timestamp <= ? "
+                    "ORDER BY timestamp DESC LIMIT 1",
+                    (ticker, timestamp)
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT * FROM latest_scores WHERE ticker = ?", (ticker,)
+                ).fetchone()
+        if row is None:
+            return None
+        row = dict(row)
+        return {
+            'ticker': row['ticker'],
+            'timestamp': row['timestamp'],
+            'bubble_risk': row['bubble_risk'],
+            'risk_level': row['risk_level'],
+            'component_scores': {column: row[column] for column in COMPONENT_COLUMNS}
+        }
+
+    def get_component_history(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Tuple]:
+        """Every complete (ticker, timestamp, *components) row, ordered by ticker then time."""
+        where = [f"{column} IS NOT NULL" for column in COMPONENT_COLUMNS]
+        params = []
+        if start:
+            where.append("timestamp >= ?")
+            params.append(start)
+        if end:
+            where.append("timestamp <= ?")
+            params.append(end)
+        with self._connect() as conn:
+            conn.row_factory = None
+            return conn.execute(
+                f"SELECT ticker, timestamp, {', '.join(COMPONENT_COLUMNS)} FROM scores "
+                f"WHERE {' AND '.join(where)} ORDER BY ticker, timestamp",
+                params
+            ).fetchall()
+
+    def get_aggregate_history(self, group_type: str, group_name: str, start: Optional[str] = None,
+                              end: Optional[str] = None, limit: int = 100,
+                              offset: int = 0) -> Tuple[List[Dict], int]:
+        """Return one page of a group's aggregate history and the total row count."""
+        where = ["group_type = ?", "group_name = ?"]
+        params = [group_type, group_name]
+        if start:
+            where.append("timestamp >= ?")
+            params.append(start)
+        if end:
+            where.append("timestamp <= ?")
+            params.append(end)
+        clause = " AND ".join(where)
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM aggregate_scores WHERE {clause}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT * FROM aggregate_scores WHERE {clause} ORDER BY timestamp LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def sample_aggregate_history(self, group_type: str, group_name: str, max_rows: int) -> List[Dict]:
+        """A group's aggregate history thinned in SQLite to about `max_rows` rows, for charts."""
+        return self._sample('aggregate_scores', ["group_type = ?", "group_name = ?"], [group_type, group_name], max_rows)
+
+    def get_latest_aggregates(self, group_type: Optional[str] = None) -> List[Dict]:
+        """The most recent row of every group, optionally of one `group_type`."""
+        where, params = ("WHERE a.group_type = ?", [group_type]) if group_type else ("", [])
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT a.* FROM aggregate_scores a JOIN ("
+                f"SELECT group_type, group_name, MAX(timestamp) AS timestamp "
+                f"FROM aggregate_scores GROUP BY group_type, group_name"
+                f") latest USING (group_type, group_name, timestamp) {where} "
+                f"ORDER BY a.group_type, a.group_name",
+                params
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _iter_chunks(self, table: str, columns: List[str], key_columns: List[str], where: List[str],
+                     params: List, chunk_size: int) -> Iterator[List[Tuple]]:
+        """Yield rows in primary-key order, `chunk_size` at a time.
+
+        Each chunk is a separate keyset query on a fresh connection, so a slow
+        consumer holds neither a read transaction nor more than one chunk.
+        """
+        last = None
+        positions = [columns.index(column) for column in key_columns]
+        while True:
+            clauses, chunk_params = list(where), list(params)
+            if last is not None:
+                clauses.append(f"({', '.join(key_columns)}) > ({', '.join('?' for _ in key_columns)})")
+                chunk_params += last
+            clause = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+            with self._connect() as conn:
+                conn.row_factory = None
+                rows = conn.execute(
+                    f"SELECT {', '.join(columns)} FROM {table} {clause} "
+                    f"ORDER BY {', '.join(key_columns)} LIMIT ?",
+                    chunk_params + [chunk_size]
+                ).fetchall()
+            if not rows:
+                return
+            yield rows
+            if len(rows) < chunk_size:
+                return
+            last = [rows[-1][position] for position in positions]
+
+    @staticmethod
+    def _time_range(start: Optional[str], end: Optional[str]) -> Tuple[List[str], List]:
+        where, params = [], []
+        if start:
+            where.append("timestamp >= ?")
+            params.append(start)
+        if end:
+            where.append("timestamp <= ?")
+            params.append(end)
+        return where, params
+
+    def iter_history(self, tickers: Optional[List[str]] = None, start: Optional[str] = None,
+                     end: Optional[str] = None, chunk_size: int = 10000) -> Iterator[List[Tuple]]:
+        """Score rows (in `SCORE_COLUMNS` order) of `tickers`, or of every ticker, in chunks."""
+        where, params = self._time_range(start, end)
+        if not tickers:
+            yield from self._iter_chunks('scores', SCORE_COLUMNS, ['ticker', 'timestamp'],
+                                         where, params, chunk_size)
+            return
+        for ticker in sorted(set(tickers)):
+            yield from self._iter_chunks('scores', SCORE_COLUMNS, ['timestamp'],
+                                         ["ticker = ?"] + where, [ticker] + params, chunk_size)
+
+    def iter_aggregate_history(self, group_type: Optional[str] = None, start: Optional[str] = None,
+                               end: Optional[str] = None, chunk_size: int = 10000) -> Iterator[List[Tuple]]:
+        """Aggregate rows (in `AGGREGATE_COLUMNS` order), optionally of one group type, in chunks."""
+        where, params = self._time_range(start, end)
+        if group_type:
+            where.insert(0, "group_type = ?")
+            params.insert(0, group_type)
+        yield from self._iter_chunks('aggregate_scores', AGGREGATE_COLUMNS,
+                                     ['group_type', 'group_name', 'timestamp'], where, params, chunk_size)
@@ -0,0 +1,196 @@
+"""
+Background persistence of collected snapshots.
+
+The collector hands each snapshot to `SnapshotWriter.submit` and carries on;
+a worker thread serializes it in compact JSON and writes it to disk, so cycle
+latency does not depend on disk speed. The queue is bounded: when the disk
+falls behind, `submit` blocks until there is room instead of dropping
+snapshots or growing memory without limit.
+
+Each snapshot is written to a temporary file in the target directory and
+renamed over the final name only after its data has been fsynced, so a crash
+leaves either the complete previous file or the complete new one, never a
+truncated one. Snapshots that are already queued are written together and
+share one directory fsync. Failed writes are retried with backoff and kept
+for the next batch rather than discarded.
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+from collections import deque
+from typing import Dict, Optional
+from src.utils.config import PATHS, SNAPSHOT_WRITER_CONFIG
+from src.utils.helpers import ensure_directory, logger
+
+class _Job:
+    __slots__ = ('data', 'filename', 'submitted', 'attempts')
+
+    def __init__(self, data, filename):
+        self.data = data
+        self.filename = filename
+        self.submitted = time.monotonic()
+        self.attempts = 0
+
+def serialize_snapshot(data) -> bytes:
+    """Compact JSON encoding of a snapshot."""
+    return json.dumps(data, separators=(',', ':'), default=str).encode()
+
+def _fsync_directory(directory: str):
+    """Persist renames in `directory` (not supported on every platform)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class SnapshotWriter:
+    def __init__(self, directory: Optional[str] = None, max_queue: Optional[int] = None,
+                 batch_size: Optional[int] = None, retries: Optional[int] = None,
+                 retry_delay: Optional[float] = None):
+        """Writer of snapshots to `directory`; the worker thread starts with the first submit."""
+        self.directory = directory or PATHS['data_dir']
+        self.batch_size = batch_size or SNAPSHOT_WRITER_CONFIG['batch_size']
+        self.retries = SNAPSHOT_WRITER_CONFIG['retries'] if retries is None else retries
+        self.retry_delay = SNAPSHOT_WRITER_CONFIG['retry_delay'] if retry_delay is None else retry_delay
+        self._queue = queue.Queue(maxsize=max_queue or SNAPSHOT_WRITER_CONFIG['max_queue'])
+        # Jobs whose retries ran out; written again before anything newer
+        self._failed = deque()
+        # Submitted but not yet on disk
+        self._outstanding = 0
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'written': 0, 'failed_attempts': 0, 'batches': 0, 'blocked_submits': 0, 'dequeued': 0,
+            'queue_wait_total': 0.0, 'queue_wait_max': 0.0, 'write_time_total': 0.0
+        }
+
+    def _ensure_worker(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='snapshot-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, data: Dict, filename: str, timeout: Optional[float] = None):
+        """Queue `data` to be written as `filename`, blocking while the queue is full.
+
+        `data` is serialized on the worker thread and must not be modified
+        after it is submitted. Raises `queue.Full` if `timeout` elapses first.
+        """
+        self._ensure_worker()
+        job = _Job(data, filename)
+        with self._stats_lock:
+            self._outstanding += 1
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats['blocked_submits'] += 1
+            logger.warning(f"Snapshot queue full, waiting to queue {filename}")
+            try:
+                self._queue.put(job, timeout=timeout)
+            except queue.Full:
+                with self._stats_lock:
+                    self._outstanding -= 1
+                raise
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted snapshot is on disk; False if `timeout` elapsed first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._outstanding:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self) -> Dict:
+        """Counts and timings; queue waits are from submit until the write started."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queue_wait_mean'] = stats['queue_wait_total'] / stats['dequeued'] if stats['dequeued'] else 0.0
+        stats['queue_depth'] = self._queue.qsize()
+        stats['pending_retries'] = len(self._failed)
+        return stats
+
+    def _next_batch(self):
+        """Retried jobs first, then whatever is queued, up to `batch_size`."""
+        batch = []
+        while self._failed and len(batch) < self.batch_size:
+            batch.append(self._failed.popleft())
+        if not batch:
+            batch.append(self._queue.get())
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            self._write_batch(self._next_batch())
+
+    def _write_one(self, job: _Job) -> str:
+        """Write one snapshot to a temp file and fsync it; returns the temp path."""
+        path = os.path.join(self.directory, job.filename)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        payload = serialize_snapshot(job.data)
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return tmp_path
+
+    def _write_batch(self, jobs):
+        ensure_directory(self.directory)
+        started = time.monotonic()
+        renamed = 0
+        for job in jobs:
+            wait = started - job.submitted
+            with self._stats_lock:
+                self._stats['dequeued'] += 1
+                self._stats['queue_wait_total'] += wait
+                self._stats['queue_wait_max'] = max(self._stats['queue_wait_max'], wait)
+            while True:
+                try:
+                    tmp_path = self._write_one(job)
+                    os.replace(tmp_path, os.path.join(self.directory, job.filename))
+                    renamed += 1
+                    with self._stats_lock:
+                        self._stats['written'] += 1
+                        self._outstanding -= 1
+                    break
+                except Exception as e:
+                    job.attempts += 1
+                    with self._stats_lock:
+                        self._stats['failed_attempts'] += 1
+                    if job.attempts > self.retries:
+                        logger.error(f"Error writing snapshot {job.filename}, will retry next batch: {e}")
+                        job.attempts = 0
+                        self._failed.append(job)
+                        time.sleep(self.retry_delay)
+                        break
+                    logger.warning(f"Error writing snapshot {job.filename} (attempt {job.attempts}): {e}")
+                    time.sleep(self.retry_delay * 2 ** (job.attempts - 1))
+
+        # One directory fsync makes all of the batch's renames durable
+        if renamed:
+            _fsync_directory(self.directory)
+        with self._stats_lock:
+            self._stats['batches'] += 1
+            self._stats['write_time_total'] += time.monotonic() - started
+        if renamed:
+            logger.info(f"Saved {renamed} snapshot(s) to {self.directory}")
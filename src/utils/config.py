@@ -63,7 +63,52 @@ RISK_SCORING_CONFIG = {
         'high_risk': 0.6,
         'moderate_risk': 0.4,
         'low_risk': 0.2
-    }
+    },
+    # 'cap' divides metrics by fixed caps; 'percentile' ranks them against history
+    'normalization': 'cap',
+    'sketch_relative_accuracy': 0.01
+}
+
+# Weight Sweep Configuration (see src/analysis/weight_sweep.py)
+WEIGHT_SWEEP_CONFIG = {
+    'n_candidates': 5000,
+    'concentration': 50,  # Dirichlet concentration around the current weights; lower explores further
+    'seed': 42,
+    'block_values': 1 << 22,  # observations x candidates scored per matrix multiply
+    'output_file': 'data/weight_sweep.csv'
+}
+
+# Aggregates Configuration (see src/analysis/aggregates.py)
+AGGREGATES_CONFIG = {
+    'universe_name': 'AI Universe',  # group covering every scored ticker
+    'rebuild_every': 10000  # member updates between exact recomputations of the running sums
+}
+
+# Monte Carlo Bubble Regime Simulation Configuration
+SIMULATION_CONFIG = {
+    'n_paths': 10000,
+    'horizons': [1, 3, 6, 12],  # periods ahead
+    'method': 'bootstrap',
+    'seed': 42,
+    'n_workers': None  # defaults to min(4, cpu_count)
+}
+
+# Multi-window Risk Panel Configuration (see src/analysis/risk_panel.py)
+RISK_PANEL_CONFIG = {
+    'windows': [3, 6, 12, 24, 36],  # periods per moving-average/volatility window
+    'dtype': 'float32',  # output cubes; window sums are always accumulated in float64
+    'block_values': 1 << 14  # series x periods processed together, sized to stay in CPU cache
+}
+
+# Synthetic Market Data Configuration (scale testing)
+SYNTHETIC_DATA_CONFIG = {
+    'n_tickers': 1000,
+    'start': '2015-01-01',
+    'end': '2024-12-31',
+    'freq': 'D',  # 'D' for daily bars or a minute alias such as '5min'
+    'seed': 42,
+    'chunk_periods': 250,
+    'output_dir': 'data/synthetic'
 }
 
 # Dashboard Configuration
@@ -71,7 +116,73 @@ DASHBOARD_CONFIG = {
     'title': 'AI Bubble Dashboard',
     'description': 'Track potential speculative bubbles in the AI sector',
     'theme': 'bootstrap',
-    'refresh_interval': 5 * 60 * 1000  # 5 minutes in milliseconds
+    'refresh_interval': 5 * 60 * 1000,  # 5 minutes in milliseconds
+    'trend_default_points': 1000,  # points per trace before the chart width is known
+    'trend_max_points': 2000,  # upper bound on points per trace sent to the browser
+    'history_max_rows': 8000,  # history rows read from the index per chart, before LTTB
+    'query_cache_size': 256,  # index query results kept per index version for all open tabs
+    'table_page_size': 25  # universe table rows fetched per page
+}
+
+# Read API Configuration
+READ_API_CONFIG = {
+    'prefix': '/api/v1',
+    'default_page_size': 100,
+    'max_page_size': 1000
+}
+
+# News/Forum Deduplication Configuration (see src/data_collection/dedupe.py)
+DEDUPE_CONFIG = {
+    'bloom_capacity': 1000000,  # item IDs before the false positive rate degrades
+    'bloom_error_rate': 0.01,  # false positives only cost an item store lookup
+    'lru_size': 50000  # recently seen IDs kept exactly in memory
+}
+
+# SEC Filing Store Configuration (see src/storage/filing_store.py)
+SEC_FILING_CONFIG = {
+    # SEC EDGAR rejects requests without a descriptive User-Agent
+    'user_agent': os.getenv('SEC_USER_AGENT', 'AI Bubble Dashboard admin@example.com'),
+    'max_ngram': 2,  # longest phrase answered from the index alone
+    'compression_level': 6,
+    'query_batch_size': 50,  # tickers per sec-api query, keeps the query string well under its length limit
+    'page_size': 50,  # the most sec-api returns per request
+    'max_results': 10000,  # sec-api will not page past this offset
+    'initial_lookback_days': 400,  # range queried for a ticker with no stored filings, covers its last 10-K
+    'recent_filings': 10  # most recent filings in each ticker's snapshot, as the per-ticker query
+}
+
+# Bulk Export Configuration (see src/api/export.py)
+EXPORT_CONFIG = {
+    'chunk_rows': 10000,  # rows read from the index and encoded per chunk
+    'gzip_level': 6,
+    'parquet_compression': 'zstd'
+}
+
+# Alert Configuration (see src/alerts/engine.py)
+ALERT_CONFIG = {
+    'rules_file': 'config/alert_rules.json',
+    'alerts_file': 'data/alerts.jsonl',
+    'webhook_url': os.getenv('ALERT_WEBHOOK_URL'),  # optional; alerts are POSTed as JSON
+    'webhook_timeout': 10,
+    'webhook_max_queue': 100,  # alert batches waiting to be posted before new ones are dropped
+    'default_hysteresis': 0.02,  # how far a metric must move back before a threshold rule re-arms
+    'default_cooldown': 3600  # seconds between alerts from one rule for one ticker
+}
+
+# Snapshot Writer Configuration (see src/storage/snapshot_writer.py)
+SNAPSHOT_WRITER_CONFIG = {
+    'max_queue': 8,  # snapshots waiting for disk before submit blocks the collector
+    'batch_size': 4,  # queued snapshots written together under one directory fsync
+    'retries': 3,  # attempts per batch before a snapshot waits for the next batch
+    'retry_delay': 0.5,  # seconds, doubled after each failed attempt
+    'flush_timeout': 60  # seconds stop() waits for queued snapshots
+}
+
+# Profiling Configuration (see src/utils/profiling.py)
+PROFILING_CONFIG = {
+    'top_allocations': 25,  # allocation sites written per profile
+    'traceback_limit': 10,  # frames kept per allocation traceback
+    'trigger_file': 'data/profile.request'  # touch to profile the next collection cycle
 }
 
 # File Paths
@@ -79,7 +190,13 @@ PATHS = {
     'data_dir': 'data',
     'config_dir': 'config',
     'log_file': 'data/app.log',
-    'tickers_file': 'config/tickers.json'
+    'tickers_file': 'config/tickers.json',
+    'score_index': 'data/score_index.db',
+    'metric_sketches': 'data/metric_sketches.json',
+    'profiles_dir': 'data/profiles',
+    'filing_store': 'data/filings',
+    'filing_index': 'data/filing_index.db',
+    'item_store': 'data/items.db'
 }
 
 # Create necessary directories
@@ -0,0 +1,81 @@
+"""
+In-process publish/subscribe bus used to propagate data changes.
+
+The collector publishes events as it finishes tickers and cycles; scorers,
+indexes and views subscribe and recompute only what the event says changed.
+Handlers run synchronously on the publishing thread, and a failing handler is
+logged without affecting the others. Slow handlers subscribe a
+`CoalescingWorker` instead, so they run on their own thread.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict
+from src.utils.helpers import logger
+
+# Topics
+TICKER_CHANGED = 'ticker_changed'      # {'ticker', 'timestamp', 'data', 'hash'}
+CYCLE_COMPLETED = 'cycle_completed'    # {'timestamp', 'changed', 'tickers', 'universe', 'snapshot'}
+SCORES_UPDATED = 'scores_updated'      # {'timestamp', 'changed', 'scores'}
+ANALYSIS_UPDATED = 'analysis_updated'  # {'timestamp', 'subject', 'metrics'}
+
+class EventBus:
+    def __init__(self):
+        self._subscribers = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str, handler: Callable[[Dict[str, Any]], None]):
+        """Register `handler` to be called with the payload of every `topic` event."""
+        with self._lock:
+            self._subscribers[topic].append(handler)
+
+    def unsubscribe(self, topic: str, handler: Callable[[Dict[str, Any]], None]):
+        """Remove a previously registered handler."""
+        with self._lock:
+            if handler in self._subscribers[topic]:
+                self._subscribers[topic].remove(handler)
+
+    def publish(self, topic: str, payload: Dict[str, Any]):
+        """Deliver `payload` to every handler subscribed to `topic`."""
+        with self._lock:
+            handlers = list(self._subscribers[topic])
+        for handler in handlers:
+            try:
+                handler(payload)
+            except Exception as e:
+                logger.error(f"Error in {topic} handler {getattr(handler, '__name__', handler)}: {e}")
+
+class CoalescingWorker:
+    def __init__(self, target: Callable[[], None], name: str = None):
+        """Run `target` on a background thread each time `request` is called.
+
+        Requests arriving while `target` runs collapse into one further run, so a
+        slow handler neither blocks the publisher nor builds a backlog.
+        """
+        self.target = target
+        self.name = name or getattr(target, '__name__', 'worker')
+        self.runs = 0
+        self._pending = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def request(self, payload: Dict[str, Any] = None):
+        """Schedule a run; usable directly as an event handler."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        self._pending.set()
+
+    def _run(self):
+        while True:
+            self._pending.wait()
+            self._pending.clear()
+            try:
+                self.target()
+            except Exception as e:
+                logger.error(f"Error in {self.name}: {e}")
+            self.runs += 1
+
+# Shared bus for the running process
+event_bus = EventBus()
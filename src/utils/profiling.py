@@ -0,0 +1,210 @@
+"""
+On-demand profiling of collection cycles and dashboard renders.
+
+`CycleProfiler` traces every Python and builtin call on the profiling thread
+(deterministic, not sampled), tracks allocations with tracemalloc and times
+named phases. On exit it writes three files to a timestamped directory:
+
+- `stacks.folded`: one `frame;frame;frame microseconds` line per call stack,
+  the input format of flamegraph.pl, speedscope and inferno
+- `allocations.txt`: the top allocation sites still alive at the end of the run
+- `summary.json`: wall time, CPU time and peak traced memory per phase
+
+Code marks phases with the module-level `phase(name)`, which is free when no
+profiler is active and on every thread other than the profiled one.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+from src.utils.config import PATHS, PROFILING_CONFIG
+from src.utils.helpers import ensure_directory, logger
+
+_active = None
+
+def active_profiler() -> Optional['CycleProfiler']:
+    """The profiler currently running, if any."""
+    return _active
+
+@contextmanager
+def phase(name: str):
+    """Time a named phase under the active profiler; a no-op otherwise."""
+    if _active is None or not _active.on_profiled_thread():
+        yield
+    else:
+        with _active.phase(name):
+            yield
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _builtin_label(func) -> str:
+    module = getattr(func, '__module__', None) or type(getattr(func, '__self__', None)).__name__
+    return f"{module}.{getattr(func, '__qualname__', repr(func))} (builtin)"
+
+class _StackTracer:
+    """Self time per full call stack, collected with `sys.setprofile`."""
+
+    def __init__(self, root: str):
+        self.folded = defaultdict(float)
+        # Each entry: [stack path, start time, time spent in children]
+        self._stack = [[root, time.perf_counter(), 0.0]]
+
+    def __call__(self, frame, event, arg):
+        now = time.perf_counter()
+        if event == 'call':
+            self._push(_frame_label(frame.f_code), now)
+        elif event == 'c_call':
+            self._push(_builtin_label(arg), now)
+        elif event in ('return', 'c_return', 'c_exception'):
+            # Returns from frames entered before tracing started have nothing to pop
+            if len(self._stack) > 1:
+                self._pop(now)
+
+    def _push(self, label, now):
+        self._stack.append([f"{self._stack[-1][0]};{label}", now, 0.0])
+
+    def _pop(self, now):
+        path, start, children = self._stack.pop()
+        elapsed = now - start
+        self.folded[path] += elapsed - children
+        self._stack[-1][2] += elapsed
+
+    def finish(self):
+        now = time.perf_counter()
+        while len(self._stack) > 1:
+            self._pop(now)
+        path, start, children = self._stack[0]
+        self.folded[path] += (now - start) - children
+
+class CycleProfiler:
+    def __init__(self, output_dir: str = None, label: str = 'cycle',
+                 top_allocations: int = None, traceback_limit: int = None):
+        """Profile the thread that enters the context; results go under `output_dir`."""
+        self.output_dir = output_dir or PATHS['profiles_dir']
+        self.label = label
+        self.top_allocations = top_allocations or PROFILING_CONFIG['top_allocations']
+        self.traceback_limit = traceback_limit or PROFILING_CONFIG['traceback_limit']
+        self.phases = {}
+        self.paths = {}
+        self._open = []
+        self._thread = None
+        self._lock = threading.Lock()
+        self._tracer = None
+        self._owns_tracemalloc = False
+        self._snapshot = None
+
+    def __enter__(self):
+        global _active
+        if _active is not None:
+            raise RuntimeError("Another profiler is already active")
+        _active = self
+        self._thread = threading.get_ident()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.traceback_limit)
+            self._owns_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._open = [[self.label, 0]]
+        self._start = (time.perf_counter(), time.process_time())
+        self._tracer = _StackTracer(self.label)
+        sys.setprofile(self._tracer)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active
+        sys.setprofile(None)
+        self._tracer.finish()
+        self._checkpoint()
+        self._record(self.label, self._start, self._open[0][1])
+        self._snapshot = tracemalloc.take_snapshot()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        _active = None
+        try:
+            self.write()
+        except Exception as e:
+            logger.error(f"Error writing profile: {e}")
+        return False
+
+    def on_profiled_thread(self) -> bool:
+        """Whether the calling thread is the one this profiler traces."""
+        return threading.get_ident() == self._thread
+
+    @contextmanager
+    def phase(self, name: str):
+        """Record wall time, CPU time and peak memory of a (possibly nested) phase.
+
+        Only the profiled thread has phases; on any other thread (e.g. the
+        dashboard's snapshot worker) this is a no-op, so the open-phase stack
+        is never shared.
+        """
+        if not self.on_profiled_thread():
+            yield
+            return
+        path = '/'.join([entry[0] for entry in self._open[1:]] + [name])
+        self._checkpoint()
+        self._open.append([name, 0])
+        start = (time.perf_counter(), time.process_time())
+        try:
+            yield
+        finally:
+            self._checkpoint()
+            self._record(path, start, self._open.pop()[1])
+
+    def _checkpoint(self):
+        # Fold the peak so far into every open phase before restarting the peak
+        peak = tracemalloc.get_traced_memory()[1]
+        for entry in self._open:
+            entry[1] = max(entry[1], peak)
+        tracemalloc.reset_peak()
+
+    def _record(self, path, start, peak):
+        wall = time.perf_counter() - start[0]
+        cpu = time.process_time() - start[1]
+        with self._lock:
+            entry = self.phases.setdefault(path, {'calls': 0, 'wall_seconds': 0.0,
+                                                  'cpu_seconds': 0.0, 'peak_memory_bytes': 0})
+            entry['calls'] += 1
+            entry['wall_seconds'] += wall
+            entry['cpu_seconds'] += cpu
+            entry['peak_memory_bytes'] = max(entry['peak_memory_bytes'], peak)
+
+    def write(self) -> Dict[str, str]:
+        """Write stacks, allocation sites and the phase summary; returns their paths."""
+        directory = os.path.join(self.output_dir, f"{self.label}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+        ensure_directory(directory)
+        self.paths = {
+            'stacks': os.path.join(directory, 'stacks.folded'),
+            'allocations': os.path.join(directory, 'allocations.txt'),
+            'summary': os.path.join(directory, 'summary.json')
+        }
+
+        with open(self.paths['stacks'], 'w') as f:
+            for path, seconds in sorted(self._tracer.folded.items()):
+                micros = int(round(seconds * 1e6))
+                if micros > 0:
+                    f.write(f"{path} {micros}\n")
+
+        snapshot = self._snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+        with open(self.paths['allocations'], 'w') as f:
+            for stat in snapshot.statistics('traceback')[:self.top_allocations]:
+                f.write(f"{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+                for line in stat.traceback.format(most_recent_first=True):
+                    f.write(f"{line}\n")
+                f.write("\n")
+
+        with open(self.paths['summary'], 'w') as f:
+            json.dump({'label': self.label, 'phases': self.phases}, f, indent=2)
+
+        logger.info(f"Wrote profile to {directory}")
+        return self.paths
@@ -0,0 +1,28 @@
+// Receive dashboard snapshots pushed by the server instead of polling.
+(function () {
+    // The stream path comes from the server's API config and is resolved against Dash's
+    // path prefix, so the dashboard also works when served under a sub-path
+    var config = JSON.parse(document.getElementById('_dash-config').textContent);
+    var meta = document.querySelector('meta[name="snapshot-stream"]');
+    var source = new EventSource(config.requests_pathname_prefix + meta.content);
+    var pending = null;
+
+    function apply() {
+        if (pending === null) {
+            return;
+        }
+        // The store only exists once Dash has rendered the layout
+        if (!window.dash_clientside || !window.dash_clientside.set_props ||
+                !document.getElementById('dashboard-snapshot')) {
+            setTimeout(apply, 500);
+            return;
+        }
+        window.dash_clientside.set_props('dashboard-snapshot', {data: pending});
+        pending = null;
+    }
+
+    source.onmessage = function (event) {
+        pending = JSON.parse(event.data);
+        apply();
+    };
+})();
@@ -3,25 +3,203 @@ Dashboard component for bubble analysis visualization.
 """
 
 import dash
-from dash import html, dcc
+from dash import html, dcc, ctx
 import dash_bootstrap_components as dbc
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
+import json
+from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.utils import PlotlyJSONEncoder
 from src.analysis.bubble_analysis import BubbleAnalyzer
+from src.visualization.downsampling import lttb
+from src.utils.config import SIMULATION_CONFIG, DASHBOARD_CONFIG
+from src.utils.profiling import phase
+import numpy as np
 import pandas as pd
 import logging
 
 logger = logging.getLogger(__name__)
 
-def create_bubble_dashboard():
-    """Create the bubble analysis dashboard component."""
-    
-    try:
-        # Initialize the analyzer
+TREND_SERIES = ['ps_ratio', 'ps_ratio_ma12']
+TREND_INTERVALS = {'1mo': 'Monthly', '1wk': 'Weekly', '1d': 'Daily', '1h': 'Hourly', '5m': '5 Minutes'}
+
+# Full-resolution trend data per interval; zooming slices this instead of refetching
+_trend_data = {}
+
+def load_trend_data(interval):
+    """Collect P/S ratio history at `interval` and cache it at full resolution."""
+    data = BubbleAnalyzer(interval=interval).collect_data()
+    data['ps_ratio_ma12'] = data['ps_ratio'].rolling(window=12).mean()
+    _trend_data[interval] = data
+    return data
+
+def trend_point_budget(width):
+    """Points per trace: roughly one per horizontal pixel of the chart."""
+    if not width:
+        return DASHBOARD_CONFIG['trend_default_points']
+    return int(min(max(width, 100), DASHBOARD_CONFIG['trend_max_points']))
+
+def visible_range(relayout_data):
+    """Extract the zoomed x-axis range from Plotly relayout data, or None for the full range."""
+    if not relayout_data or relayout_data.get('xaxis.autorange'):
+        return None
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        return [relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']]
+    if 'xaxis.range' in relayout_data:
+        return list(relayout_data['xaxis.range'])
+    return None
+
+def create_trend_figure(data, max_points, x_range=None, revision='1mo'):
+    """P/S ratio trend with each trace downsampled (LTTB) to `max_points` over the visible range."""
+    visible = data.loc[pd.Timestamp(x_range[0]):pd.Timestamp(x_range[1])] if x_range else data
+    traces = []
+    for column in TREND_SERIES:
+        series = visible[column].dropna()
+        x = np.asarray(series.index, dtype='datetime64[ns]').astype(np.int64)
+        keep = lttb(x, series.values, max_points)
+        traces.append(go.Scatter(x=series.index[keep], y=series.values[keep], mode='lines', name=column))
+
+    figure = go.Figure(traces).update_layout(
+        title='P/S Ratio Trend Analysis',
+        xaxis_title="Date",
+        yaxis_title="P/S Ratio",
+        template="plotly_white",
+        uirevision=f'ps-ratio-trend-{revision}'
+    )
+    if x_range:
+        figure.update_xaxes(range=x_range)
+    return figure
+
+RISK_LEVEL_COLORS = {'LOW': '#28a745', 'MODERATE': '#ffc107', 'HIGH': '#dc3545'}
+
+def simulate_risk(analyzer):
+    """Run the Monte Carlo bubble regime simulation with the configured settings."""
+    return analyzer.simulate_bubble_risk(
+        n_paths=SIMULATION_CONFIG['n_paths'],
+        horizons=SIMULATION_CONFIG['horizons'],
+        seed=SIMULATION_CONFIG['seed'],
+        n_workers=SIMULATION_CONFIG['n_workers'],
+        method=SIMULATION_CONFIG['method']
+    )
+
+def create_risk_probability_figure(simulation):
+    """Stacked bar chart of simulated risk level probabilities per horizon."""
+    horizons = list(simulation['horizons'])
+    figure = go.Figure([
+        go.Bar(
+            name=level,
+            x=[f"{h} period{'s' if h > 1 else ''}" for h in horizons],
+            y=[simulation['horizons'][h][level] for h in horizons],
+            marker_color=color
+        )
+        for level, color in RISK_LEVEL_COLORS.items()
+    ])
+    return figure.update_layout(
+        barmode='stack',
+        title=f"Simulated Bubble Risk Probabilities ({simulation['n_paths']:,} paths)",
+        xaxis_title="Horizon",
+        yaxis_title="Probability",
+        yaxis_tickformat='.0%',
+        template="plotly_white"
+    )
+
+def create_correlation_figure(data):
+    """Correlation matrix heatmap of the analysis inputs."""
+    return px.imshow(
+        data.corr(),
+        title='Correlation Matrix',
+        color_continuous_scale='RdBu'
+    ).update_layout(
+        template="plotly_white"
+    )
+
+def risk_alert_color(risk_level):
+    """Bootstrap alert color for a risk level."""
+    return "danger" if risk_level == 'HIGH' else "warning" if risk_level == 'MODERATE' else "success"
+
+def build_dashboard_snapshot():
+    """Run the analysis once and render everything the dashboard shows.
+
+    The same snapshot seeds the initial layout and is pushed to every open tab
+    after each collection cycle, so viewers never trigger the analysis.
+    """
+    with phase('analysis'):
         analyzer = BubbleAnalyzer()
         data = analyzer.collect_data()
         risk_metrics = analyzer.analyze_bubble_risk()
+    with phase('simulation'):
+        simulation = simulate_risk(analyzer)
+
+    # Finer intervals are re-fetched lazily against the new data. Swapped in one
+    # assignment since request threads read it while this runs on the snapshot worker
+    global _trend_data
+    _trend_data = {analyzer.interval: data}
+
+    with phase('figures'):
+        figures = {
+            'ps-ratio-trend': create_trend_figure(data, DASHBOARD_CONFIG['trend_default_points']),
+            'risk-probabilities': create_risk_probability_figure(simulation),
+            'correlation-heatmap': create_correlation_figure(data)
+        }
+
+    risk_level = risk_metrics['bubble_risk_level']
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'interval': analyzer.interval,
+        'figures': figures,
+        'risk_metrics': {
+            'bubble_risk_level': risk_level,
+            'current_deviation': float(risk_metrics['current_deviation']),
+            'volatility': float(risk_metrics['volatility'])
+        },
+        'alert': {
+            'children': f"Current Bubble Risk Level: {risk_level}",
+            'color': risk_alert_color(risk_level)
+        },
+        'text': {
+            'current-deviation': f"Current Deviation: {risk_metrics['current_deviation']:.2f}%",
+            'volatility': f"Volatility: {risk_metrics['volatility']:.2f}%",
+            'vix-value': f"VIX: {data['vix'].iloc[-1]:.2f}",
+            'fed-rate-value': f"Fed Rate: {data['fed_rate'].iloc[-1]:.2f}%",
+            'm2-value': f"M2 YoY: {data['m2_yoy'].iloc[-1]:.2f}%"
+        }
+    }
+
+def placeholder_snapshot():
+    """Empty snapshot that lays out the page until the first built one is pushed."""
+    return {
+        'timestamp': None,
+        'interval': next(iter(TREND_INTERVALS)),
+        'figures': {name: go.Figure() for name in ('ps-ratio-trend', 'risk-probabilities', 'correlation-heatmap')},
+        'risk_metrics': None,
+        'alert': {'children': "Loading bubble risk analysis...", 'color': 'secondary'},
+        'text': {
+            'current-deviation': "Current Deviation: -",
+            'volatility': "Volatility: -",
+            'vix-value': "VIX: -",
+            'fed-rate-value': "Fed Rate: -",
+            'm2-value': "M2 YoY: -"
+        }
+    }
+
+def render_dashboard_snapshot():
+    """Build a snapshot and its layout and encode both as they are sent to browsers."""
+    with phase('render'):
+        snapshot = build_dashboard_snapshot()
+        layout = create_bubble_dashboard(snapshot)
+    with phase('serialize'):
+        json.dumps({'snapshot': snapshot, 'layout': layout}, cls=PlotlyJSONEncoder)
+    return snapshot
+
+def create_bubble_dashboard(snapshot=None):
+    """Create the bubble analysis dashboard component."""
+    
+    try:
+        if snapshot is None:
+            snapshot = build_dashboard_snapshot()
+        figures = snapshot['figures']
+        text = snapshot['text']
         
         # Create the layout
         layout = dbc.Container([
@@ -30,9 +208,9 @@ def create_bubble_dashboard():
                     html.H2("AI Sector Bubble Analysis", className="text-center mb-4"),
                     html.Div([
                         dbc.Alert(
-                            f"Current Bubble Risk Level: {risk_metrics['bubble_risk_level']}",
-                            color="danger" if risk_metrics['bubble_risk_level'] == 'HIGH' else 
-                                  "warning" if risk_metrics['bubble_risk_level'] == 'MODERATE' else "success",
+                            snapshot['alert']['children'],
+                            id='risk-level-alert',
+                            color=snapshot['alert']['color'],
                             className="mb-4"
                         )
                     ])
@@ -41,17 +219,26 @@ def create_bubble_dashboard():
             
             dbc.Row([
                 dbc.Col([
+                    dcc.Dropdown(
+                        id='trend-interval',
+                        options=[{'label': label, 'value': value} for value, label in TREND_INTERVALS.items()],
+                        value=snapshot['interval'],
+                        clearable=False,
+                        style={'width': '200px'}
+                    ),
+                    dcc.Store(id='ps-ratio-trend-width'),
                     dcc.Graph(
                         id='ps-ratio-trend',
-                        figure=px.line(
-                            data,
-                            y=['ps_ratio', 'ps_ratio_ma12'],
-                            title='P/S Ratio Trend Analysis'
-                        ).update_layout(
-                            xaxis_title="Date",
-                            yaxis_title="P/S Ratio",
-                            template="plotly_white"
-                        )
+                        figure=figures['ps-ratio-trend']
+                    )
+                ], width=12)
+            ]),
+            
+            dbc.Row([
+                dbc.Col([
+                    dcc.Graph(
+                        id='risk-probabilities',
+                        figure=figures['risk-probabilities']
                     )
                 ], width=12)
             ]),
@@ -60,13 +247,7 @@ def create_bubble_dashboard():
                 dbc.Col([
                     dcc.Graph(
                         id='correlation-heatmap',
-                        figure=px.imshow(
-                            data.corr(),
-                            title='Correlation Matrix',
-                            color_continuous_scale='RdBu'
-                        ).update_layout(
-                            template="plotly_white"
-                        )
+                        figure=figures['correlation-heatmap']
                     )
                 ], width=12)
             ]),
@@ -75,17 +256,17 @@ def create_bubble_dashboard():
                 dbc.Col([
                     html.Div([
                         html.H4("Risk Metrics", className="mb-3"),
-                        html.P(f"Current Deviation: {risk_metrics['current_deviation']:.2f}%"),
-                        html.P(f"Volatility: {risk_metrics['volatility']:.2f}%")
+                        html.P(text['current-deviation'], id='current-deviation'),
+                        html.P(text['volatility'], id='volatility')
                     ], className="p-3 bg-light rounded")
                 ], width=6),
                 
                 dbc.Col([
                     html.Div([
                         html.H4("Market Indicators", className="mb-3"),
-                        html.P(f"VIX: {data['vix'].iloc[-1]:.2f}"),
-                        html.P(f"Fed Rate: {data['fed_rate'].iloc[-1]:.2f}%"),
-                        html.P(f"M2 YoY: {data['m2_yoy'].iloc[-1]:.2f}%")
+                        html.P(text['vix-value'], id='vix-value'),
+                        html.P(text['fed-rate-value'], id='fed-rate-value'),
+                        html.P(text['m2-value'], id='m2-value')
                     ], className="p-3 bg-light rounded")
                 ], width=6)
             ])
@@ -103,42 +284,74 @@ def create_bubble_dashboard():
 def register_callbacks(app):
     """Register callbacks for the bubble dashboard."""
     
+    # Apply pushed snapshots in the browser; the server does no per-client work
+    app.clientside_callback(
+        """
+        function(snapshot, interval) {
+            var figures = snapshot.figures;
+            var text = snapshot.text;
+            // The pushed trend is at the snapshot's interval; keep a different one the user picked
+            var trend = interval === snapshot.interval ? figures['ps-ratio-trend'] : window.dash_clientside.no_update;
+            return [
+                trend,
+                figures['risk-probabilities'],
+                figures['correlation-heatmap'],
+                snapshot.alert.children,
+                snapshot.alert.color,
+                text['current-deviation'],
+                text['volatility'],
+                text['vix-value'],
+                text['fed-rate-value'],
+                text['m2-value']
+            ];
+        }
+        """,
+        Output('ps-ratio-trend', 'figure', allow_duplicate=True),
+        Output('risk-probabilities', 'figure'),
+        Output('correlation-heatmap', 'figure'),
+        Output('risk-level-alert', 'children'),
+        Output('risk-level-alert', 'color'),
+        Output('current-deviation', 'children'),
+        Output('volatility', 'children'),
+        Output('vix-value', 'children'),
+        Output('fed-rate-value', 'children'),
+        Output('m2-value', 'children'),
+        Input('dashboard-snapshot', 'data'),
+        State('trend-interval', 'value'),
+        prevent_initial_call=True
+    )
+    
+    # Measure the rendered chart so the server sends about one point per pixel. Only a
+    # changed width reaches the server; otherwise every push would trigger a server
+    # re-render per tab that replaces the trend the push just delivered
+    app.clientside_callback(
+        """
+        function(snapshot, previous) {
+            var graph = document.getElementById('ps-ratio-trend');
+            var width = graph ? graph.offsetWidth : null;
+            return width === previous ? window.dash_clientside.no_update : width;
+        }
+        """,
+        Output('ps-ratio-trend-width', 'data'),
+        Input('dashboard-snapshot', 'data'),
+        State('ps-ratio-trend-width', 'data')
+    )
+    
     @app.callback(
         Output('ps-ratio-trend', 'figure'),
-        Input('interval-component', 'n_intervals')
+        Input('trend-interval', 'value'),
+        Input('ps-ratio-trend', 'relayoutData'),
+        Input('ps-ratio-trend-width', 'data'),
+        prevent_initial_call=True
     )
-    def update_ps_ratio_trend(n):
+    def update_ps_ratio_trend(interval, relayout_data, width):
         try:
-            analyzer = BubbleAnalyzer()
-            data = analyzer.collect_data()
-            return px.line(
-                data,
-                y=['ps_ratio', 'ps_ratio_ma12'],
-                title='P/S Ratio Trend Analysis'
-            ).update_layout(
-                xaxis_title="Date",
-                yaxis_title="P/S Ratio",
-                template="plotly_white"
-            )
+            data = _trend_data.get(interval)
+            if data is None:
+                data = load_trend_data(interval)
+            # Switching granularity starts from the full range; otherwise keep the user's zoom
+            x_range = None if ctx.triggered_id == 'trend-interval' else visible_range(relayout_data)
+            return create_trend_figure(data, trend_point_budget(width), x_range, revision=interval)
         except Exception as e:
             logger.error(f"Error updating P/S ratio trend: {e}")
             return go.Figure()
-    
-    @app.callback(
-        Output('correlation-heatmap', 'figure'),
-        Input('interval-component', 'n_intervals')
-    )
-    def update_correlation_heatmap(n):
-        try:
-            analyzer = BubbleAnalyzer()
-            data = analyzer.collect_data()
-            return px.imshow(
-                data.corr(),
-                title='Correlation Matrix',
-                color_continuous_scale='RdBu'
-            ).update_layout(
-                template="plotly_white"
-            )
-        except Exception as e:
-            logger.error(f"Error updating correlation heatmap: {e}")
-            return go.Figure() 
\ No newline at end of file
@@ -5,41 +5,112 @@ Main dashboard application for the AI Bubble Dashboard.
 import dash
 from dash import html, dcc
 import dash_bootstrap_components as dbc
-from src.visualization.bubble_dashboard import create_bubble_dashboard, register_callbacks
+from dash.dependencies import Input, Output
+from src.visualization.bubble_dashboard import (
+    build_dashboard_snapshot, create_bubble_dashboard, placeholder_snapshot, register_callbacks
+)
+from src.visualization import ticker_views
+from src.visualization.ticker_views import TICKER_PATH_PREFIX, create_universe_table
+from src.storage.score_index import ScoreIndex
+from src.api.routes import register_routes
+from src.api.push import SnapshotBroadcaster, register_push_route, stream_meta_tag
+from src.api.export import register_export_route
+from src.utils.events import event_bus, CoalescingWorker, SCORES_UPDATED, ANALYSIS_UPDATED
+from src.utils.helpers import logger
+from src.utils.profiling import phase
 
 # Initialize the app
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], meta_tags=[stream_meta_tag()])
 
-# Create the layout
+# Alert subject of the sector-level `analyze_bubble_risk` results
+SECTOR_SUBJECT = 'AI Sector'
+
+# Pushes a fresh snapshot to every open tab once each cycle's scores are indexed
+broadcaster = SnapshotBroadcaster()
+
+# Shared by the universe table, ticker pages and the read API
+score_index = ScoreIndex()
+
+def publish_snapshot():
+    """Rebuild the dashboard snapshot once and broadcast it."""
+    try:
+        with phase('render'):
+            snapshot = build_dashboard_snapshot()
+        # Index-backed views refresh only when this changes (see ticker_views)
+        snapshot['index_version'] = score_index.version()
+        with phase('serialize'):
+            broadcaster.publish(snapshot)
+        # Sector-level risk feeds the alert rules alongside per-ticker scores
+        event_bus.publish(ANALYSIS_UPDATED, {
+            'timestamp': snapshot['timestamp'],
+            'subject': SECTOR_SUBJECT,
+            'metrics': snapshot['risk_metrics']
+        })
+    except Exception as e:
+        logger.error(f"Error publishing dashboard snapshot: {e}")
+
+# Rebuilding downloads data and runs the simulation, so it happens off the collector's
+# thread; cycles finishing during a rebuild are covered by one more rebuild
+snapshot_worker = CoalescingWorker(publish_snapshot, name='dashboard-snapshot')
+event_bus.subscribe(SCORES_UPDATED, snapshot_worker.request)
+
+# Create the layout; the sector page starts empty and is filled by the first pushed
+# snapshot, which new tabs receive as soon as they connect
 app.layout = dbc.Container([
-    # Interval component for auto-refresh
-    dcc.Interval(
-        id='interval-component',
-        interval=5*60*1000,  # 5 minutes
-        n_intervals=0
-    ),
+    # Latest snapshot pushed by the server (see assets/push.js)
+    dcc.Store(id='dashboard-snapshot'),
+    dcc.Location(id='url'),
     
     # Navigation
     dbc.NavbarSimple(
+        children=[
+            dbc.NavItem(dbc.NavLink("Sector", href='/')),
+            dbc.NavItem(dbc.NavLink("Universe", href='/tickers'))
+        ],
         brand="AI Bubble Dashboard",
-        brand_href="#",
+        brand_href="/",
         color="primary",
         dark=True,
     ),
     
-    # Main content
-    dbc.Row([
+    # Pages stay mounted so pushed snapshots keep them current; only one is shown
+    html.Div(dbc.Row([
         dbc.Col([
-            create_bubble_dashboard()
+            create_bubble_dashboard(placeholder_snapshot())
         ], width=12)
-    ])
+    ]), id='sector-page'),
+    html.Div(create_universe_table(), id='universe-page', style={'display': 'none'}),
+    html.Div(id='ticker-page', style={'display': 'none'})
 ], fluid=True)
 
+@app.callback(
+    Output('sector-page', 'style'),
+    Output('universe-page', 'style'),
+    Output('ticker-page', 'style'),
+    Input('url', 'pathname')
+)
+def display_page(pathname):
+    """Show the page matching the URL."""
+    hidden, shown = {'display': 'none'}, {}
+    if pathname == '/tickers':
+        return hidden, shown, hidden
+    if pathname and pathname.startswith(TICKER_PATH_PREFIX):
+        return hidden, hidden, shown
+    return shown, hidden, hidden
+
 # Register callbacks
 register_callbacks(app)
+ticker_views.register_callbacks(app, score_index)
+
+# Serve the read API from the same Flask server
+register_routes(app.server, score_index)
+register_push_route(app.server, broadcaster)
+register_export_route(app.server, score_index)
 
 def run_dashboard(debug: bool = False, port: int = 8050):
     """Run the dashboard application."""
+    # Build the first snapshot in the background while the server starts
+    snapshot_worker.request()
     app.run_server(debug=debug, port=port)
 
 if __name__ == '__main__':
@@ -0,0 +1,43 @@
+"""
+Shape-preserving downsampling for long time series charts.
+"""
+
+import numpy as np
+
+def lttb(x, y, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of `n_out` points that preserve the series' shape.
+
+    The first and last points are always kept. Between them the series is split
+    into `n_out - 2` equal buckets and from each bucket the point forming the
+    largest triangle with the previously selected point and the next bucket's
+    average is kept. Bucket averages are precomputed with cumulative sums, so
+    only the final per-bucket argmax runs in a Python loop.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    edges = np.floor(np.arange(n_out - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    # Average point of each bucket, plus the last point as the final "bucket"
+    cum_x = np.concatenate([[0.0], np.cumsum(x)])
+    cum_y = np.concatenate([[0.0], np.cumsum(y)])
+    counts = edges[1:] - edges[:-1]
+    avg_x = np.append((cum_x[edges[1:]] - cum_x[edges[:-1]]) / counts, x[-1])
+    avg_y = np.append((cum_y[edges[1:]] - cum_y[edges[:-1]]) / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        bx, by = avg_x[i + 1], avg_y[i + 1]
+        area = np.abs((x[a] - bx) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (by - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
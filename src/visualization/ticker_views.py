@@ -0,0 +1,287 @@
+"""
+Universe table, group aggregate charts and per-ticker drilldown pages.
+
+The table uses DataTable custom paging, sorting and filtering: every change is
+answered by a `ScoreIndex` query, so the browser only ever holds the visible
+page. Pushed snapshots carry the index version. Tables refresh only when it
+changes, and query results are shared per version, so tabs showing the same
+page cost one query per index update. A ticker's detail page is rendered by a
+callback when it is opened, so its history is read from the index only for
+tickers someone actually looks at. Long histories are thinned in SQLite
+before LTTB.
+"""
+
+from functools import lru_cache
+from dash import html, dcc, dash_table, no_update
+from dash.dash_table.Format import Format, Scheme
+import dash_bootstrap_components as dbc
+from dash.dependencies import Input, Output, State
+import plotly.graph_objects as go
+from src.storage.score_index import ScoreIndex, COMPONENT_COLUMNS, parse_filter_query
+from src.visualization.downsampling import lttb
+from src.utils.config import DASHBOARD_CONFIG
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+TICKER_PATH_PREFIX = '/ticker/'
+
+# `BubbleScorer.get_risk_level` labels that are highlighted
+HIGH_RISK_LEVELS = ('Extreme Risk', 'High Risk')
+
+COMPONENT_LABELS = {
+    'valuation_score': 'Valuation',
+    'sentiment_score': 'Sentiment',
+    'growth_score': 'Growth',
+    'ai_exposure_score': 'AI Exposure',
+    'market_score': 'Market'
+}
+
+_SCORE_FORMAT = Format(precision=3, scheme=Scheme.fixed)
+
+TABLE_COLUMNS = [
+    {'name': 'Ticker', 'id': 'ticker'},
+    {'name': 'Bubble Risk', 'id': 'bubble_risk', 'type': 'numeric', 'format': _SCORE_FORMAT},
+    {'name': 'Risk Level', 'id': 'risk_level'}
+] + [
+    {'name': COMPONENT_LABELS[column], 'id': column, 'type': 'numeric', 'format': _SCORE_FORMAT}
+    for column in COMPONENT_COLUMNS
+] + [
+    {'name': 'Price', 'id': 'current_price', 'type': 'numeric',
+     'format': Format(precision=2, scheme=Scheme.fixed)},
+    {'name': 'Market Cap', 'id': 'market_cap', 'type': 'numeric',
+     'format': Format(precision=3, scheme=Scheme.decimal_si_prefix)},
+    {'name': 'Updated', 'id': 'timestamp'}
+]
+
+# Labels of `BubbleAggregates` group types
+GROUP_TYPE_LABELS = {
+    'universe': 'Index',
+    'sector': 'Sector',
+    'sub_industry': 'Sub-industry',
+    'basket': 'Basket'
+}
+
+_GROUP_SEPARATOR = '|'
+
+def create_aggregate_panel():
+    """Market-cap-weighted bubble risk history of the universe, sectors and baskets."""
+    return dbc.Row([
+        dbc.Col([
+            dcc.Dropdown(id='aggregate-group', clearable=False, className="mb-2"),
+            html.Div(id='aggregate-summary', className="text-muted"),
+            dcc.Graph(id='aggregate-history')
+        ], width=12)
+    ], className="mb-4")
+
+def create_universe_table():
+    """Create the universe table; its rows are filled page by page from the score index."""
+    return dbc.Container([
+        # Score index version of the last pushed snapshot; index-backed views refresh on change
+        dcc.Store(id='index-version'),
+        html.H2("Ticker Universe", className="text-center mb-4"),
+        create_aggregate_panel(),
+        dash_table.DataTable(
+            id='universe-table',
+            columns=TABLE_COLUMNS,
+            data=[],
+            page_current=0,
+            page_size=DASHBOARD_CONFIG['table_page_size'],
+            page_action='custom',
+            sort_action='custom',
+            sort_mode='multi',
+            sort_by=[{'column_id': 'bubble_risk', 'direction': 'desc'}],
+            filter_action='custom',
+            filter_query='',
+            style_table={'overflowX': 'auto'},
+            style_cell={'textAlign': 'left'},
+            style_data_conditional=[
+                {'if': {'filter_query': ' || '.join(f'{{risk_level}} = "{level}"' for level in HIGH_RISK_LEVELS)},
+                 'backgroundColor': '#f8d7da'},
+                {'if': {'column_id': 'ticker'}, 'cursor': 'pointer', 'fontWeight': 'bold'}
+            ]
+        ),
+        html.Div(id='universe-table-status', className="text-muted mt-2")
+    ], fluid=True)
+
+def create_history_figure(rows, max_points, title='Bubble Risk History'):
+    """Bubble risk history of one ticker or group, downsampled for display."""
+    frame = pd.DataFrame(rows, columns=['timestamp', 'bubble_risk']).dropna()
+    if len(frame) > max_points:
+        frame = frame.iloc[lttb(np.arange(len(frame)), frame['bubble_risk'].values, max_points)]
+    figure = go.Figure(go.Scatter(
+        x=pd.to_datetime(frame['timestamp']),
+        y=frame['bubble_risk'],
+        name='Bubble Risk',
+        line=dict(color='blue')
+    ))
+    return figure.update_layout(
+        title=title,
+        xaxis_title='Date',
+        yaxis_title='Bubble Risk',
+        yaxis_range=[0, 1],
+        template="plotly_white"
+    )
+
+def create_component_figure(components):
+    """Latest component scores of one ticker."""
+    scores = components['component_scores']
+    return go.Figure(go.Bar(
+        x=[COMPONENT_LABELS[column] for column in COMPONENT_COLUMNS],
+        y=[scores.get(column) for column in COMPONENT_COLUMNS],
+        marker_color='steelblue'
+    )).update_layout(
+        title='Component Scores',
+        yaxis_range=[0, 1],
+        template="plotly_white"
+    )
+
+def create_ticker_detail(ticker, score_index):
+    """Detail page for one ticker, built only when the page is opened."""
+    components = score_index.get_components(ticker)
+    if components is None:
+        return dbc.Alert(f"No scores indexed for {ticker}.", color="warning", className="m-4")
+
+    # Thinned in SQLite, then downsampled to the chart's point budget
+    rows = score_index.sample_history(ticker, DASHBOARD_CONFIG['history_max_rows'])
+    return dbc.Container([
+        dcc.Link("← Back to universe", href='/tickers'),
+        html.H2(ticker, className="text-center mb-2"),
+        dbc.Alert(
+            f"Bubble Risk: {components['bubble_risk']:.3f} ({components['risk_level']}) "
+            f"as of {components['timestamp']}",
+            color="danger" if components['risk_level'] in HIGH_RISK_LEVELS else "info",
+            className="mb-4"
+        ),
+        dbc.Row([
+            dbc.Col([
+                dcc.Graph(figure=create_history_figure(rows, DASHBOARD_CONFIG['trend_max_points']))
+            ], width=8),
+            dbc.Col([
+                dcc.Graph(figure=create_component_figure(components))
+            ], width=4)
+        ])
+    ], fluid=True)
+
+def register_callbacks(app, score_index=None):
+    """Register callbacks for the universe table and ticker pages."""
+    index = score_index or ScoreIndex()
+
+    # Forward the pushed index version only when it changed
+    app.clientside_callback(
+        """
+        function(snapshot, current) {
+            if (!snapshot || snapshot.index_version === undefined || snapshot.index_version === current) {
+                return window.dash_clientside.no_update;
+            }
+            return snapshot.index_version;
+        }
+        """,
+        Output('index-version', 'data'),
+        Input('dashboard-snapshot', 'data'),
+        State('index-version', 'data')
+    )
+
+    # Keyed by index version, so every tab showing the same page shares one query per update
+    @lru_cache(maxsize=DASHBOARD_CONFIG['query_cache_size'])
+    def latest_page(version, limit, offset, sort, filter_query):
+        return index.get_latest(limit, offset, list(sort), parse_filter_query(filter_query))
+
+    @app.callback(
+        Output('universe-table', 'data'),
+        Output('universe-table', 'page_count'),
+        Output('universe-table-status', 'children'),
+        Input('universe-table', 'page_current'),
+        Input('universe-table', 'page_size'),
+        Input('universe-table', 'sort_by'),
+        Input('universe-table', 'filter_query'),
+        Input('index-version', 'data')
+    )
+    def update_universe_table(page_current, page_size, sort_by, filter_query, version):
+        try:
+            sort = tuple((item['column_id'], item['direction']) for item in sort_by or [])
+            if version is None:
+                version = index.version()
+            rows, total = latest_page(version, page_size, page_current * page_size, sort, filter_query or '')
+            page_count = max(1, -(-total // page_size))
+            return rows, page_count, f"{total} tickers"
+        except ValueError as e:
+            return [], 1, f"Invalid filter or sort: {e}"
+        except Exception as e:
+            logger.error(f"Error updating universe table: {e}")
+            return [], 1, "Error loading tickers"
+
+    @lru_cache(maxsize=DASHBOARD_CONFIG['query_cache_size'])
+    def latest_aggregates(version):
+        # The whole-universe index first, then sectors, sub-industries and baskets
+        return sorted(index.get_latest_aggregates(),
+                      key=lambda row: list(GROUP_TYPE_LABELS).index(row['group_type']))
+
+    @lru_cache(maxsize=DASHBOARD_CONFIG['query_cache_size'])
+    def aggregate_history(version, group_type, group_name):
+        return index.sample_aggregate_history(group_type, group_name, DASHBOARD_CONFIG['history_max_rows'])
+
+    @app.callback(
+        Output('aggregate-group', 'options'),
+        Output('aggregate-group', 'value'),
+        Output('aggregate-history', 'figure'),
+        Output('aggregate-summary', 'children'),
+        Input('aggregate-group', 'value'),
+        Input('index-version', 'data')
+    )
+    def update_aggregate_history(selected, version):
+        try:
+            if version is None:
+                version = index.version()
+            latest = latest_aggregates(version)
+            if not latest:
+                return [], None, go.Figure(), "No aggregates indexed yet"
+            options = [
+                {'label': f"{GROUP_TYPE_LABELS.get(row['group_type'], row['group_type'])}: {row['group_name']}",
+                 'value': f"{row['group_type']}{_GROUP_SEPARATOR}{row['group_name']}"}
+                for row in latest
+            ]
+            values = [option['value'] for option in options]
+            if selected not in values:
+                selected = values[0]
+            group_type, group_name = selected.split(_GROUP_SEPARATOR, 1)
+            rows = aggregate_history(version, group_type, group_name)
+            current = latest[values.index(selected)]
+            figure = create_history_figure(
+                rows, DASHBOARD_CONFIG['trend_max_points'], f"{group_name} Bubble Risk (market-cap weighted)"
+            )
+            summary = (
+                f"{current['n_members']} members, market cap {current['market_cap']:.3g}, "
+                f"bubble risk {current['bubble_risk']:.3f} as of {current['timestamp']}"
+            )
+            return options, selected, figure, summary
+        except Exception as e:
+            logger.error(f"Error updating aggregate history: {e}")
+            return no_update, no_update, no_update, "Error loading aggregates"
+
+    @app.callback(
+        Output('url', 'pathname'),
+        Input('universe-table', 'active_cell'),
+        State('universe-table', 'data'),
+        prevent_initial_call=True
+    )
+    def open_ticker(active_cell, data):
+        if not active_cell or active_cell['row'] >= len(data or []):
+            return no_update
+        return f"{TICKER_PATH_PREFIX}{data[active_cell['row']]['ticker']}"
+
+    @app.callback(
+        Output('ticker-page', 'children'),
+        Input('url', 'pathname')
+    )
+    def render_ticker_page(pathname):
+        if not pathname or not pathname.startswith(TICKER_PATH_PREFIX):
+            return None
+        ticker = pathname[len(TICKER_PATH_PREFIX):].upper()
+        try:
+            return create_ticker_detail(ticker, index)
+        except Exception as e:
+            logger.error(f"Error loading detail page for {ticker}: {e}")
+            return dbc.Alert("Error loading ticker data.", color="danger", className="m-4")
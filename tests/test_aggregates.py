@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from flask import Flask
+from src.analysis.aggregates import BubbleAggregates, VALUE_COLUMNS
+from src.analysis.bubble_scorer import BubbleScorer
+from src.analysis.incremental_scoring import IncrementalScorer
+from src.api.routes import register_routes
+from src.storage.score_index import ScoreIndex, COMPONENT_COLUMNS
+from src.utils.config import AGGREGATES_CONFIG
+from src.utils.events import EventBus, TICKER_CHANGED, CYCLE_COMPLETED
+
+UNIVERSE = ('universe', AGGREGATES_CONFIG['universe_name'])
+
+def _score(value):
+    return {'bubble_risk': value, 'component_scores': {column: value / 2 for column in COMPONENT_COLUMNS}}
+
+def _expected(members, tickers):
+    """Cap-weighted average over `tickers` recomputed from scratch."""
+    caps = np.array([members[ticker][0] for ticker in tickers])
+    risks = np.array([members[ticker][1] for ticker in tickers])
+    return float(caps @ risks / caps.sum()), float(caps.sum())
+
+class TestBubbleAggregates(unittest.TestCase):
+    def setUp(self):
+        self.aggregates = BubbleAggregates(baskets={'Chips': ['NVDA', 'AMD']})
+
+    def test_incremental_matches_full_recompute(self):
+        rng = np.random.default_rng(0)
+        tickers = [f"T{i}" for i in range(200)]
+        sectors = {ticker: 'Technology' if i % 3 else 'Communication Services' for i, ticker in enumerate(tickers)}
+        members = {}
+        for step in range(5000):
+            ticker = tickers[rng.integers(len(tickers))]
+            members[ticker] = (float(rng.uniform(1e9, 3e12)), float(rng.random()))
+            self.aggregates.update(ticker, _score(members[ticker][1]),
+                                   {'market_cap': members[ticker][0], 'sector': sectors[ticker]})
+
+        risk, cap = _expected(members, list(members))
+        universe = self.aggregates.get(*UNIVERSE)
+        self.assertAlmostEqual(universe['bubble_risk'], risk, places=9)
+        self.assertAlmostEqual(universe['market_cap'] / cap, 1.0, places=12)
+        self.assertEqual(universe['n_members'], len(members))
+
+        tech = [ticker for ticker in members if sectors[ticker] == 'Technology']
+        self.assertAlmostEqual(self.aggregates.get('sector', 'Technology')['bubble_risk'],
+                               _expected(members, tech)[0], places=9)
+
+    def test_sector_change_baskets_and_removal(self):
+        self.aggregates.update('NVDA', _score(0.8), {'market_cap': 3e12, 'sector': 'Technology', 'industry': 'Semiconductors'})
+        self.aggregates.update('AMD', _score(0.4), {'market_cap': 1e12, 'sector': 'Technology', 'industry': 'Semiconductors'})
+        self.aggregates.update('META', _score(0.2), {'market_cap': 1e12, 'sector': 'Technology'})
+
+        chips = self.aggregates.get('basket', 'Chips')
+        self.assertAlmostEqual(chips['bubble_risk'], 0.7)
+        self.assertAlmostEqual(chips['valuation_score'], 0.35)
+        self.assertEqual(self.aggregates.get('sub_industry', 'Semiconductors')['n_members'], 2)
+
+        # Reclassification moves the member between groups
+        self.aggregates.update('META', _score(0.2), {'market_cap': 1e12, 'sector': 'Communication Services'})
+        self.assertEqual(self.aggregates.get('sector', 'Technology')['n_members'], 2)
+        self.assertEqual(self.aggregates.get('sector', 'Communication Services')['n_members'], 1)
+
+        # Missing market cap removes the contribution; leaving the universe drops the member
+        self.aggregates.update('AMD', _score(0.4), {'market_cap': None})
+        self.assertAlmostEqual(self.aggregates.get('basket', 'Chips')['bubble_risk'], 0.8)
+        self.aggregates.retain(['AMD', 'META'])
+        self.assertIsNone(self.aggregates.get('basket', 'Chips'))
+        self.assertEqual(self.aggregates.groups(), [('sector', 'Communication Services'), UNIVERSE])
+
+        self.aggregates.set_baskets({'Platforms': ['META']})
+        self.assertAlmostEqual(self.aggregates.get('basket', 'Platforms')['bubble_risk'], 0.2)
+
+    def test_rows_follow_index_columns(self):
+        self.aggregates.update('MSFT', _score(0.8), {'market_cap': 3e12})
+        (row,) = self.aggregates.rows('2024-01-01T00:00:00')
+        self.assertEqual(row[:3], UNIVERSE + ('2024-01-01T00:00:00',))
+        self.assertEqual(len(row), 3 + len(VALUE_COLUMNS) + 2)
+
+class TestIndexedAggregates(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.index = ScoreIndex(os.path.join(self.tmp_dir, 'scores.db'))
+        self.bus = EventBus()
+        IncrementalScorer(BubbleScorer(), self.index, self.bus, aggregates=BubbleAggregates({'Chips': ['NVDA', 'AMD']}))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def cycle(self, timestamp, pe_ratios):
+        for ticker, pe_ratio in pe_ratios.items():
+            self.bus.publish(TICKER_CHANGED, {'ticker': ticker, 'timestamp': timestamp, 'data': {
+                'market_data': {'pe_ratio': pe_ratio, 'market_cap': 1e12, 'sector': 'Technology'}
+            }})
+        self.bus.publish(CYCLE_COMPLETED, {'timestamp': timestamp, 'tickers': ['NVDA', 'AMD'], 'changed': []})
+
+    def test_history_written_every_cycle(self):
+        self.cycle('2024-01-01', {'NVDA': 60, 'AMD': 30})
+        self.cycle('2024-01-02', {'AMD': 90})
+
+        rows, total = self.index.get_aggregate_history('basket', 'Chips')
+        self.assertEqual(total, 2)
+        self.assertGreater(rows[1]['bubble_risk'], rows[0]['bubble_risk'])
+        self.assertEqual(self.index.sample_aggregate_history('basket', 'Chips', 1), rows)
+
+        latest = self.index.get_latest_aggregates()
+        self.assertEqual({(row['group_type'], row['group_name']) for row in latest},
+                         {('basket', 'Chips'), ('sector', 'Technology'), UNIVERSE})
+        self.assertTrue(all(row['timestamp'] == '2024-01-02' for row in latest))
+
+        app = Flask(__name__)
+        register_routes(app, self.index)
+        client = app.test_client()
+        response = client.get('/api/v1/aggregates/sector/Technology?limit=1')
+        self.assertEqual(response.get_json()['pagination']['total'], 2)
+        response = client.get('/api/v1/aggregates/latest?group_type=basket')
+        self.assertEqual([row['group_name'] for row in response.get_json()['data']], ['Chips'])
+
+if __name__ == '__main__':
+    unittest.main()
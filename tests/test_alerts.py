@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from src.alerts.engine import AlertEngine, AlertRule, load_rules
+from src.alerts.sinks import FileSink
+from src.utils.events import EventBus, SCORES_UPDATED, ANALYSIS_UPDATED
+
+class ListSink:
+    def __init__(self):
+        self.alerts = []
+
+    def emit(self, alerts):
+        self.alerts.extend(alerts)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _feed(engine, ticker, metric, values):
+    fired = []
+    for value in values:
+        fired += engine.evaluate(ticker, {metric: value})
+    return fired
+
+class TestAlertEngine(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def engine(self, *rules):
+        return AlertEngine(rules, clock=self.clock)
+
+    def test_threshold_hysteresis(self):
+        engine = self.engine(AlertRule('high', 'bubble_risk', threshold=0.6, direction='above',
+                                       hysteresis=0.05, cooldown=0))
+        # Hovering around 0.6 alerts once; falling below 0.55 re-arms
+        fired = _feed(engine, 'NVDA', 'bubble_risk', [0.5, 0.61, 0.59, 0.62, 0.58, 0.54, 0.6])
+        self.assertEqual([alert['value'] for alert in fired], [0.61, 0.6])
+        self.assertEqual(fired[0]['previous'], 0.5)
+
+    def test_below_direction_and_first_value_baseline(self):
+        engine = self.engine(AlertRule('cooled', 'bubble_risk', threshold=0.4, direction='below',
+                                       hysteresis=0.05, cooldown=0))
+        # Starting below the threshold does not alert and leaves the rule disarmed
+        self.assertEqual(_feed(engine, 'AMD', 'bubble_risk', [0.3, 0.42, 0.35]), [])
+        fired = _feed(engine, 'AMD', 'bubble_risk', [0.5, 0.39])
+        self.assertEqual(len(fired), 1)
+        self.assertEqual(fired[0]['rule_id'], 'cooled')
+
+    def test_cooldown(self):
+        engine = self.engine(AlertRule('high', 'bubble_risk', threshold=0.6, direction='above',
+                                       hysteresis=0, cooldown=3600))
+        self.assertEqual(len(_feed(engine, 'NVDA', 'bubble_risk', [0.5, 0.7, 0.5, 0.7])), 1)
+        self.clock.now += 3601
+        self.assertEqual(len(_feed(engine, 'NVDA', 'bubble_risk', [0.5, 0.7])), 1)
+
+    def test_jump_and_level_change(self):
+        engine = self.engine(
+            AlertRule('jump', 'sentiment_score', kind='jump', min_change=0.2, direction='up', cooldown=0),
+            AlertRule('level', 'risk_level', kind='level_change', levels=['High Risk'], cooldown=0)
+        )
+        fired = _feed(engine, 'META', 'sentiment_score', [0.1, 0.35, 0.1, 0.2])
+        self.assertEqual([alert['value'] for alert in fired], [0.35])
+        fired = _feed(engine, 'META', 'risk_level', ['Low Risk', 'Moderate Risk', 'High Risk', 'High Risk'])
+        self.assertEqual([(alert['previous'], alert['value']) for alert in fired], [('Moderate Risk', 'High Risk')])
+
+    def test_ticker_scoped_rules(self):
+        engine = self.engine(AlertRule('nvda-only', 'bubble_risk', threshold=0.6, direction='above',
+                                       tickers=['NVDA'], cooldown=0))
+        self.assertEqual(_feed(engine, 'AMD', 'bubble_risk', [0.5, 0.7]), [])
+        self.assertEqual(len(_feed(engine, 'NVDA', 'bubble_risk', [0.5, 0.7])), 1)
+
+    def test_invalid_rules(self):
+        with self.assertRaises(ValueError):
+            AlertRule('bad', 'bubble_risk', threshold=0.5)
+        with self.assertRaises(ValueError):
+            AlertRule('bad', 'bubble_risk', kind='jump', min_change=0)
+        with self.assertRaises(ValueError):
+            self.engine(AlertRule('dup', 'x', kind='level_change'), AlertRule('dup', 'y', kind='level_change'))
+
+    def test_only_reachable_rules_evaluated(self):
+        rng = np.random.default_rng(0)
+        rules = [
+            AlertRule(f"rule{i}", 'bubble_risk', threshold=float(rng.random()),
+                      direction='above' if i % 2 else 'below', cooldown=0)
+            for i in range(5000)
+        ]
+        engine = self.engine(*rules)
+        tickers = [f"T{i}" for i in range(300)]
+        values = {ticker: 0.5 for ticker in tickers}
+        for ticker in tickers:
+            engine.evaluate(ticker, {'bubble_risk': values[ticker]})
+
+        engine.rules_evaluated = 0
+        started = time.perf_counter()
+        for ticker in tickers:
+            engine.evaluate(ticker, {'bubble_risk': values[ticker] + 0.001})
+        elapsed = time.perf_counter() - started
+        # A 0.001 move can only reach the few thresholds within it
+        self.assertLess(engine.rules_evaluated, 300 * 50)
+        self.assertLess(elapsed, 1.0)
+
+class TestAlertWiring(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_events_reach_sinks(self):
+        sink = ListSink()
+        file_sink = FileSink(os.path.join(self.tmp_dir, 'alerts.jsonl'))
+        engine = AlertEngine([
+            AlertRule('high', 'bubble_risk', threshold=0.6, direction='above', cooldown=0),
+            AlertRule('sector', 'bubble_risk_level', kind='level_change', cooldown=0)
+        ], [sink, file_sink])
+        bus = EventBus()
+        engine.attach(bus)
+
+        for risk in (0.5, 0.7):
+            bus.publish(SCORES_UPDATED, {'timestamp': 't', 'changed': ['NVDA'], 'scores': {
+                'NVDA': {'bubble_risk': risk, 'risk_level': 'High Risk', 'component_scores': {'valuation_score': 0.9}}
+            }})
+        for level in ('MODERATE', 'HIGH'):
+            bus.publish(ANALYSIS_UPDATED, {'timestamp': 't', 'subject': 'AI Sector',
+                                           'metrics': {'bubble_risk_level': level}})
+
+        self.assertEqual([alert['rule_id'] for alert in sink.alerts], ['high', 'sector'])
+        with open(file_sink.path) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines[1]['ticker'], 'AI Sector')
+
+    def test_shipped_rules_load(self):
+        rules = load_rules(os.path.join(os.path.dirname(__file__), '..', 'config', 'alert_rules.json'))
+        self.assertTrue(rules)
+        AlertEngine(rules)
+
+if __name__ == '__main__':
+    unittest.main()
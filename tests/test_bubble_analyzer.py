@@ -26,6 +26,19 @@ class TestBubbleAnalyzer(unittest.TestCase):
         self.assertIn('bubble_risk_level', risk_metrics)
         self.assertIn(risk_metrics['bubble_risk_level'], ['LOW', 'MODERATE', 'HIGH'])
         
+    def test_bubble_risk_simulation(self):
+        """Test Monte Carlo bubble risk simulation."""
+        simulation = self.analyzer.simulate_bubble_risk(n_paths=2000, horizons=(1, 6), n_workers=1)
+        self.assertEqual(sorted(simulation['horizons']), [1, 6])
+        for probabilities in simulation['horizons'].values():
+            self.assertEqual(set(probabilities), {'LOW', 'MODERATE', 'HIGH'})
+            self.assertAlmostEqual(sum(probabilities.values()), 1.0)
+        
+    def test_bubble_risk_simulation_rejects_invalid_horizons(self):
+        """Test that non-positive simulation horizons are rejected."""
+        with self.assertRaises(ValueError):
+            self.analyzer.simulate_bubble_risk(horizons=(0, 6))
+        
     def test_regression_analysis(self):
         """Test regression analysis functionality."""
         regression_results = self.analyzer.get_regression_analysis()
@@ -54,5 +67,15 @@ class TestBubbleAnalyzer(unittest.TestCase):
         low_risk = self.analyzer._calculate_risk_level(deviation=5, volatility=10, trend_strength=0.1)
         self.assertEqual(low_risk, 'LOW')
 
+    def test_risk_level_from_deviation_and_volatility(self):
+        """Test risk levels from deviation and volatility alone."""
+        self.assertEqual(self.analyzer._calculate_risk_level(45, 25), 'HIGH')
+        self.assertEqual(self.analyzer._calculate_risk_level(25, 15), 'MODERATE')
+        self.assertEqual(self.analyzer._calculate_risk_level(5, 10), 'LOW')
+        with self.assertRaises(TypeError):
+            self.analyzer._calculate_risk_level(45, 25, 0.5)
+        with self.assertWarns(DeprecationWarning):
+            self.analyzer._calculate_risk_level(45, 25, trend_strength=0.5)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -1,6 +1,6 @@
 import unittest
 from datetime import datetime
-from src.analysis.bubble_scorer import BubbleScorer
+from src.analysis.bubble_scorer import BubbleScorer, extract_metrics
 
 class TestBubbleScorer(unittest.TestCase):
     def setUp(self):
@@ -75,6 +75,29 @@ class TestBubbleScorer(unittest.TestCase):
         self.assertGreaterEqual(result['bubble_risk'], 0)
         self.assertLessEqual(result['bubble_risk'], 1)
 
+    def test_percentile_normalization(self):
+        scorer = BubbleScorer(normalization='percentile')
+        # Without history the scorer falls back to the fixed caps
+        self.assertAlmostEqual(
+            scorer.calculate_valuation_score(self.sample_data['market_data']),
+            self.scorer.calculate_valuation_score(self.sample_data['market_data'])
+        )
+
+        for pe in range(1, 101):
+            scorer.sketches.observe({'pe_ratio': pe})
+        score = scorer.calculate_valuation_score({'pe_ratio': 75})
+        self.assertAlmostEqual(score, 0.75, delta=0.02)
+
+    def test_extract_metrics(self):
+        metrics = extract_metrics(self.sample_data)
+        self.assertEqual(metrics['volume_ratio'], 2)
+        self.assertEqual(metrics['news_volume'], 2)
+        self.assertEqual(metrics['total_comments'], 50)
+
+    def test_invalid_normalization(self):
+        with self.assertRaises(ValueError):
+            BubbleScorer(normalization='zscore')
+
     def test_get_risk_level(self):
         risk_levels = [
             (0.9, "Extreme Risk"),
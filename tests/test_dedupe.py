@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import unittest
+from src.analysis.bubble_scorer import BubbleScorer
+from src.data_collection.dedupe import (
+    BloomFilter, BoundedLRU, FeedDeduplicator, SeenItems, news_item_id, normalize_url
+)
+from src.storage.item_store import ItemStore
+
+def _news(n, start=0):
+    return [{'title': f"Story {i}", 'link': f"https://News.example.com/a/{i}/?utm_source=rss"} for i in range(start, start + n)]
+
+def _posts(engagement):
+    return [{'id': f"p{i}", 'title': f"Post {i}", 'score': score, 'num_comments': comments}
+            for i, (score, comments) in engagement.items()]
+
+class TestDedupeStructures(unittest.TestCase):
+    def test_normalize_url(self):
+        self.assertEqual(
+            normalize_url("HTTPS://Example.com/story/?utm_source=x&id=3#top"),
+            normalize_url("https://example.com/story?id=3")
+        )
+        self.assertNotEqual(normalize_url("https://example.com/a?id=3"), normalize_url("https://example.com/a?id=4"))
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [f"key{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(f"other{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_lru_is_bounded(self):
+        lru = BoundedLRU(2)
+        for key in ('a', 'b', 'a', 'c'):
+            lru.add(key)
+        self.assertEqual(len(lru), 2)
+        self.assertIn('a', lru)
+        self.assertNotIn('b', lru)
+
+class TestFeedDeduplicator(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = ItemStore(os.path.join(self.tmp_dir, 'items.db'))
+        self.dedupe = FeedDeduplicator(self.store, SeenItems(self.store, capacity=1000, lru_size=10))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def payload(self, news, posts):
+        return {'ticker': 'NVDA', 'timestamp': 't', 'market_data': {}, 'news': news, 'forum_sentiment': posts}
+
+    def test_items_stored_once_and_referenced_by_id(self):
+        first = self.dedupe.process('NVDA', self.payload(_news(3), _posts({1: (10, 5)})))
+        second = self.dedupe.process('NVDA', self.payload(_news(4), _posts({1: (10, 5)})))
+        self.assertNotIn('news', second)
+        self.assertEqual(len(second['news_ids']), 4)
+        self.assertEqual(len(set(self.store.iter_ids())), 5)
+        self.assertEqual(first['forum_ids'], second['forum_ids'])
+
+        expanded = self.dedupe.expand(second)
+        self.assertEqual(sorted(item['title'] for item in expanded['news']), [f"Story {i}" for i in range(4)])
+
+    def test_summary_tracks_entries_exits_and_engagement(self):
+        self.dedupe.process('NVDA', self.payload(_news(5), _posts({1: (10, 5), 2: (30, 1)})))
+        compact = self.dedupe.process('NVDA', self.payload(_news(3, start=3), _posts({2: (50, 4), 3: (6, 2)})))
+        expected = BubbleScorer().calculate_sentiment_score(_news(3, start=3), _posts({2: (50, 4), 3: (6, 2)}))
+        self.assertEqual(compact['sentiment_summary'], {
+            'news_volume': 3, 'n_posts': 2, 'total_comments': 6, 'avg_post_score': 28.0
+        })
+        self.assertAlmostEqual(BubbleScorer().calculate_bubble_risk(compact)['component_scores']['sentiment_score'], expected)
+
+    def test_restart_recognizes_stored_items(self):
+        self.dedupe.process('NVDA', self.payload(_news(20), []))
+        restarted = SeenItems(self.store, capacity=1000, lru_size=10)
+        ids = [news_item_id(item) for item in _news(25)]
+        new, seen = restarted.split_new(ids)
+        self.assertEqual(len(seen), 20)
+        self.assertEqual(len(new), 5)
+
+if __name__ == '__main__':
+    unittest.main()
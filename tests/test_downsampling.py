@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.visualization.downsampling import lttb
+from src.visualization.bubble_dashboard import create_trend_figure, visible_range, trend_point_budget
+
+class TestLTTB(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = np.arange(100000, dtype=float)
+        self.y = np.cumsum(rng.standard_normal(100000))
+        self.y[54321] += 500  # isolated spike must survive downsampling
+
+    def test_selects_requested_points(self):
+        keep = lttb(self.x, self.y, 1000)
+        self.assertEqual(len(keep), 1000)
+        self.assertEqual(keep[0], 0)
+        self.assertEqual(keep[-1], len(self.x) - 1)
+        self.assertTrue(np.all(np.diff(keep) > 0))
+
+    def test_preserves_spike(self):
+        self.assertIn(54321, lttb(self.x, self.y, 500))
+
+    def test_short_series_untouched(self):
+        np.testing.assert_array_equal(lttb(self.x[:10], self.y[:10], 100), np.arange(10))
+
+class TestTrendFigure(unittest.TestCase):
+    def setUp(self):
+        index = pd.date_range('2020-01-01', periods=50000, freq='5min')
+        ps_ratio = pd.Series(np.linspace(100, 200, len(index)), index=index)
+        self.data = pd.DataFrame({'ps_ratio': ps_ratio, 'ps_ratio_ma12': ps_ratio.rolling(12).mean()})
+
+    def test_points_bounded(self):
+        figure = create_trend_figure(self.data, 800)
+        self.assertEqual([len(trace.x) for trace in figure.data], [800, 800])
+
+    def test_zoom_fetches_visible_range_only(self):
+        x_range = ['2020-01-10 00:00:00', '2020-01-11 00:00:00']
+        figure = create_trend_figure(self.data, 800, x_range)
+        self.assertTrue(all(pd.Timestamp(x) >= pd.Timestamp(x_range[0]) for x in figure.data[0].x))
+        self.assertEqual(len(figure.data[0].x), 289)
+
+    def test_relayout_parsing(self):
+        self.assertIsNone(visible_range(None))
+        self.assertIsNone(visible_range({'xaxis.autorange': True}))
+        self.assertEqual(visible_range({'xaxis.range[0]': 'a', 'xaxis.range[1]': 'b'}), ['a', 'b'])
+        self.assertEqual(trend_point_budget(50000), 2000)
+
+if __name__ == '__main__':
+    unittest.main()
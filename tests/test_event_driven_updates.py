@@ -0,0 +1,158 @@
+import os
+import time
+import shutil
+import threading
+import tempfile
+import unittest
+from unittest import mock
+from src.utils.events import EventBus, CoalescingWorker, TICKER_CHANGED, CYCLE_COMPLETED, SCORES_UPDATED
+from src.storage.score_index import ScoreIndex
+from src.storage.snapshot_writer import SnapshotWriter
+from src.data_collection.service import DataCollectionService, payload_hash
+from src.utils.config import AGGREGATES_CONFIG
+
+class FakeIngestion:
+    def __init__(self):
+        self.pe_ratios = {'NVDA': 60, 'AMD': 30}
+        self.failing = set()
+
+    def prefetch_sec_filings(self, tickers):
+        pass
+
+    def collect_all_data(self, ticker):
+        if ticker in self.failing:
+            raise RuntimeError(f"{ticker} unavailable")
+        return {
+            'ticker': ticker,
+            'timestamp': 'ignored',
+            'market_data': {'pe_ratio': self.pe_ratios[ticker], 'current_price': 100, 'market_cap': 1e12}
+        }
+
+class TestEventBus(unittest.TestCase):
+    def test_publish_isolates_failing_handlers(self):
+        bus = EventBus()
+        received = []
+
+        def failing(payload):
+            raise RuntimeError("boom")
+
+        bus.subscribe('topic', failing)
+        bus.subscribe('topic', received.append)
+        bus.publish('topic', {'value': 1})
+        self.assertEqual(received, [{'value': 1}])
+
+        bus.unsubscribe('topic', received.append)
+        bus.publish('topic', {'value': 2})
+        self.assertEqual(len(received), 1)
+
+    def test_coalescing_worker_runs_off_thread_and_collapses_requests(self):
+        started, release = threading.Event(), threading.Event()
+        threads = []
+
+        def slow():
+            threads.append(threading.current_thread())
+            started.set()
+            release.wait(5)
+
+        worker = CoalescingWorker(slow)
+        worker.request()
+        self.assertTrue(started.wait(5))
+        # Requests during a run return at once and collapse into one more run
+        for _ in range(3):
+            worker.request({'n': 1})
+        release.set()
+        deadline = time.time() + 5
+        while worker.runs < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        self.assertEqual(worker.runs, 2)
+        self.assertNotIn(threading.current_thread(), threads)
+
+class TestDirtyTracking(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.bus = EventBus()
+        self.events = {TICKER_CHANGED: [], CYCLE_COMPLETED: [], SCORES_UPDATED: []}
+        for topic, received in self.events.items():
+            self.bus.subscribe(topic, received.append)
+
+        self.index = ScoreIndex(os.path.join(self.tmp_dir, 'scores.db'))
+        self.service = DataCollectionService(event_bus=self.bus, score_index=self.index,
+                                             snapshot_writer=SnapshotWriter(os.path.join(self.tmp_dir, 'raw')),
+                                             alert_engine=mock.Mock())
+        self.service.data_ingestion = FakeIngestion()
+        self.service.incremental_scorer.sketches_path = None
+
+        patcher = mock.patch(
+            'src.data_collection.service.load_config',
+            mock.Mock(return_value={'tickers': ['NVDA', 'AMD']})
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.service.snapshot_writer.flush(5)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_payload_hash_ignores_timestamp(self):
+        first = {'timestamp': 'a', 'market_data': {'pe_ratio': 1}}
+        second = {'timestamp': 'b', 'market_data': {'pe_ratio': 1}}
+        self.assertEqual(payload_hash(first), payload_hash(second))
+
+    def test_only_changed_tickers_are_rescored(self):
+        self.service._collect_data()
+        self.assertEqual(self.events[CYCLE_COMPLETED][-1]['changed'], ['NVDA', 'AMD'])
+
+        self.service.data_ingestion.pe_ratios['AMD'] = 45
+        with mock.patch.object(self.service.scorer, 'calculate_bubble_risk',
+                               wraps=self.service.scorer.calculate_bubble_risk) as scored:
+            self.service._collect_data()
+        self.assertEqual([call.args[0]['ticker'] for call in scored.call_args_list], ['AMD'])
+        self.assertEqual(self.events[SCORES_UPDATED][-1]['changed'], ['AMD'])
+
+        # Unchanged tickers still get a row for the new cycle
+        rows, total = self.index.get_history('NVDA')
+        self.assertEqual(total, 2)
+        self.assertEqual(rows[0]['bubble_risk'], rows[1]['bubble_risk'])
+
+    def test_no_changes_publishes_empty_cycle(self):
+        self.service._collect_data()
+        self.service._collect_data()
+        self.assertEqual(len(self.events[TICKER_CHANGED]), 2)
+        self.assertEqual(self.events[CYCLE_COMPLETED][-1]['changed'], [])
+        self.assertEqual(self.events[SCORES_UPDATED][-1]['changed'], [])
+
+    def test_failed_collection_keeps_ticker_in_aggregates(self):
+        aggregates = self.service.incremental_scorer.aggregates
+        universe = ('universe', AGGREGATES_CONFIG['universe_name'])
+        self.service._collect_data()
+        self.assertEqual(aggregates.get(*universe)['n_members'], 2)
+
+        self.service.data_ingestion.failing.add('AMD')
+        self.service._collect_data()
+        self.assertEqual(self.events[CYCLE_COMPLETED][-1]['tickers'], ['NVDA'])
+        self.assertEqual(aggregates.get(*universe)['n_members'], 2)
+
+        # Recovering with the same payload publishes no change but the ticker is still counted
+        self.service.data_ingestion.failing.clear()
+        self.service._collect_data()
+        self.assertEqual(self.events[CYCLE_COMPLETED][-1]['changed'], [])
+        self.assertEqual(aggregates.get(*universe)['n_members'], 2)
+
+    def test_invalid_watchlist_does_not_block_cycle(self):
+        config = {'tickers': ['NVDA'], 'watchlists': {
+            'bad': {'tickers': ['INTC'], 'weights': {'hype': 1.0}},
+            'chips': {'tickers': ['AMD']}
+        }}
+        with mock.patch('src.data_collection.service.load_config', mock.Mock(return_value=config)):
+            self.service._collect_data()
+        self.assertEqual(self.events[CYCLE_COMPLETED][-1]['tickers'], ['NVDA', 'AMD'])
+
+    def test_cycle_logs_snapshot_writer_stats(self):
+        with mock.patch('src.data_collection.service.logger') as log:
+            self.service._collect_data()
+        messages = [call.args[0] for call in log.info.call_args_list]
+        self.assertTrue(any(message.startswith("Snapshot writer: queue depth") for message in messages))
+
+if __name__ == '__main__':
+    unittest.main()
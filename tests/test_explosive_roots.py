@@ -0,0 +1,104 @@
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from src.analysis.explosive_roots import ExplosiveRootTester, _simulate_null, bsadf_sequence, default_min_window
+
+def ols_adf_tstat(y, lags=0):
+    """Reference ADF t-statistic via a direct least-squares fit."""
+    dy = np.diff(y)
+    X = np.column_stack([np.ones(len(dy) - lags), y[lags:-1]] +
+                        [dy[lags - i:len(dy) - i] for i in range(1, lags + 1)])
+    target = dy[lags:]
+    beta = np.linalg.lstsq(X, target, rcond=None)[0]
+    residuals = target - X @ beta
+    sigma2 = residuals @ residuals / (len(target) - X.shape[1])
+    return beta[1] / np.sqrt(sigma2 * np.linalg.inv(X.T @ X)[1, 1])
+
+class TestExplosiveRoots(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(7)
+        n = 400
+        y = 100 + np.cumsum(rng.standard_normal(n))
+        # Explosive episode followed by a collapse back to the pre-bubble level
+        bubble = y[250] * 1.03 ** np.arange(40) + rng.standard_normal(40)
+        y[250:290] = bubble
+        y[290:] = y[290:] - y[290] + y[250]
+        self.series = pd.Series(y, index=pd.bdate_range('2020-01-01', periods=n))
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_matches_direct_regression(self):
+        y = self.series.values[:120]
+        sadf_seq, bsadf_seq = bsadf_sequence(y, min_window=30)
+        self.assertAlmostEqual(sadf_seq[-1], ols_adf_tstat(y))
+        expected = max(ols_adf_tstat(y[start:]) for start in range(0, len(y) - 30))
+        self.assertAlmostEqual(bsadf_seq[-1], expected)
+
+    def test_matches_direct_regression_with_lags(self):
+        y = self.series.values[:120]
+        for lags in (1, 3):
+            sadf_seq, bsadf_seq = bsadf_sequence(y, min_window=30, lags=lags)
+            self.assertAlmostEqual(sadf_seq[-1], ols_adf_tstat(y, lags))
+            expected = max(ols_adf_tstat(y[start:], lags) for start in range(0, len(y) - lags - 30))
+            self.assertAlmostEqual(bsadf_seq[-1], expected)
+
+    def test_lagged_gsadf_scales_to_thousands_of_points(self):
+        y = np.cumsum(np.random.default_rng(1).standard_normal(5000))
+        started = time.perf_counter()
+        _, bsadf_seq = bsadf_sequence(y, default_min_window(len(y)), lags=1)
+        self.assertLess(time.perf_counter() - started, 10)
+        self.assertTrue(np.isfinite(bsadf_seq[-1]))
+
+    def test_batched_replications(self):
+        rng = np.random.default_rng(0)
+        walks = np.cumsum(rng.standard_normal((3, 200)), axis=1)
+        _, batched = bsadf_sequence(walks, 40)
+        _, single = bsadf_sequence(walks[1], 40)
+        np.testing.assert_allclose(batched[1], single)
+
+    def test_detects_and_dates_bubble(self):
+        tester = ExplosiveRootTester(n_reps=50, n_workers=1, cache_dir=self.cache_dir)
+        result = tester.test(self.series)
+        self.assertTrue(result['gsadf_bubble'])
+        self.assertGreater(result['gsadf'], result['sadf'])
+        self.assertTrue(any(
+            episode['start'] <= self.series.index[289] and episode['end'] >= self.series.index[260]
+            for episode in result['episodes']
+        ))
+
+    def test_critical_values_cached(self):
+        tester = ExplosiveRootTester(n_reps=20, n_workers=1, cache_dir=self.cache_dir)
+        first = tester.critical_values(150)
+        reloaded = ExplosiveRootTester(n_reps=20, n_workers=1, cache_dir=self.cache_dir).critical_values(150)
+        self.assertEqual(first['gsadf'], reloaded['gsadf'])
+        np.testing.assert_allclose(first['bsadf']['0.95'], reloaded['bsadf']['0.95'])
+
+    def test_long_samples_interpolate_fixed_length_simulation(self):
+        tester = ExplosiveRootTester(n_reps=20, n_workers=1, cache_dir=self.cache_dir, sim_obs=100)
+        with mock.patch('src.analysis.explosive_roots._simulate_null', wraps=_simulate_null) as simulate:
+            long = tester.critical_values(1000)
+            similar = tester.critical_values(990)
+        self.assertTrue(all(call.args[0][2] == 100 for call in simulate.call_args_list))
+        self.assertEqual(simulate.call_count, 4)
+        self.assertEqual(long['gsadf'], similar['gsadf'])
+
+        sim_window = round(default_min_window(1000) * 100 / 1000)
+        simulated = tester._simulated(100, sim_window)['bsadf']['0.95']
+        interpolated = long['bsadf']['0.95']
+        self.assertEqual(len(interpolated), 1000)
+        self.assertTrue(np.isnan(interpolated[:default_min_window(1000) - 1]).all())
+        self.assertAlmostEqual(interpolated[-1], simulated[-1])
+
+    def test_min_window(self):
+        self.assertEqual(default_min_window(100), 19)
+        with self.assertRaises(ValueError):
+            ExplosiveRootTester(cache_dir=self.cache_dir).test(self.series[:5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import io
+import os
+import csv
+import gzip
+import shutil
+import tempfile
+import unittest
+from flask import Flask
+from src.api.export import MARKET_DATA_COLUMNS, register_export_route, stream_export
+from src.storage.score_index import ScoreIndex, SCORE_COLUMNS
+from src.storage.snapshot_writer import SnapshotWriter
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.index = ScoreIndex(os.path.join(self.tmp_dir, 'scores.db'))
+        self.index.add_rows([
+            ScoreIndex.build_row(ticker, f'2024-01-{day:02d}T00:00:00',
+                                 {'bubble_risk': day / 100, 'risk_level': 'Minimal Risk',
+                                  'component_scores': {'valuation_score': 0.5}},
+                                 {'current_price': 100.0 + day, 'market_cap': 1e12})
+            for ticker in ('NVDA', 'AMD', 'MSFT') for day in range(1, 29)
+        ])
+        self.index.add_aggregate_rows([
+            ('sector', 'Technology', f'2024-01-{day:02d}', 0.5, 0.1, 0.2, 0.3, 0.4, 0.5, 3e12, 3)
+            for day in range(1, 4)
+        ])
+        self.snapshot_dir = os.path.join(self.tmp_dir, 'raw')
+        writer = SnapshotWriter(self.snapshot_dir)
+        for day in range(1, 4):
+            writer.submit({
+                'timestamp': f'2024-02-0{day}T00:00:00',
+                'tickers': {
+                    'NVDA': {'market_data': {'pe_ratio': 60.0 + day, 'sector': 'Technology', 'volume': 1000},
+                             'ai_metrics': {'ai_mentions': day},
+                             'sentiment_summary': {'news_volume': 4, 'n_posts': 2, 'total_comments': 10,
+                                                   'avg_post_score': 3.5},
+                             'sec_filings': [{'accessionNo': '1'}]},
+                    'AMD': {'market_data': {'pe_ratio': 30.0}}
+                }
+            }, f'market_data_2024020{day}_000100.json')
+        writer.flush(5)
+        app = Flask(__name__)
+        register_export_route(app, self.index, self.snapshot_dir)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def read_csv(self, chunks, compressed=True):
+        data = b"".join(chunks)
+        text = (gzip.decompress(data) if compressed else data).decode()
+        return list(csv.reader(io.StringIO(text)))
+
+    def test_chunked_csv_matches_index(self):
+        chunks = list(stream_export(self.index, tickers=['NVDA', 'AMD'], start='2024-01-10', chunk_size=7))
+        rows = self.read_csv(chunks)
+        self.assertEqual(rows[0], SCORE_COLUMNS)
+        self.assertEqual(len(rows) - 1, 2 * 19)
+        self.assertEqual([row[0] for row in rows[1:]], ['AMD'] * 19 + ['NVDA'] * 19)
+        self.assertEqual(rows[1][1], '2024-01-10T00:00:00')
+
+        plain_chunks = list(stream_export(self.index, compress=False, chunk_size=5))
+        self.assertEqual(len(plain_chunks), 17)
+        plain = self.read_csv(plain_chunks, compressed=False)
+        self.assertEqual(len(plain) - 1, 3 * 28)
+        # Keyset chunks neither skip nor repeat rows
+        self.assertEqual(len({tuple(row[:2]) for row in plain[1:]}), 3 * 28)
+
+    def test_market_data_from_snapshots(self):
+        rows = self.read_csv(stream_export(self.index, dataset='market_data', tickers=['NVDA'], start='2024-02-02',
+                                           chunk_size=1, snapshot_dir=self.snapshot_dir))
+        self.assertEqual(rows[0], MARKET_DATA_COLUMNS)
+        records = [dict(zip(rows[0], row)) for row in rows[1:]]
+        self.assertEqual([record['timestamp'] for record in records], ['2024-02-02T00:00:00', '2024-02-03T00:00:00'])
+        self.assertEqual(records[0]['pe_ratio'], '62.0')
+        self.assertEqual(records[0]['sector'], 'Technology')
+        self.assertEqual(records[0]['news_volume'], '4')
+        self.assertEqual(records[0]['n_sec_filings'], '1')
+
+        response = self.client.get('/api/v1/export?dataset=market_data&compress=0&end=2024-02-01T23:59:59')
+        self.assertEqual(len(self.read_csv([response.data], compressed=False)) - 1, 2)
+
+    @unittest.skipIf(pq is None, "pyarrow not installed")
+    def test_market_data_parquet(self):
+        data = b"".join(stream_export(self.index, dataset='market_data', fmt='parquet',
+                                      snapshot_dir=self.snapshot_dir))
+        table = pq.read_table(io.BytesIO(data))
+        self.assertEqual(table.num_rows, 6)
+        self.assertEqual(table.column('volume').to_pylist()[1], 1000.0)
+
+    def test_aggregates_and_validation(self):
+        rows = self.read_csv(stream_export(self.index, dataset='aggregates', group_type='sector'))
+        self.assertEqual(len(rows) - 1, 3)
+        with self.assertRaises(ValueError):
+            stream_export(self.index, fmt='xlsx')
+
+    def test_endpoint_streams_gzip(self):
+        response = self.client.get('/api/v1/export?tickers=msft&end=2024-01-05')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/gzip')
+        self.assertIn('scores.csv.gz', response.headers['Content-Disposition'])
+        rows = self.read_csv([response.data])
+        self.assertEqual(len(rows) - 1, 4)
+        self.assertEqual(self.client.get('/api/v1/export?dataset=nope').status_code, 400)
+
+    @unittest.skipIf(pq is None, "pyarrow not installed")
+    def test_parquet_row_groups(self):
+        data = b"".join(stream_export(self.index, fmt='parquet', chunk_size=20))
+        parquet = pq.ParquetFile(io.BytesIO(data))
+        self.assertEqual(parquet.metadata.num_rows, 84)
+        self.assertEqual(parquet.metadata.num_row_groups, 5)
+        self.assertEqual(parquet.read().column('ticker')[0].as_py(), 'AMD')
+
+if __name__ == '__main__':
+    unittest.main()
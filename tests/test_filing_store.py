@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from src.storage.filing_store import FilingStore, split_sections, tokenize
+
+def _filing(body_risk, body_mdna="Revenue grew."):
+    return (
+        "PART I\nItem 1. Business\nWe design chips.\n"
+        f"Item 1A. Risk Factors\n{body_risk}\n"
+        "Item 7. Management's Discussion and Analysis\n"
+        f"{body_mdna}\n"
+        "Item 8. Financial Statements\nNothing here.\n"
+    )
+
+class TestFilingStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = FilingStore(os.path.join(self.tmp_dir, 'objects'), os.path.join(self.tmp_dir, 'index.db'))
+        documents = [
+            ('0001', 'NVDA', '10-K', '2021-02-26', _filing("Competition is intense.")),
+            ('0002', 'NVDA', '10-Q', '2023-05-24', _filing(
+                "Generative AI may be regulated.", "Demand for generative AI rose. Generative AI drove sales.")),
+            ('0003', 'AMD', '10-Q', '2023-01-31', _filing("Supply is tight.")),
+            ('0004', 'AMD', '10-Q', '2023-05-02', _filing("AI rules could change. Natural language processing risk.")),
+            ('0005', 'MSFT', '10-Q', '2023-04-25', _filing("AI systems may fail.")),
+        ]
+        for accession_no, ticker, form_type, filed_at, text in documents:
+            self.store.add_document({
+                'accession_no': accession_no, 'ticker': ticker,
+                'form_type': form_type, 'filed_at': filed_at
+            }, text)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_split_sections(self):
+        sections = split_sections(_filing("Risky.", "Growing."))
+        self.assertIn("Risky.", sections['risk_factors'])
+        self.assertIn("Growing.", sections['mdna'])
+        self.assertIn("We design chips.", sections['other'])
+        self.assertNotIn("Risky.", sections['other'])
+
+    def test_documents_stored_once_and_compressed(self):
+        self.assertFalse(self.store.add_document(
+            {'accession_no': '0001', 'ticker': 'NVDA', 'form_type': '10-K', 'filed_at': '2021-02-26'}, "changed"))
+        self.assertEqual(self.store.read_text('0004'), _filing("AI rules could change. Natural language processing risk."))
+
+        # Identical text under another accession number shares the stored object
+        self.store.add_document({'accession_no': '0006', 'ticker': 'AMD', 'form_type': '8-K',
+                                 'filed_at': '2023-06-01'}, _filing("Supply is tight."))
+        objects = [name for _, _, names in os.walk(os.path.join(self.tmp_dir, 'objects')) for name in names]
+        self.assertEqual(len(objects), 5)
+
+    def test_phrase_trend_by_ticker_and_form(self):
+        rows = self.store.mentions('generative AI', ticker='NVDA', form_types=['10-Q'], since='2021-01-01')
+        self.assertEqual([(row['accession_no'], row['count']) for row in rows], [('0002', 3)])
+        self.assertGreater(rows[0]['per_10k'], 0)
+
+        risk_only = self.store.mentions('Generative AI', ticker='NVDA', section='risk_factors')
+        self.assertEqual(risk_only[0]['count'], 1)
+        self.assertEqual(self.store.mentions('generative AI', since='2024-01-01'), [])
+        self.assertEqual(self.store.mentions('quantum'), [])
+
+    def test_long_phrases_verified_against_text(self):
+        rows = self.store.mentions('natural language processing')
+        self.assertEqual([(row['ticker'], row['count']) for row in rows], [('AMD', 1)])
+        self.assertEqual(self.store.mentions('natural language models'), [])
+
+    def test_new_risk_factor_mentions(self):
+        added = self.store.new_mentions('AI', since='2023-04-01')
+        # MSFT has no earlier filing, so nothing was "added"
+        self.assertEqual([row['ticker'] for row in added], ['AMD', 'NVDA'])
+        self.assertEqual(added[0]['previous_accession_no'], '0003')
+
+    def test_add_filing_downloads_once(self):
+        response = mock.Mock(text="<html><body><p>Item 1A. Risk Factors</p><p>AI risk.</p></body></html>")
+        filing = {'accessionNo': '0100', 'ticker': 'GOOGL', 'formType': '10-K',
+                  'filedAt': '2024-02-01T16:00:00-05:00', 'linkToFilingDetails': 'https://example.com/f.htm'}
+        with mock.patch('src.storage.filing_store.requests.get', return_value=response) as get:
+            self.assertEqual(self.store.add_filings([filing, filing]), 1)
+            self.assertEqual(get.call_count, 1)
+        self.assertEqual(self.store.term_count('ai', '0100', section='risk_factors'), 1)
+        self.assertEqual(self.store.latest_filing('GOOGL')['filed_at'], '2024-02-01')
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Generative-AI, 10-K"), ['generative', 'ai', '10', 'k'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+import numpy as np
+from src.analysis.monte_carlo import BubbleRegimeSimulator, risk_level_codes
+
+class TestBubbleRegimeSimulator(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.history = 250 * np.cumprod(1 + rng.normal(0.01, 0.05, 60))
+
+    def test_risk_level_codes(self):
+        codes = risk_level_codes([45, 25, 15, 15, 5], [0, 0, 25, 0, 50])
+        self.assertEqual(codes.tolist(), [2, 1, 1, 0, 0])
+
+    def test_probabilities_sum_to_one(self):
+        result = BubbleRegimeSimulator(n_paths=5000, n_workers=1).simulate(self.history)
+        self.assertEqual(sorted(result['horizons']), [1, 3, 6, 12])
+        for probabilities in result['horizons'].values():
+            self.assertAlmostEqual(sum(probabilities.values()), 1.0)
+
+    def test_reproducible_across_worker_counts(self):
+        serial = BubbleRegimeSimulator(n_paths=6000, chunk_size=1000, n_workers=1).simulate(self.history)
+        parallel = BubbleRegimeSimulator(n_paths=6000, chunk_size=1000, n_workers=2).simulate(self.history)
+        self.assertEqual(serial, parallel)
+
+    def test_lognormal_method(self):
+        result = BubbleRegimeSimulator(n_paths=2000, method='lognormal', n_workers=1).simulate(self.history)
+        self.assertEqual(result['method'], 'lognormal')
+
+    def test_short_history(self):
+        with self.assertRaises(ValueError):
+            BubbleRegimeSimulator().simulate(self.history[:5])
+
+    def test_invalid_horizons(self):
+        for horizons in [(), (0, 3), (-1,)]:
+            with self.assertRaises(ValueError):
+                BubbleRegimeSimulator(horizons=horizons)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from src.utils import profiling
+from src.utils.profiling import CycleProfiler, phase
+
+def _work(n):
+    return sum(_square(i) for i in range(n))
+
+def _square(x):
+    return x * x
+
+class TestCycleProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_phase_is_noop_without_profiler(self):
+        self.assertIsNone(profiling.active_profiler())
+        with phase('idle'):
+            pass
+
+    def test_writes_stacks_allocations_and_summary(self):
+        with CycleProfiler(self.tmp_dir, label='test') as profiler:
+            with phase('outer'):
+                with phase('inner'):
+                    blocks = [bytearray(1024) for _ in range(200)]
+                _work(2000)
+
+        self.assertIsNone(profiling.active_profiler())
+        for path in profiler.paths.values():
+            self.assertTrue(os.path.exists(path))
+
+        with open(profiler.paths['summary']) as f:
+            phases = json.load(f)['phases']
+        self.assertEqual(set(phases), {'test', 'outer', 'outer/inner'})
+        self.assertGreaterEqual(phases['outer']['wall_seconds'], phases['outer/inner']['wall_seconds'])
+        self.assertGreaterEqual(phases['outer']['peak_memory_bytes'], 200 * 1024)
+
+        with open(profiler.paths['stacks']) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(all(line.startswith('test') and line.rsplit(' ', 1)[1].isdigit() for line in lines))
+        self.assertTrue(any(';_work ' in line and ';_square ' in line for line in lines))
+
+        with open(profiler.paths['allocations']) as f:
+            self.assertIn('KiB', f.read())
+        del blocks
+
+    def test_phases_on_other_threads_are_ignored(self):
+        in_publish, rendered = threading.Event(), threading.Event()
+
+        def render():
+            in_publish.wait(5)
+            with phase('render'):
+                _work(1000)
+            rendered.set()
+
+        worker = threading.Thread(target=render)
+        worker.start()
+        with CycleProfiler(self.tmp_dir, label='test') as profiler:
+            with phase('collection'):
+                with phase('publish'):
+                    in_publish.set()
+                    self.assertTrue(rendered.wait(5))
+        worker.join()
+
+        self.assertEqual(set(profiler.phases), {'test', 'collection', 'collection/publish'})
+        self.assertGreaterEqual(profiler.phases['collection']['wall_seconds'],
+                                profiler.phases['collection/publish']['wall_seconds'])
+
+    def test_nested_profilers_rejected(self):
+        with CycleProfiler(self.tmp_dir):
+            with self.assertRaises(RuntimeError):
+                CycleProfiler(self.tmp_dir).__enter__()
+
+class TestServiceProfileRequest(unittest.TestCase):
+    def test_trigger_file_profiles_single_cycle(self):
+        from src.data_collection.service import DataCollectionService
+        from src.utils.events import EventBus
+
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        trigger = os.path.join(tmp_dir, 'profile.request')
+        service = DataCollectionService(event_bus=EventBus(), score_index=mock.Mock())
+
+        with mock.patch.dict('src.data_collection.service.PROFILING_CONFIG', {'trigger_file': trigger}):
+            self.assertFalse(service._profile_requested())
+            open(trigger, 'w').close()
+            self.assertTrue(service._profile_requested())
+            self.assertFalse(os.path.exists(trigger))
+            self.assertFalse(service._profile_requested())
+
+            service.request_profile()
+            self.assertTrue(service._profile_requested())
+            self.assertFalse(service._profile_requested())
+
+    def test_runtime_profile_includes_render(self):
+        from src.data_collection.service import DataCollectionService
+        from src.utils.events import EventBus
+
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        service = DataCollectionService(event_bus=EventBus(), score_index=mock.Mock())
+        service._collect_data = mock.Mock()
+        service.profile_render = mock.Mock(side_effect=lambda: _work(100))
+
+        with mock.patch('src.data_collection.service.CycleProfiler', lambda: CycleProfiler(tmp_dir)):
+            service._run_cycle()
+            service.profile_render.assert_not_called()
+            service.request_profile()
+            service._run_cycle()
+        service.profile_render.assert_called_once_with()
+        self.assertEqual(service._collect_data.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
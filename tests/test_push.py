@@ -0,0 +1,62 @@
+import json
+import unittest
+from flask import Flask
+from src.api.push import SnapshotBroadcaster, register_push_route, stream_meta_tag
+
+def _payload(message):
+    return json.loads(message.decode().split('data: ', 1)[1])
+
+class TestSnapshotBroadcaster(unittest.TestCase):
+    def setUp(self):
+        self.broadcaster = SnapshotBroadcaster(heartbeat=0.01)
+
+    def test_new_client_receives_latest_snapshot(self):
+        self.broadcaster.publish({'n': 1})
+        self.broadcaster.publish({'n': 2})
+        stream = self.broadcaster.stream()
+        self.assertEqual(_payload(next(stream)), {'n': 2})
+        self.assertEqual(self.broadcaster.clients, 1)
+        stream.close()
+        self.assertEqual(self.broadcaster.clients, 0)
+
+    def test_each_snapshot_sent_once_with_keepalive_between(self):
+        stream = self.broadcaster.stream()
+        self.assertEqual(next(stream), b": keepalive\n\n")
+        self.broadcaster.publish({'n': 1})
+        message = next(stream)
+        self.assertTrue(message.startswith(b"id: 1\n"))
+        self.assertEqual(next(stream), b": keepalive\n\n")
+        stream.close()
+
+    def test_clients_share_one_encoded_message(self):
+        first, second = self.broadcaster.stream(), self.broadcaster.stream()
+        self.broadcaster.publish({'n': 1})
+        self.assertIs(next(first), next(second))
+        first.close()
+        second.close()
+
+    def test_stream_route(self):
+        app = Flask(__name__)
+        register_push_route(app, self.broadcaster)
+        self.broadcaster.publish({'n': 1})
+        response = app.test_client().get('/api/v1/stream')
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        self.assertEqual(_payload(next(response.response)), {'n': 1})
+        response.close()
+
+    def test_stream_path_advertised_relative_to_dash_prefix(self):
+        import dash
+        from dash import html
+        app = dash.Dash(__name__, meta_tags=[stream_meta_tag()], requests_pathname_prefix='/bubble/',
+                        routes_pathname_prefix='/')
+        app.layout = html.Div()
+        register_push_route(app.server, self.broadcaster)
+        page = app.server.test_client().get('/').get_data(as_text=True)
+        self.assertIn('<meta name="snapshot-stream" content="api/v1/stream">', page)
+        config = json.loads(page.split('<script id="_dash-config" type="application/json">')[1].split('</script>')[0])
+        self.assertEqual(config['requests_pathname_prefix'] + 'api/v1/stream', '/bubble/api/v1/stream')
+        # A proxy strips the prefix, so the route itself stays under the API prefix
+        self.assertIn('/api/v1/stream', [rule.rule for rule in app.server.url_map.iter_rules()])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from src.analysis.quantile_sketch import QuantileSketch, MetricSketches
+
+class TestQuantileSketch(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.values = rng.lognormal(mean=3, sigma=1.5, size=200000)
+        self.sketch = QuantileSketch(relative_accuracy=0.01)
+        self.sketch.update(self.values)
+
+    def test_quantile_relative_error(self):
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            expected = np.quantile(self.values, q)
+            self.assertAlmostEqual(self.sketch.quantile(q) / expected, 1, delta=0.02)
+
+    def test_percentile_lookup(self):
+        for q in (0.1, 0.5, 0.9):
+            value = np.quantile(self.values, q)
+            self.assertAlmostEqual(self.sketch.percentile(value), q, delta=0.01)
+        self.assertEqual(self.sketch.percentile(-1), 0)
+        self.assertEqual(self.sketch.percentile(1e12), 1)
+
+    def test_merge_matches_single_sketch(self):
+        left, right = QuantileSketch(0.01), QuantileSketch(0.01)
+        left.update(self.values[:100000])
+        right.update(self.values[100000:])
+        left.merge(right)
+        self.assertEqual(left.count, self.sketch.count)
+        self.assertEqual(left.positive, self.sketch.positive)
+
+    def test_negative_and_zero_values(self):
+        sketch = QuantileSketch()
+        sketch.update([-5, -1, 0, 1, 5])
+        self.assertAlmostEqual(sketch.percentile(0), 0.5)
+        self.assertAlmostEqual(sketch.quantile(0), -5, delta=0.05)
+
+    def test_round_trip(self):
+        restored = QuantileSketch.from_dict(self.sketch.to_dict())
+        self.assertEqual(restored.quantile(0.5), self.sketch.quantile(0.5))
+
+    def test_metric_sketches(self):
+        sketches = MetricSketches()
+        self.assertIsNone(sketches.percentile('pe_ratio', 10))
+        sketches.observe_many('pe_ratio', range(1, 101))
+        self.assertAlmostEqual(sketches.percentile('pe_ratio', 50), 0.5, delta=0.02)
+
+if __name__ == '__main__':
+    unittest.main()
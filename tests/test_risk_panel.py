@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.analysis.risk_panel import RiskPanel, compute_risk_cubes, UNKNOWN_LEVEL
+from src.analysis.bubble_analysis import BubbleAnalyzer
+
+WINDOWS = [3, 6, 12, 24, 36]
+
+class TestRiskPanel(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        index = pd.date_range('2015-01-01', periods=120, freq='MS')
+        values = 5 * np.cumprod(1 + rng.normal(0.01, 0.08, (120, 4)), axis=0)
+        self.frame = pd.DataFrame(values, index=index, columns=['NVDA', 'AMD', 'MSFT', 'NEW'])
+        # A late listing and a missing print
+        self.frame.iloc[:50, 3] = np.nan
+        self.frame.iloc[70, 1] = np.nan
+        self.panel = RiskPanel.from_frame(self.frame, WINDOWS, dtype=np.float64)
+
+    def test_cube_shape(self):
+        self.assertEqual(self.panel.deviation.shape, (4, 5, 120))
+        self.assertEqual(self.panel.levels.dtype, np.int8)
+
+    def test_matches_pandas_rolling(self):
+        for ticker in self.frame:
+            series = self.frame[ticker]
+            for window in WINDOWS:
+                expected_deviation = (series / series.rolling(window).mean() - 1) * 100
+                expected_volatility = series.pct_change(fill_method=None).rolling(window).std() * 100
+                pd.testing.assert_series_equal(
+                    self.panel.frame('deviation', window)[ticker], expected_deviation,
+                    check_names=False, rtol=1e-7
+                )
+                pd.testing.assert_series_equal(
+                    self.panel.frame('volatility', window)[ticker], expected_volatility,
+                    check_names=False, rtol=1e-6, atol=1e-9
+                )
+
+    def test_levels_unknown_during_warmup(self):
+        levels = self.panel.frame('levels', 36)
+        self.assertTrue((levels.iloc[:36] == UNKNOWN_LEVEL).all().all())
+        self.assertTrue((levels['NEW'].iloc[:86] == UNKNOWN_LEVEL).all())
+        latest = self.panel.latest()
+        self.assertEqual(list(latest.columns), WINDOWS)
+        self.assertTrue(latest.isin(['LOW', 'MODERATE', 'HIGH']).all().all())
+
+    def test_matches_single_series_analysis(self):
+        analyzer = BubbleAnalyzer()
+        analyzer.data = pd.DataFrame({'ps_ratio': self.frame['NVDA']})
+        metrics = analyzer.analyze_bubble_risk()
+        panel = analyzer.analyze_risk_panel(windows=[12])
+        self.assertAlmostEqual(float(panel.latest('deviation').iloc[0, 0]), metrics['current_deviation'], places=3)
+
+    def test_invalid_window(self):
+        with self.assertRaises(ValueError):
+            compute_risk_cubes(self.frame.to_numpy().T, [0, 3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import unittest
+from flask import Flask
+from src.analysis.bubble_scorer import BubbleScorer
+from src.storage.score_index import ScoreIndex, parse_filter_query
+from src.api.routes import register_routes
+
+class TestScoreIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.index = ScoreIndex(os.path.join(self.tmp_dir, 'scores.db'))
+        self.scorer = BubbleScorer()
+        for i, price in enumerate([100, 110, 120]):
+            snapshot = {
+                'timestamp': f'2024-01-0{i + 1}T00:00:00',
+                'tickers': {
+                    'NVDA': {'market_data': {'pe_ratio': 40 + i, 'current_price': price, 'market_cap': 1e12}},
+                    'AMD': {'market_data': {'pe_ratio': 20 + i, 'current_price': price / 2, 'market_cap': 2e11}}
+                }
+            }
+            self.index.add_snapshot(snapshot, self.scorer)
+
+        app = Flask(__name__)
+        register_routes(app, self.index)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_history_range_and_pagination(self):
+        rows, total = self.index.get_history('NVDA', start='2024-01-02', limit=1)
+        self.assertEqual(total, 2)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['timestamp'], '2024-01-02T00:00:00')
+
+    def test_latest_scores(self):
+        rows, total = self.index.get_latest()
+        self.assertEqual(total, 2)
+        self.assertEqual([row['ticker'] for row in rows], ['AMD', 'NVDA'])
+        self.assertTrue(all(row['timestamp'] == '2024-01-03T00:00:00' for row in rows))
+
+    def test_latest_sorted_and_filtered(self):
+        self.index.add_rows([
+            ScoreIndex.build_row('MSFT', '2024-01-03T00:00:00', {'bubble_risk': 0.9, 'risk_level': 'Extreme Risk'}),
+            ScoreIndex.build_row('META', '2024-01-03T00:00:00', {'bubble_risk': None})
+        ])
+        rows, total = self.index.get_latest(sort_by=[('bubble_risk', 'desc')])
+        self.assertEqual(total, 4)
+        self.assertEqual(rows[0]['ticker'], 'MSFT')
+        self.assertEqual(rows[-1]['ticker'], 'META')
+
+        filters = parse_filter_query('{ticker} icontains M && {bubble_risk} > 0.5')
+        rows, total = self.index.get_latest(limit=1, filters=filters)
+        self.assertEqual((total, [row['ticker'] for row in rows]), (1, ['MSFT']))
+
+        rows, total = self.index.get_latest(filters=parse_filter_query('{risk_level} = "Extreme Risk"'))
+        self.assertEqual(total, 1)
+
+    def test_filter_query_rejects_unknown_columns(self):
+        for query in ('{password} = x', '{ticker} like x', '{bubble_risk} > high'):
+            with self.assertRaises(ValueError):
+                parse_filter_query(query)
+        with self.assertRaises(ValueError):
+            self.index.get_latest(sort_by=[('ticker; DROP TABLE scores', 'asc')])
+
+    def test_components(self):
+        breakdown = self.index.get_components('NVDA', timestamp='2024-01-01T12:00:00')
+        self.assertEqual(breakdown['timestamp'], '2024-01-01T00:00:00')
+        self.assertIn('valuation_score', breakdown['component_scores'])
+        self.assertIsNone(self.index.get_components('MSFT'))
+
+    def test_version_changes_on_write(self):
+        version = self.index.version()
+        self.index.add_rows([ScoreIndex.build_row('MSFT', '2024-01-04T00:00:00', {'bubble_risk': 0.5})])
+        self.assertEqual(self.index.version(), version + 1)
+
+    def test_api_pagination(self):
+        response = self.client.get('/api/v1/risk/nvda?limit=2')
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(len(body['data']), 2)
+        self.assertEqual(body['pagination']['next_offset'], 2)
+
+    def test_api_etag(self):
+        response = self.client.get('/api/v1/scores/latest')
+        etag = response.headers['ETag']
+        cached = self.client.get('/api/v1/scores/latest', headers={'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
+
+        self.index.add_rows([ScoreIndex.build_row('MSFT', '2024-01-04T00:00:00', {'bubble_risk': 0.5})])
+        refreshed = self.client.get('/api/v1/scores/latest', headers={'If-None-Match': etag})
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertEqual(refreshed.get_json()['pagination']['total'], 3)
+
+    def test_api_sort_and_filter(self):
+        body = self.client.get('/api/v1/scores/latest?sort=-ticker&filter={ticker} contains D').get_json()
+        self.assertEqual([row['ticker'] for row in body['data']], ['NVDA', 'AMD'])
+        response = self.client.get('/api/v1/scores/latest?sort=secret')
+        self.assertEqual(response.status_code, 400)
+
+    def test_api_not_found(self):
+        response = self.client.get('/api/v1/components/MSFT')
+        self.assertEqual(response.status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
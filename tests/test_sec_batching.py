@@ -0,0 +1,126 @@
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from src.data_collection.data_ingestion import DataIngestion
+from src.storage.filing_store import FilingStore
+
+class FakeQueryApi:
+    """sec-api stand-in answering `ticker:(...) AND ... filedAt:[since TO *]` queries from a list."""
+    def __init__(self, filings):
+        self.filings = filings
+        self.queries = []
+
+    def get_filings(self, query):
+        self.queries.append(query)
+        query_string = query['query']['query_string']['query']
+        tickers = re.search(r"ticker:\(([^)]*)\)", query_string).group(1).split(' OR ')
+        since = re.search(r"filedAt:\[(\S+) TO \*\]", query_string).group(1)
+        matches = sorted(
+            (filing for filing in self.filings if filing['ticker'] in tickers and filing['filedAt'] >= since),
+            key=lambda filing: filing['filedAt'], reverse=query['sort'][0]['filedAt']['order'] == 'desc'
+        )
+        start, size = int(query['from']), int(query['size'])
+        return {'filings': matches[start:start + size]}
+
+def _filing(accession_no, ticker, filed_at, form_type='8-K'):
+    return {'accessionNo': accession_no, 'ticker': ticker, 'formType': form_type, 'filedAt': filed_at}
+
+class TestSecBatching(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = FilingStore(os.path.join(self.tmp_dir, 'objects'), os.path.join(self.tmp_dir, 'index.db'))
+        with mock.patch('src.data_collection.data_ingestion.FilingStore', return_value=self.store):
+            self.ingestion = DataIngestion()
+        self.tickers = [f"T{i:02d}" for i in range(60)]
+        self.filings = [
+            _filing(f"{ticker}-{n}", ticker, f"2026-0{n + 1}-15T16:00:00-04:00")
+            for ticker in self.tickers for n in range(3)
+        ]
+        self.api = FakeQueryApi(self.filings)
+        patcher = mock.patch('src.data_collection.data_ingestion.QueryApi', return_value=self.api)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        config = mock.patch.dict('src.data_collection.data_ingestion.SEC_FILING_CONFIG',
+                                 {'query_batch_size': 25, 'page_size': 50, 'initial_lookback_days': 100000,
+                                  'recent_filings': 10})
+        config.start()
+        self.addCleanup(config.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _store(self, filing):
+        self.store.add_document({'accession_no': filing['accessionNo'], 'ticker': filing['ticker'],
+                                 'form_type': filing['formType'], 'filed_at': filing['filedAt']}, "Item 1. Business")
+
+    def test_batched_queries_paginate_and_split_per_ticker(self):
+        filings = self.ingestion.fetch_sec_filings_batch(self.tickers)
+        self.assertEqual(sorted(filings), self.tickers)
+        self.assertEqual([filing['accessionNo'] for filing in filings['T07']], ['T07-2', 'T07-1', 'T07-0'])
+        # 3 batches of at most 25 tickers; 75 filings per full batch take 2 pages
+        self.assertEqual(self.ingestion.sec_requests, 5)
+        self.assertEqual(len(self.api.queries), 5)
+
+    def test_result_limit_keeps_newest_filings(self):
+        with mock.patch.dict('src.data_collection.data_ingestion.SEC_FILING_CONFIG', {'max_results': 50}), \
+                self.assertLogs('src.utils.helpers', level='WARNING') as logs:
+            filings = self.ingestion.fetch_sec_filings_batch(self.tickers[:25])
+        self.assertIn('result limit', logs.output[0])
+        # 75 matches, capped at 50: every ticker keeps its two newest
+        self.assertEqual([filing['accessionNo'] for filing in filings['T07']], ['T07-2', 'T07-1'])
+
+    def test_only_filings_since_last_stored_are_requested(self):
+        for filing in self.filings:
+            if filing['accessionNo'].endswith('-2'):
+                self._store(filing)
+        filings = self.ingestion.fetch_sec_filings_batch(self.tickers)
+        # Only same-day filings come back, and are already stored
+        self.assertEqual(filings['T03'], [self.filings[11]])
+        self.assertEqual(self.ingestion.sec_requests, 3)
+        self.assertIn('filedAt:[2026-03-15 TO *]', self.api.queries[0]['query']['query_string']['query'])
+
+    def test_watermark_advances_without_downloads(self):
+        self.ingestion.fetch_sec_filings_batch(self.tickers)
+        # Nothing was downloaded, but the filings seen set each ticker's watermark
+        self.assertEqual(self.store.last_filed(['T03'])['T03'], '2026-03-15')
+        queries = len(self.api.queries)
+        filings = self.ingestion.fetch_sec_filings_batch(self.tickers)
+        self.assertIn('filedAt:[2026-03-15 TO *]', self.api.queries[queries]['query']['query_string']['query'])
+        self.assertEqual(len(self.api.queries) - queries, 3)
+        # Only the same-day filing was fetched again; the payload still lists the recent ones
+        self.assertEqual(filings['T03'], [self.filings[11], self.filings[10], self.filings[9]])
+
+    def test_recent_filings_include_indexed_documents(self):
+        self._store(self.filings[9])
+        filings = self.store.recent_filings(['T03', 'T04'], 10)
+        self.assertEqual(filings['T03'][0]['accessionNo'], 'T03-0')
+        self.assertEqual(filings['T04'], [])
+        self.store.record_metadata(self.filings[9:12])
+        filings = self.store.recent_filings(['T03'], 2)['T03']
+        self.assertEqual(filings, [self.filings[11], self.filings[10]])
+
+    def test_cold_start_keeps_most_recent_filings(self):
+        self.api.filings.extend(_filing(f"T00-old-{n}", 'T00', f"2025-0{n + 1}-15T16:00:00-04:00") for n in range(9))
+        self._store(self.filings[3])
+        self.api.filings.extend(_filing(f"T01-old-{n}", 'T01', f"2025-0{n + 1}-15T16:00:00-04:00") for n in range(9))
+        filings = self.ingestion.fetch_sec_filings_batch(['T00', 'T01'])
+        self.assertEqual([filing['accessionNo'] for filing in filings['T00'][:4]], ['T00-2', 'T00-1', 'T00-0', 'T00-old-8'])
+        self.assertEqual(len(filings['T00']), 10)
+        # A ticker with stored filings gets everything since its last one
+        self.assertEqual([filing['accessionNo'] for filing in filings['T01']], ['T01-2', 'T01-1', 'T01-0'])
+
+    def test_prefetched_filings_serve_per_ticker_calls(self):
+        self.ingestion.prefetch_sec_filings(['T01', 'T02'])
+        requests = self.ingestion.sec_requests
+        self.assertEqual(len(self.ingestion.fetch_sec_filings('T01')), 3)
+        self.assertEqual(self.ingestion.sec_requests, requests)
+
+        # A ticker left out of the batched results falls back to its own query
+        self.ingestion.fetch_sec_filings('T05')
+        self.assertEqual(self.ingestion.sec_requests, requests + 1)
+
+if __name__ == '__main__':
+    unittest.main()
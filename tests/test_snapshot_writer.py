@@ -0,0 +1,99 @@
+import os
+import json
+import queue
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from src.storage.snapshot_writer import SnapshotWriter
+
+class TestSnapshotWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.writer = SnapshotWriter(self.tmp_dir, max_queue=2, batch_size=4, retries=1, retry_delay=0.001)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_writes_compact_json_atomically(self):
+        snapshots = {f"snap_{i}.json": {'timestamp': str(i), 'tickers': {'NVDA': {'pe_ratio': i}}} for i in range(5)}
+        for filename, data in snapshots.items():
+            self.writer.submit(data, filename)
+        self.assertTrue(self.writer.flush(timeout=10))
+
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), sorted(snapshots))
+        for filename, data in snapshots.items():
+            with open(os.path.join(self.tmp_dir, filename)) as f:
+                text = f.read()
+            self.assertNotIn(' ', text)
+            self.assertEqual(json.loads(text), data)
+
+        stats = self.writer.stats()
+        self.assertEqual(stats['written'], 5)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertGreaterEqual(stats['queue_wait_max'], 0.0)
+
+    def test_full_queue_applies_backpressure(self):
+        release = threading.Event()
+        original = self.writer._write_one
+
+        def slow_write(job):
+            release.wait()
+            return original(job)
+
+        with mock.patch.object(self.writer, '_write_one', side_effect=slow_write):
+            # One snapshot is being written, two fill the queue
+            for i in range(3):
+                self.writer.submit({'i': i}, f"snap_{i}.json", timeout=1)
+                if i == 0:
+                    while self.writer.stats()['queue_depth']:
+                        pass
+            with self.assertRaises(queue.Full):
+                self.writer.submit({'i': 3}, "snap_3.json", timeout=0.05)
+            self.assertEqual(self.writer.stats()['blocked_submits'], 1)
+            self.assertFalse(self.writer.flush(timeout=0.05))
+            release.set()
+            self.assertTrue(self.writer.flush(timeout=10))
+        self.assertEqual(len(os.listdir(self.tmp_dir)), 3)
+
+    def test_failed_writes_are_retried_not_dropped(self):
+        original = self.writer._write_one
+        failures = iter([OSError("disk full")] * 3)
+
+        def flaky_write(job):
+            error = next(failures, None)
+            if error:
+                raise error
+            return original(job)
+
+        with mock.patch.object(self.writer, '_write_one', side_effect=flaky_write):
+            self.writer.submit({'value': 1}, "snap.json")
+            self.assertTrue(self.writer.flush(timeout=10))
+
+        with open(os.path.join(self.tmp_dir, "snap.json")) as f:
+            self.assertEqual(json.load(f), {'value': 1})
+        stats = self.writer.stats()
+        self.assertEqual(stats['failed_attempts'], 3)
+        self.assertEqual(stats['pending_retries'], 0)
+
+    def test_existing_file_survives_failed_write(self):
+        path = os.path.join(self.tmp_dir, "snap.json")
+        with open(path, 'w') as f:
+            json.dump({'version': 1}, f)
+
+        with mock.patch('src.storage.snapshot_writer.serialize_snapshot', side_effect=TypeError("bad value")):
+            self.writer.submit({'version': 2}, "snap.json")
+            self.assertFalse(self.writer.flush(timeout=0.2))
+
+        with open(path) as f:
+            self.assertEqual(json.load(f), {'version': 1})
+        self.assertEqual(os.listdir(self.tmp_dir), ["snap.json"])
+
+        # The held snapshot goes out once writing works again
+        self.assertTrue(self.writer.flush(timeout=10))
+        with open(path) as f:
+            self.assertEqual(json.load(f), {'version': 2})
+
+if __name__ == '__main__':
+    unittest.main()
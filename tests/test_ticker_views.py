@@ -0,0 +1,44 @@
+import os
+import shutil
+import tempfile
+import unittest
+from src.storage.score_index import ScoreIndex
+from src.visualization.ticker_views import create_history_figure, create_ticker_detail
+
+class TestTickerViews(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.index = ScoreIndex(os.path.join(self.tmp_dir, 'scores.db'))
+        self.index.add_rows([
+            ScoreIndex.build_row('NVDA', f'2024-01-01T00:{i // 60:02d}:{i % 60:02d}',
+                                 {'bubble_risk': 0.5 + 0.4 * (i % 7) / 7, 'risk_level': 'Moderate Risk',
+                                  'component_scores': {'valuation_score': 0.7}})
+            for i in range(300)
+        ])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_history_downsampled(self):
+        rows, total = self.index.get_history('NVDA', limit=-1)
+        self.assertEqual(total, 300)
+        figure = create_history_figure(rows, max_points=50)
+        self.assertEqual(len(figure.data[0].y), 50)
+
+    def test_history_thinned_in_sql(self):
+        rows = self.index.sample_history('NVDA', 40)
+        self.assertLessEqual(len(rows), 41)
+        self.assertGreaterEqual(len(rows), 30)
+        self.assertEqual(rows[0]['timestamp'], '2024-01-01T00:00:00')
+        self.assertEqual(rows[-1]['timestamp'], '2024-01-01T00:04:59')
+        self.assertNotIn('_n', rows[0])
+        self.assertEqual(len(self.index.sample_history('NVDA', 1000)), 300)
+
+    def test_detail_page(self):
+        page = create_ticker_detail('NVDA', self.index)
+        self.assertIn('NVDA', str(page))
+        missing = create_ticker_detail('MSFT', self.index)
+        self.assertIn('No scores indexed', str(missing))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from flask import Flask
+from src.analysis.bubble_scorer import BubbleScorer
+from src.analysis.watchlists import Watchlist, WatchlistProjector, collection_universe, load_watchlists, risk_levels
+from src.api.routes import register_routes
+from src.storage.score_index import ScoreIndex
+from src.utils.config import RISK_SCORING_CONFIG
+
+TICKER_CONFIG = {
+    'tickers': ['NVDA', 'AMD', 'MSFT'],
+    'watchlists': {
+        'semis': {'tickers': ['nvda', 'AMD', 'TSM'], 'weights': {'valuation_metrics': 0.6, 'market_metrics': 0.0}},
+        'platforms': {'tickers': ['MSFT', 'META']}
+    }
+}
+
+class TestWatchlists(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.tickers_file = os.path.join(self.tmp_dir, 'tickers.json')
+        with open(self.tickers_file, 'w') as f:
+            json.dump(TICKER_CONFIG, f)
+        self.index = ScoreIndex(os.path.join(self.tmp_dir, 'scores.db'))
+        self.scorer = BubbleScorer()
+        rng = np.random.default_rng(0)
+        self.components = {}
+        rows = []
+        for ticker in ['NVDA', 'AMD', 'MSFT', 'TSM', 'META']:
+            components = dict(zip(
+                ['valuation_score', 'sentiment_score', 'growth_score', 'ai_exposure_score', 'market_score'],
+                rng.random(5).tolist()
+            ))
+            self.components[ticker] = components
+            rows.append(ScoreIndex.build_row(ticker, '2024-01-01T00:00:00', {
+                'bubble_risk': 0.5, 'risk_level': 'Moderate Risk', 'component_scores': components
+            }))
+        self.index.add_rows(rows)
+        self.projector = WatchlistProjector(self.index, self.tickers_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_collection_universe_is_deduplicated(self):
+        self.assertEqual(collection_universe(TICKER_CONFIG), ['NVDA', 'AMD', 'MSFT', 'TSM', 'META'])
+        self.assertEqual(list(load_watchlists(TICKER_CONFIG)), ['default', 'semis', 'platforms'])
+
+    def test_unknown_weight_raises(self):
+        with self.assertRaises(ValueError):
+            Watchlist('bad', ['NVDA'], {'hype': 1.0})
+
+    def test_weights_validated_and_normalized(self):
+        with self.assertRaises(ValueError):
+            Watchlist('bad', ['NVDA'], {'valuation_metrics': -0.1})
+        with self.assertRaises(ValueError):
+            Watchlist('bad', ['NVDA'], dict.fromkeys(RISK_SCORING_CONFIG['weights'], 0.0))
+        weights = load_watchlists(TICKER_CONFIG)['semis'].weights
+        self.assertAlmostEqual(sum(weights.values()), 1.0)
+        self.assertAlmostEqual(weights['valuation_metrics'] / weights['sentiment_metrics'], 0.6 / 0.2)
+        self.assertEqual(weights['market_metrics'], 0.0)
+
+    def test_invalid_watchlist_is_skipped(self):
+        config = dict(TICKER_CONFIG, watchlists=dict(TICKER_CONFIG['watchlists'], bad={
+            'tickers': ['INTC'], 'weights': {'valuation_metrics': -1.0}
+        }))
+        with self.assertLogs('src.utils.helpers', level='ERROR'):
+            self.assertEqual(list(load_watchlists(config)), ['default', 'semis', 'platforms'])
+        self.assertEqual(collection_universe(config), ['NVDA', 'AMD', 'MSFT', 'TSM', 'META'])
+
+    def test_projection_matches_scorer_with_watchlist_weights(self):
+        for name, watchlist in load_watchlists(TICKER_CONFIG).items():
+            weights = watchlist.weights
+            rows = self.projector.scores(name)
+            self.assertEqual(sorted(row['ticker'] for row in rows), sorted(watchlist.tickers))
+            for row in rows:
+                components = self.components[row['ticker']]
+                expected = (
+                    weights['valuation_metrics'] * components['valuation_score'] +
+                    weights['sentiment_metrics'] * components['sentiment_score'] +
+                    weights['growth_metrics'] * components['growth_score'] +
+                    weights['ai_exposure'] * components['ai_exposure_score'] +
+                    weights['market_metrics'] * components['market_score']
+                )
+                self.assertAlmostEqual(row['bubble_risk'], expected)
+                self.assertEqual(row['risk_level'], self.scorer.get_risk_level(expected))
+            risks = [row['bubble_risk'] for row in rows]
+            self.assertEqual(risks, sorted(risks, reverse=True))
+        self.assertIsNone(self.projector.scores('missing'))
+
+    def test_risk_levels_match_scorer(self):
+        values = np.array([0.0, 0.19, 0.2, 0.4, 0.5, 0.6, 0.79, 0.8, 1.0])
+        expected = [self.scorer.get_risk_level(value) for value in values]
+        self.assertEqual(list(risk_levels(values)), expected)
+
+    def test_projection_cached_until_index_changes(self):
+        first = self.projector.scores('semis')
+        self.assertIs(self.projector.scores('semis'), first)
+        self.index.add_rows([ScoreIndex.build_row('TSM', '2024-01-02T00:00:00', {
+            'bubble_risk': 1.0, 'component_scores': dict.fromkeys(self.components['TSM'], 1.0)
+        })])
+        rows = self.projector.scores('semis')
+        self.assertIsNot(rows, first)
+        self.assertEqual(rows[0]['ticker'], 'TSM')
+        self.assertAlmostEqual(rows[0]['bubble_risk'], 1.0)
+
+    def test_routes(self):
+        app = Flask(__name__)
+        register_routes(app, self.index, self.projector)
+        client = app.test_client()
+        response = client.get('/api/v1/watchlists')
+        self.assertEqual([watchlist['name'] for watchlist in response.get_json()['data']],
+                         ['default', 'semis', 'platforms'])
+
+        response = client.get('/api/v1/watchlists/platforms/scores?limit=1')
+        body = response.get_json()
+        self.assertEqual(body['pagination']['total'], 2)
+        self.assertEqual(len(body['data']), 1)
+        cached = client.get('/api/v1/watchlists/platforms/scores?limit=1',
+                            headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(client.get('/api/v1/watchlists/missing/scores').status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from src.analysis.bubble_scorer import BubbleScorer
+from src.analysis.weight_sweep import WEIGHT_KEYS, candidate_weights, run_weight_sweep, sweep_weights
+from src.storage.score_index import ScoreIndex
+from src.utils.config import RISK_SCORING_CONFIG
+
+def _naive_metrics(components, tickers, weights):
+    """Per-candidate loop using the scorer's own risk levels."""
+    scorer = BubbleScorer()
+    risk = components.astype(np.float32) @ weights.astype(np.float32)
+    levels = [scorer.get_risk_level(value) for value in risk]
+    changes, crossings, pairs = 0.0, 0, 0
+    for i in range(1, len(risk)):
+        if tickers[i] == tickers[i - 1]:
+            pairs += 1
+            changes += abs(risk[i] - risk[i - 1])
+            crossings += levels[i] != levels[i - 1]
+    high = sum(level in ('High Risk', 'Extreme Risk') for level in levels)
+    return changes / pairs, crossings / pairs, high / len(risk)
+
+class TestWeightSweep(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        n_tickers, n_periods = 6, 40
+        drift = np.cumsum(rng.normal(0, 0.05, (n_tickers, n_periods, 5)), axis=1)
+        self.components = np.clip(0.5 + drift, 0, 1).reshape(-1, 5)
+        self.tickers = np.repeat([f"T{i}" for i in range(n_tickers)], n_periods)
+        self.candidates = candidate_weights(50, seed=3)
+
+    def test_candidates_are_weight_vectors_around_current(self):
+        self.assertTrue(np.allclose(self.candidates.sum(axis=1), 1))
+        self.assertTrue((self.candidates >= 0).all())
+        expected = [RISK_SCORING_CONFIG['weights'][key] for key in WEIGHT_KEYS]
+        np.testing.assert_allclose(self.candidates[0], expected)
+
+    def test_matches_per_candidate_scoring(self):
+        result = sweep_weights(self.components, self.tickers, self.candidates)
+        for candidate in (0, 7, 49):
+            change, crossing, high = _naive_metrics(self.components, self.tickers, self.candidates[candidate])
+            row = result.loc[candidate]
+            self.assertAlmostEqual(row['mean_abs_change'], change, places=5)
+            self.assertAlmostEqual(row['crossing_rate'], crossing)
+            self.assertAlmostEqual(row['high_risk_share'], high)
+
+    def test_blocking_does_not_change_results(self):
+        whole = sweep_weights(self.components, self.tickers, self.candidates)
+        # Three observations per block, so blocks split inside every ticker
+        blocked = sweep_weights(self.components, self.tickers, self.candidates, block_values=150)
+        np.testing.assert_allclose(
+            blocked.sort_index()[['mean_abs_change', 'crossing_rate', 'high_risk_share']],
+            whole.sort_index()[['mean_abs_change', 'crossing_rate', 'high_risk_share']],
+            rtol=1e-5
+        )
+
+    def test_ranked_best_first(self):
+        result = sweep_weights(self.components, self.tickers, self.candidates)
+        self.assertTrue(result['rank'].is_monotonic_increasing)
+        self.assertEqual(len(result), 50)
+
+    def test_thousands_of_candidates_in_seconds(self):
+        rng = np.random.default_rng(2)
+        components = rng.random((20000, 5))
+        tickers = np.repeat(np.arange(100), 200)
+        started = time.perf_counter()
+        sweep_weights(components, tickers, candidate_weights(5000))
+        self.assertLess(time.perf_counter() - started, 30)
+
+class TestSweepFromIndex(unittest.TestCase):
+    def test_reads_component_history(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        index = ScoreIndex(os.path.join(tmp_dir, 'scores.db'))
+        scorer = BubbleScorer()
+        for i in range(5):
+            index.add_snapshot({
+                'timestamp': f'2024-01-0{i + 1}T00:00:00',
+                'tickers': {
+                    'NVDA': {'market_data': {'pe_ratio': 40 + 10 * i, 'current_price': 100}},
+                    'AMD': {'market_data': {'pe_ratio': 20, 'current_price': 50}}
+                }
+            }, scorer)
+
+        history = index.get_component_history(start='2024-01-02')
+        self.assertEqual([row[:2] for row in history[:2]], [('AMD', '2024-01-02T00:00:00'), ('AMD', '2024-01-03T00:00:00')])
+        self.assertEqual(len(history), 8)
+
+        result = run_weight_sweep(index, n_candidates=20)
+        self.assertEqual(len(result), 20)
+        self.assertIn(0, result.index)
+
+if __name__ == '__main__':
+    unittest.main()